@@ -1,6 +1,32 @@
 """
 Expose necessary Classes for the Game to be played
+
+The classes are imported lazily on first access (e.g. Connect4.Coordinator_Local),
+so importing the package doesn't load NumPy, Flask or the SenseHat modules.
 """
+import os
+import sys
+import importlib
+
+# the modules of the package import each other flat (from game import Connect4)
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+if _PACKAGE_DIR not in sys.path:
+    sys.path.append(_PACKAGE_DIR)
+
+# exported class -> module which defines it
+_EXPORTS = {
+    "Connect4": "game",
+    "Coordinator_Local": "coordinator_local",
+    "Coordinator_Remote": "coordinator_remote",
+    "Connect4Server": "server",
+}
+
+__all__ = list(_EXPORTS)
+
 
-from Connect4.coordinator_local import Coordinator_Local
-#from Connect4.coordinator_remote import Coordinator_Remote
\ No newline at end of file
+def __getattr__(name:str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value         # next access without __getattr__
+    return value
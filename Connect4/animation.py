@@ -0,0 +1,330 @@
+import time
+import random
+import threading
+from collections import deque
+
+# local includes
+from render import BLACK
+
+
+class Animation:
+    """
+    Handle of a queued animation.
+
+    Attributes:
+        name (str):                 name of the animation
+        frames (int):               number of frames shown so far
+        done (threading.Event):     set when the animation has finished or was cancelled
+        cancelled (bool):           True if the animation was cancelled or interrupted
+
+    Methods:
+        cancel(self) -> None
+            Stops the animation before its next frame
+        wait(self, timeout) -> bool
+            Waits until the animation is done
+    """
+
+    def __init__(self, frames, name:str = None) -> None:
+        self.name: str = name
+        self.frames: int = 0
+        self.done = threading.Event()
+        self.cancelled: bool = False
+        self._iterator = iter(frames)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def wait(self, timeout:float = None) -> bool:
+        return self.done.wait(timeout)
+
+
+class AnimationScheduler:
+    """
+    Frame-based animation scheduler for the SenseHat
+
+    Animations are iterables of frames (64 pixels each, or a callable which draws
+    on the SenseHat itself, e.g. show_message). The scheduler thread shows one frame
+    per tick at the target FPS, so animations never block the game loop: the client
+    keeps polling the server and reading the joystick while they run.
+    Queued animations are played one after another; interrupt() stops all of them.
+
+    Besides the animations the scheduler holds the base frame (usually the board):
+    show() draws it right away when no animation is running, otherwise it is drawn
+    again as soon as the animations are done.
+
+    Attributes:
+        sense (SenseHatRenderer):   renderer of the SenseHat to draw on
+        fps (float):                target frames per second
+        base_frame (list):          frame shown when no animation is running
+        frame_times (deque):        timestamps of the last shown animation frames (for frame timing checks)
+
+    Methods:
+        play(self, frames, name) -> Animation
+            Queues an animation
+        show(self, frame) -> None
+            Sets the base frame and draws it (unless an animation is running)
+        interrupt(self) -> None
+            Cancels the running and all queued animations
+        wait_idle(self, timeout) -> bool
+            Waits until all queued animations are done
+        is_idle(self) -> bool
+            Checks if no animation is running or queued
+        stop(self) -> None
+            Stops the scheduler thread
+    """
+
+    def __init__(self, sense, fps:float = 30.0) -> None:
+        """
+        Initializes the scheduler. The scheduler thread is started with the first animation.
+
+        Parameters:
+            sense (SenseHatRenderer): renderer (or SenseHat) to draw on
+            fps (float): target frames per second (default 30)
+
+        Returns:
+            None
+        """
+        self.sense = sense
+        self.fps: float = fps
+        self.base_frame: list = [BLACK] * 64
+        self.frame_times: deque = deque(maxlen=1000)
+        self._queue: deque = deque()
+        self._current: Animation = None
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread: threading.Thread = None
+        self._stopped: bool = False
+
+    def play(self, frames, name:str = None) -> Animation:
+        """
+        Queues an animation, it starts when all animations queued before are done.
+
+        Parameters:
+            frames: iterable (e.g. generator) of frames (64 pixels or callable(sense))
+            name (str): name of the animation (default None)
+
+        Returns:
+            Animation: handle to cancel or wait for the animation
+        """
+        animation = Animation(frames, name)
+        with self._lock:
+            self._queue.append(animation)
+            self._idle.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+        return animation
+
+    def show(self, frame:list) -> None:
+        """
+        Sets the base frame and draws it right away if no animation is running.
+
+        Parameters:
+            frame (list): 64 pixels
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.base_frame = list(frame)
+            if self._current is None and not self._queue:
+                self.sense.set_pixels(self.base_frame)
+
+    def interrupt(self) -> None:
+        """
+        Cancels the running and all queued animations, the base frame is drawn again.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        with self._lock:
+            for animation in self._queue:
+                animation.cancel()
+            if self._current is not None:
+                self._current.cancel()
+            self._wakeup.notify()
+
+    def wait_idle(self, timeout:float = None) -> bool:
+        """
+        Waits until all queued animations are done.
+
+        Parameters:
+            timeout (float): max. seconds to wait (default None -> no limit)
+
+        Returns:
+            bool: True if all animations are done
+        """
+        return self._idle.wait(timeout)
+
+    def is_idle(self) -> bool:
+        """
+        Checks if no animation is running or queued.
+
+        Parameters:
+            None
+
+        Returns:
+            bool: True if idle
+        """
+        return self._idle.is_set()
+
+    def stop(self) -> None:
+        """
+        Cancels all animations and stops the scheduler thread.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.interrupt()
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            for animation in [self._current, *self._queue]:
+                if animation is not None:
+                    animation.done.set()
+            self._current = None
+            self._queue.clear()
+            self._idle.set()
+
+    def _run(self) -> None:
+        """
+        Scheduler loop: shows one frame of the current animation per tick.
+        Ticks are planned on a fixed grid (next_tick += interval), so slow frames don't add up.
+        """
+        interval = 1.0 / self.fps
+        next_tick = time.monotonic()
+        while True:
+            with self._lock:
+                while self._current is None and not self._queue and not self._stopped:
+                    self._wakeup.wait()
+                if self._stopped:
+                    return
+                if self._current is None:
+                    self._current = self._queue.popleft()
+                    next_tick = time.monotonic()
+                animation = self._current
+
+                frame = None if animation.cancelled else next(animation._iterator, None)
+                if frame is None:
+                    #animation finished -> next one or back to the base frame
+                    animation.done.set()
+                    self._current = None
+                    if not self._queue:
+                        self.sense.set_pixels(self.base_frame)
+                        self._idle.set()
+                    continue
+
+            #drawn without the lock (show() doesn't draw while an animation runs), so a
+            #long frame like show_message doesn't block the game loop
+            if callable(frame):
+                frame(self.sense)
+            else:
+                self.sense.set_pixels(frame)
+            animation.frames += 1
+            self.frame_times.append(time.monotonic())
+
+            next_tick += interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
+
+
+def hold(frame:list, seconds:float, fps:float = 30.0):
+    """
+    Animation which shows one frame for some seconds.
+
+    Parameters:
+        frame (list): 64 pixels
+        seconds (float): duration
+        fps (float): frames per second of the scheduler (default 30)
+
+    Returns:
+        Generator of frames
+    """
+    for _ in range(max(1, round(seconds * fps))):
+        yield frame
+
+
+def message(text:str, color:tuple, scroll_speed:float = 0.05):
+    """
+    Animation which scrolls a message over the SenseHat (one step on the scheduler thread).
+
+    Parameters:
+        text (str): the message
+        color (tuple): RGB color of the text
+        scroll_speed (float): seconds per scroll step (default 0.05)
+
+    Returns:
+        Generator with one callable frame
+    """
+    yield lambda sense: sense.show_message(text, text_colour = color, scroll_speed = scroll_speed)
+
+
+def matrix_rain(color:tuple, rng:random.Random = random, hold_frames:int = 90):
+    """
+    Matrix rain effect: pixels rain down from the top row until the whole matrix is
+    filled with the color, then the filled matrix is held for some frames.
+
+    Parameters:
+        color (tuple): RGB color of the rain
+        rng (random.Random): random generator (default module random)
+        hold_frames (int): frames the filled matrix stays (default 90 -> 3 s at 30 FPS)
+
+    Returns:
+        Generator of frames
+    """
+    matrix = [[BLACK for _ in range(8)] for _ in range(8)]
+    while not all(pixel == color for row in matrix for pixel in row):
+        # Randomly add pixels to the top row (simulating falling rain)
+        for col in range(8):
+            if rng.random() < 0.1:
+                matrix[0][col] = color
+        # Shift all pixels down and remove the bottom row
+        for row in range(7, 0, -1):
+            for col in range(8):
+                matrix[row][col] = matrix[row - 1][col]
+        frame = [pixel for row in matrix for pixel in row]
+        #one rain step every 3 frames (10 steps per second at 30 FPS)
+        yield frame
+        yield frame
+        yield frame
+    yield from hold([color] * 64, hold_frames, 1)
+
+
+def chip_drop(base_frame:list, column:int, color:tuple):
+    """
+    Chip falling from the selection row down to the lowest free pixel of its column.
+
+    Parameters:
+        base_frame (list): 64 pixels of the board before the move (the selection row is cleared)
+        column (int): pixel column of the chip
+        color (tuple): RGB color of the chip
+
+    Returns:
+        Generator of frames (nothing if the column has no free pixel)
+    """
+    if not 0 <= column < 8:
+        return
+    base_frame = [BLACK] * 8 + list(base_frame[8:])
+    free_rows = [row for row in range(1, 8) if base_frame[row * 8 + column] == BLACK]
+    if not free_rows:
+        return
+    for row in range(0, free_rows[-1] + 1):
+        frame = list(base_frame)
+        frame[row * 8 + column] = color
+        yield frame
@@ -0,0 +1,336 @@
+import os
+import mmap
+import struct
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from typing import NamedTuple
+
+
+# Fixed size header of every archived game (little endian):
+#   player1 id (16 bytes), player2 id (16 bytes), id flags, result, rows, cols,
+#   number of moves, start time, end time
+HEADER = struct.Struct("<16s16sBBBBHdd")
+# Offsets of the games inside a segment are stored as uint64 in the index file
+OFFSET = struct.Struct("<Q")
+
+RESULT_DRAW = 0         # no winner
+RESULT_PLAYER1 = 1      # player1 ("X") has won
+RESULT_PLAYER2 = 2      # player2 ("O") has won
+
+TEXT_ID1 = 1            # id flag: player1 id is stored as text and not as uuid
+TEXT_ID2 = 2            # id flag: player2 id is stored as text and not as uuid
+
+
+class ArchivedGame(NamedTuple):
+    """
+    One finished game read from the archive.
+
+    Attributes:
+        player1 (str):  id of player1 ("X")
+        player2 (str):  id of player2 ("O")
+        result (int):   RESULT_DRAW, RESULT_PLAYER1 or RESULT_PLAYER2
+        rows (int):     height of the board
+        cols (int):     width of the board
+        moves (bytes):  played columns, one byte per move
+        started (float):  timestamp of the game start
+        finished (float): timestamp of the game end
+    """
+    player1: str
+    player2: str
+    result: int
+    rows: int
+    cols: int
+    moves: bytes
+    started: float
+    finished: float
+
+
+def _pack_id(player_id) -> tuple[bytes, bool]:
+    """
+    Packs a player id into 16 bytes. uuid ids are stored as uuid,
+    other ids as (max. 16 bytes of) text. Returns the bytes and if it is text.
+    """
+    try:
+        return uuid.UUID(str(player_id)).bytes, False
+    except ValueError:
+        return str(player_id).encode()[:16].ljust(16, b"\0"), True
+
+
+def _unpack_id(packed:bytes, is_text:bool) -> str:
+    """
+    Unpacks a player id packed by _pack_id.
+    """
+    if is_text:
+        return packed.rstrip(b"\0").decode(errors="replace")
+    return str(uuid.UUID(bytes=packed))
+
+
+class GameArchive:
+    """
+    Writer of the binary game archive
+
+    Every finished game is appended to the current segment file as a fixed size
+    header (see HEADER) followed by the played columns (one byte per move).
+    For each segment an index file holds the offset of every game, so a reader
+    can jump to any game without parsing the segment.
+    A new segment is started after `games_per_segment` games.
+
+    Files:
+        segment-<n>.c4a     packed games
+        segment-<n>.idx     uint64 offsets of the games in the segment
+
+    Attributes:
+        directory (str):            Folder of the segment files
+        games_per_segment (int):    Number of games per segment
+
+    Methods:
+        add(self, game, finished:float = None) -> None
+            Appends a finished Connect4 game to the archive
+        add_record(self, player1, player2, result, rows, cols, moves, started, finished) -> None
+            Appends a game given by its single values to the archive
+        close(self) -> None
+            Closes the open segment files
+    """
+
+    def __init__(self, directory:str, games_per_segment:int = 100000) -> None:
+        """
+        Initializes the archive writer and continues the last segment if it isn't full.
+
+        Parameters:
+            directory (str):            Folder of the segment files
+            games_per_segment (int):    Number of games per segment (default 100000)
+
+        Returns:
+            None
+        """
+        self.directory: str = directory
+        self.games_per_segment: int = games_per_segment
+        self._lock = threading.Lock()
+        self._data = None
+        self._index = None
+        self._count: int = 0            # games in the current segment
+
+        os.makedirs(self.directory, exist_ok=True)
+        segments = list_segments(self.directory)
+        self._segment: int = segments[-1] if segments else 0
+        self._open_segment()
+
+    def add(self, game, finished:float = None) -> None:
+        """
+        Appends a finished Connect4 game to the archive.
+
+        Parameters:
+            game (Connect4): the finished game
+            finished (float): end time of the game (default None -> now)
+
+        Returns:
+            None
+        """
+        if game.winner is None:
+            result = RESULT_DRAW
+        elif game.winner["icon"] == game.player1["icon"]:
+            result = RESULT_PLAYER1
+        else:
+            result = RESULT_PLAYER2
+        rows, cols = game.Board.shape
+        self.add_record(game.player1["id"], game.player2["id"], result, rows, cols,
+                        game.moves, game.started, finished or time.time())
+
+    def add_record(self, player1, player2, result:int, rows:int, cols:int, moves, started:float, finished:float) -> None:
+        """
+        Appends a game to the archive.
+
+        Parameters:
+            player1:            id of player1
+            player2:            id of player2
+            result (int):       RESULT_DRAW, RESULT_PLAYER1 or RESULT_PLAYER2
+            rows (int):         height of the board
+            cols (int):         width of the board
+            moves (list):       played columns
+            started (float):    start time of the game
+            finished (float):   end time of the game
+
+        Returns:
+            None
+        """
+        id1, text1 = _pack_id(player1)
+        id2, text2 = _pack_id(player2)
+        flags = (TEXT_ID1 if text1 else 0) | (TEXT_ID2 if text2 else 0)
+        record = HEADER.pack(id1, id2, flags, result, rows, cols,
+                             len(moves), started, finished) + bytes(moves)
+        with self._lock:
+            if self._count >= self.games_per_segment:
+                self._segment += 1
+                self._open_segment()
+            offset = self._data.tell()
+            self._data.write(record)
+            self._index.write(OFFSET.pack(offset))
+            self._data.flush()
+            self._index.flush()
+            self._count += 1
+
+    def close(self) -> None:
+        """
+        Closes the open segment files.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._data.close()
+            self._index.close()
+
+    def _open_segment(self) -> None:
+        """
+        Closes the current segment (if any) and opens the segment self._segment for appending.
+        """
+        if self._data is not None:
+            self._data.close()
+            self._index.close()
+        base = os.path.join(self.directory, f"segment-{self._segment:06d}")
+        self._data = open(base + ".c4a", "ab")
+        self._index = open(base + ".idx", "ab")
+        # index and data may differ after a crash -> the index is the truth
+        size = self._index.tell()
+        if size % OFFSET.size:
+            #a torn offset at the end would shift every offset appended after it
+            self._index.truncate(size - size % OFFSET.size)
+        self._count = size // OFFSET.size
+
+
+class ArchiveReader:
+    """
+    Reader of the binary game archive
+
+    Maps all segment and index files with mmap, so games are read straight from
+    the page cache: nothing is parsed or loaded until a game is accessed.
+    Games are numbered over all segments in the order they were archived.
+
+    Attributes:
+        directory (str):    Folder of the segment files
+
+    Methods:
+        __len__(self) -> int
+            Number of archived games
+        __getitem__(self, number:int) -> ArchivedGame
+            Reads the game with the given number
+        __iter__(self)
+            Iterates over all games
+        results(self)
+            Iterates over (result, number of moves) of all games, without copying the moves
+        close(self) -> None
+            Unmaps all segments
+    """
+
+    def __init__(self, directory:str) -> None:
+        """
+        Maps all segments of the archive.
+
+        Parameters:
+            directory (str): Folder of the segment files
+
+        Returns:
+            None
+        """
+        self.directory: str = directory
+        self._segments: list = []       # (data mmap, index mmap, number of games)
+        self._starts: list = []         # number of the first game of every segment
+        total = 0
+
+        for segment in list_segments(directory):
+            base = os.path.join(directory, f"segment-{segment:06d}")
+            count = os.path.getsize(base + ".idx") // OFFSET.size
+            if count == 0:
+                continue
+            with open(base + ".c4a", "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            with open(base + ".idx", "rb") as file:
+                index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._segments.append((data, index, count))
+            self._starts.append(total)
+            total += count
+        self._length: int = total
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, number:int) -> ArchivedGame:
+        if number < 0:
+            number += self._length
+        if not 0 <= number < self._length:
+            raise IndexError("game number out of range")
+        segment = bisect_right(self._starts, number) - 1
+        data, index, _ = self._segments[segment]
+        offset, = OFFSET.unpack_from(index, (number - self._starts[segment]) * OFFSET.size)
+        return self._read(data, offset)
+
+    def __iter__(self):
+        for data, index, count in self._segments:
+            for i in range(count):
+                offset, = OFFSET.unpack_from(index, i * OFFSET.size)
+                yield self._read(data, offset)
+
+    def results(self):
+        """
+        Iterates over all games and yields only (result, number of moves).
+        Faster than iterating over the whole games, because the moves aren't copied.
+
+        Parameters:
+            None
+
+        Returns:
+            Generator of tuple[int, int]
+        """
+        for data, index, count in self._segments:
+            for i in range(count):
+                offset, = OFFSET.unpack_from(index, i * OFFSET.size)
+                header = HEADER.unpack_from(data, offset)
+                yield header[3], header[6]
+
+    def close(self) -> None:
+        """
+        Unmaps all segments.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        for data, index, _ in self._segments:
+            data.close()
+            index.close()
+        self._segments = []
+        self._starts = []
+        self._length = 0
+
+    @staticmethod
+    def _read(data:mmap.mmap, offset:int) -> ArchivedGame:
+        """
+        Reads the game at the offset of a mapped segment.
+        """
+        player1, player2, flags, result, rows, cols, length, started, finished = HEADER.unpack_from(data, offset)
+        start = offset + HEADER.size
+        return ArchivedGame(_unpack_id(player1, flags & TEXT_ID1), _unpack_id(player2, flags & TEXT_ID2), result, rows, cols,
+                            data[start:start + length], started, finished)
+
+
+def list_segments(directory:str) -> list[int]:
+    """
+    Returns the sorted numbers of all segments in the archive directory.
+
+    Parameters:
+        directory (str): Folder of the segment files
+
+    Returns:
+        list[int]: segment numbers
+    """
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(name[len("segment-"):-len(".idx")]) for name in os.listdir(directory)
+                  if name.startswith("segment-") and name.endswith(".idx"))
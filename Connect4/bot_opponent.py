@@ -0,0 +1,232 @@
+import random
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# local includes
+from bots import get_strategy, heuristic_move
+from search import board_rows, timed_search
+
+
+def compute_bot_move(strategy:str, rows:list[str], active_player_icon:str, connect:int, budget:float, seed:int) -> int:
+    """
+    Selects the column of a bot (runs in a worker process).
+    The "search" strategy uses the whole time budget (iterative deepening),
+    the other strategies are fast and ignore it.
+
+    Parameters:
+        strategy (str): strategy name (see bots.get_strategy)
+        rows (list[str]): rows of the board ("." for an empty cell)
+        active_player_icon (str): icon of the bot
+        connect (int): chips in a row needed to win
+        budget (float): time budget in seconds
+        seed (int): seed for the random choices of the bot
+
+    Returns:
+        int: selected column
+    """
+    if strategy == "search":
+        return timed_search(rows, active_player_icon, connect, budget)["best_column"]
+    board_np = np.array([[0 if cell == "." else cell for cell in row] for row in rows], dtype=object)
+    return get_strategy(strategy)(board_np, active_player_icon, random.Random(seed), connect)
+
+
+class BotOpponents:
+    """
+    Server-side bot opponents for the games of a Connect4Server
+
+    As soon as a move is committed and the bot of the game has to move, the bot's
+    column is computed in a bounded process pool, so bot thinking never holds the
+    GIL of the HTTP threads. The result is applied with Connect4Server.apply_move.
+    If the bot exceeds its time budget, the fast heuristic bot moves instead.
+
+    Attributes:
+        server (Connect4Server): server hosting the games
+        workers (int): number of worker processes for the bots
+        bots (dict): game_id -> {"strategy", "player_id", "budget"}
+
+    Methods:
+        add(self, game_id, strategy, budget, player_id) -> str
+            Adds a bot opponent to a game
+        is_bot(self, game_id) -> bool
+            Checks if a game has a bot opponent
+        on_change(self, game_id) -> None
+            Starts the bot move if the bot has to move
+        cancel(self, game_id) -> None
+            Discards the running bot move of a game
+        remove(self, game_id) -> None
+            Removes the bot of a game
+        close(self) -> None
+            Stops the worker processes
+    """
+
+    GRACE_TIME = 0.5        # seconds a bot may exceed its budget before the fallback moves
+
+    def __init__(self, server, workers:int = 2) -> None:
+        """
+        Initializes the bot opponents. The process pool is started with the first bot move.
+
+        Parameters:
+            server (Connect4Server): server hosting the games
+            workers (int): number of worker processes (default 2)
+
+        Returns:
+            None
+        """
+        self.server = server
+        self.workers: int = workers
+        self.bots: dict = {}
+        self._thinking: dict = {}        # game_id -> store version of the game when the bot started thinking
+        self._lock = threading.Lock()
+        self._pool: ProcessPoolExecutor = None
+
+    def add(self, game_id:str, strategy:str, budget:float = 1.0, player_id:str = None) -> str:
+        """
+        Adds a bot opponent to a game (without journal record, see Connect4Server.create_game).
+
+        Parameters:
+            game_id (str): id of the game
+            strategy (str): strategy name (see bots.get_strategy)
+            budget (float): time budget per move in seconds (default 1.0)
+            player_id (str): id of the bot (default None -> new id)
+
+        Returns:
+            str: id of the bot player
+
+        Raises:
+            ValueError: if the strategy is unknown
+        """
+        get_strategy(strategy)
+        player_id = player_id or f"bot-{uuid.uuid4()}"
+        self.bots[game_id] = {"strategy": strategy, "player_id": player_id, "budget": budget}
+        return player_id
+
+    def is_bot(self, game_id:str) -> bool:
+        """
+        Checks if a game has a bot opponent.
+
+        Parameters:
+            game_id (str): id of the game
+
+        Returns:
+            bool: True if the game has a bot
+        """
+        return game_id in self.bots
+
+    def on_change(self, game_id:str) -> None:
+        """
+        Called after every committed change of a game: starts the bot move in the pool
+        if both players are registered, the game isn't over and the bot has to move.
+
+        Parameters:
+            game_id (str): id of the game
+
+        Returns:
+            None
+        """
+        bot = self.bots.get(game_id)
+        if bot is None:
+            return
+
+        with self.server.lock:
+            game, version = self.server.store.get_versioned(game_id)
+            if (game is None or game.is_over() or not game.player1 or not game.player2
+                    or game.active_player["id"] != bot["player_id"]):
+                return
+            move_number = len(game.moves)
+            icon = game.active_player["icon"]
+            board = board_rows(game.Board)
+            connect = game.connect
+
+        with self._lock:
+            if self._thinking.get(game_id) == version:
+                return
+            self._thinking[game_id] = version
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            future = self._pool.submit(compute_bot_move, bot["strategy"], board, icon, connect,
+                                       bot["budget"], move_number)
+
+        #fallback if the bot needs too long, the first of both moves counts
+        timer = threading.Timer(bot["budget"] + self.GRACE_TIME, self._fallback,
+                                args=(game_id, version, move_number, board, icon, connect))
+        timer.daemon = True
+        timer.start()
+        future.add_done_callback(lambda done: self._on_result(game_id, version, done, timer))
+
+    def cancel(self, game_id:str) -> None:
+        """
+        Discards the running bot move of a game (e.g. after a takeback), its result is ignored.
+
+        Parameters:
+            game_id (str): id of the game
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._thinking.pop(game_id, None)
+
+    def remove(self, game_id:str) -> None:
+        """
+        Removes the bot of a game (e.g. when the game is evicted), a running move is discarded.
+
+        Parameters:
+            game_id (str): id of the game
+
+        Returns:
+            None
+        """
+        self.cancel(game_id)
+        self.bots.pop(game_id, None)
+
+    def close(self) -> None:
+        """
+        Stops the worker processes.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _on_result(self, game_id:str, version:int, future, timer:threading.Timer) -> None:
+        """
+        Applies the column computed in the pool (if the fallback hasn't moved yet).
+        """
+        timer.cancel()
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._apply(game_id, version, future.result())
+
+    def _fallback(self, game_id:str, version:int, move_number:int, board:list, icon:str, connect:int) -> None:
+        """
+        Moves with the fast heuristic bot when the bot exceeded its time budget.
+        """
+        board_np = np.array([[0 if cell == "." else cell for cell in row] for row in board], dtype=object)
+        self._apply(game_id, version, heuristic_move(board_np, icon, random.Random(move_number), connect))
+
+    def _apply(self, game_id:str, version:int, column:int) -> None:
+        """
+        Makes the bot move, if the game is still at the version the bot was thinking about
+        (a takeback and another move lead to the same number of moves, but not to the same version).
+        """
+        with self._lock:
+            if self._thinking.get(game_id) != version:
+                return
+            del self._thinking[game_id]
+
+        game = self.server.get_game(game_id)
+        bot = self.bots.get(game_id)
+        if game is None or bot is None:
+            return
+        if column is None or not self.server.apply_move(game_id, column, bot["player_id"], version=version):
+            #never let the human wait: any legal column
+            legal = [col for col in range(game.Board.shape[1]) if game.check_move(col, bot["player_id"])]
+            if legal:
+                self.server.apply_move(game_id, legal[0], bot["player_id"], version=version)
@@ -0,0 +1,298 @@
+import random
+import numpy as np
+from search import search_move
+
+
+def random_move(board_np:np.ndarray, active_player_icon:str, rng:random.Random = random, connect:int = 4) -> int:
+    """
+    Bot which drops its chip into a random column with space left.
+
+    Parameters:
+        board_np (np.ndarray): current board (0 for an empty cell)
+        active_player_icon (str): icon of the player who has to move
+        rng (random.Random): random generator (default module random)
+        connect (int): chips in a row needed to win (not used)
+
+    Returns:
+        int: selected column (None if the board is full)
+    """
+    valid_cols = [col for col in range(board_np.shape[1]) if board_np[0, col] == 0]
+    if valid_cols:
+        return rng.choice(valid_cols)
+
+
+def heuristic_move(board_np:np.ndarray, active_player_icon:str, rng:random.Random = random, connect:int = 4) -> int:
+    """
+    Rule based bot (used by Player_Remote.bot), the first rule that matches decides:
+        1. winning move
+        2. blocking a winning move of the opponent
+        3. forming / blocking a three-in-a-row (connect-1 in a row)
+        4. centre columns
+        5. random column
+
+    Parameters:
+        board_np (np.ndarray): current board (0 for an empty cell)
+        active_player_icon (str): icon of the player who has to move
+        rng (random.Random): random generator for the random choices (default module random)
+        connect (int): chips in a row needed to win (default 4)
+
+    Returns:
+        int: selected column (None if the board is full)
+    """
+    rows , cols = board_np.shape
+
+    #1. Checking for Winning moves
+    #horizontally
+    for row in range(rows):
+        for col in range(cols - connect + 1):  # Look at connect-cell sequences
+            h_myself = 0
+            h_free_col = None
+
+            for i in range(connect):  # Check each cell in the connect-cell sequence
+                if board_np[row, col + i] == active_player_icon:
+                    h_myself += 1
+                elif board_np[row, col + i] == 0:  # Empty
+                    h_free_col = col + i
+
+            # Check if there are connect-1 of the same chips and one free space
+            if h_myself == connect - 1 and h_free_col is not None:  # Active player can win
+                if row == rows - 1 or board_np[row + 1, h_free_col] != 0:  # check if there is no 'air'
+                    return h_free_col 
+
+    #vertically
+    for col in range(cols):
+        for row in range(rows - connect + 1): 
+            v_myself = 0
+
+            for i in range(connect):  # Check each cell in the connect-cell sequence
+                if board_np[row + i, col] == active_player_icon:
+                    v_myself += 1
+
+            if v_myself == connect - 1 and board_np[row, col] == 0:  # Active player can win
+                return col 
+
+    #diagonally (left to right)
+    for col in range(cols - connect + 1):
+        for row in range(rows - connect + 1):
+            d_lr_myself = 0
+            d_lr_free_row, d_lr_free_col = None, None
+
+            for i in range(connect):  # Check each cell in the diagonal
+                if board_np[row + i, col + i] == active_player_icon:
+                    d_lr_myself += 1
+                elif board_np[row + i, col + i] == 0:
+                    d_lr_free_row, d_lr_free_col = row + i, col + i
+
+            if d_lr_myself == connect - 1 and d_lr_free_row is not None:
+                if d_lr_free_row == rows - 1 or board_np[d_lr_free_row + 1, d_lr_free_col] != 0:  # check that there's no 'air'
+                    return d_lr_free_col  # Return column to place the chip
+
+    # diagonally right to left
+    for col in range(connect - 1, cols):
+        for row in range(rows - connect + 1):
+            d_rl_myself = 0
+            d_rl_free_row, d_rl_free_col = None, None
+
+            for i in range(connect):  # Check each cell in the diagonal
+                if board_np[row + i, col - i] == active_player_icon:
+                    d_rl_myself += 1
+                elif board_np[row + i, col - i] == 0:
+                    d_rl_free_row, d_rl_free_col = row + i, col - i
+
+            if d_rl_myself == connect - 1 and d_rl_free_row is not None:
+                if d_rl_free_row == rows - 1 or board_np[d_rl_free_row + 1, d_rl_free_col] != 0:  # check that there's no 'air'
+                    return d_rl_free_col
+
+
+    #2. Checking for blocking moves
+    #horizontally
+    for row in range(rows):
+        for col in range(cols - connect + 1):  # Look at connect-cell sequences
+            h_opponent = 0
+            h_free_col = None
+
+            for i in range(connect):  # Check each cell in the connect-cell sequence
+                if board_np[row, col + i] != 0 and board_np[row, col + i] != active_player_icon: 
+                    h_opponent += 1
+                elif board_np[row, col + i] == 0:  # Empty
+                    h_free_col = col + i
+
+            if h_opponent == connect - 1 and h_free_col is not None:  # Opponent can win
+                if row == rows - 1 or board_np[row + 1, h_free_col] != 0:  # check if there is no 'air'
+                    return h_free_col  # Block the opponent
+
+    #vertically
+    for col in range(cols):
+        for row in range(rows - connect + 1): 
+            v_opponent = 0
+
+            for i in range(connect):  # Check each cell in the connect-cell sequence
+                if board_np[row + i, col] != active_player_icon and board_np[row + i, col] != 0:
+                    v_opponent += 1
+
+            if v_opponent == connect - 1 and board_np[row, col] == 0:  # Opponent can win
+                return col  # Block the opponent
+
+    #diagonally (left to right)
+    for col in range(cols - connect + 1):
+        for row in range(rows - connect + 1):
+            d_lr_opponent = 0
+            d_lr_free_row, d_lr_free_col = None, None
+
+            for i in range(connect):  # Check each cell in the diagonal
+                if board_np[row + i, col + i] != active_player_icon and board_np[row + i, col + i] != 0:
+                    d_lr_opponent += 1
+                elif board_np[row + i, col + i] == 0:  # Empty
+                    d_lr_free_row, d_lr_free_col = row + i, col + i
+
+            if d_lr_opponent == connect - 1 and d_lr_free_row is not None:
+                if d_lr_free_row == rows - 1 or board_np[d_lr_free_row + 1, d_lr_free_col] != 0:  # check that there's no 'air'
+                    return d_lr_free_col  # Block opponent
+
+    # diagonally right to left
+    for col in range(connect - 1, cols):
+        for row in range(rows - connect + 1):
+            d_rl_opponent = 0
+            d_rl_free_row, d_rl_free_col = None, None
+
+            for i in range(connect):  # Check each cell in the diagonal
+                if board_np[row + i, col - i] != active_player_icon and board_np[row + i, col - i] != 0:
+                    d_rl_opponent += 1
+                elif board_np[row + i, col - i] == 0:
+                    d_rl_free_row, d_rl_free_col = row + i, col - i
+
+            if d_rl_opponent == connect - 1 and d_rl_free_row is not None:
+                if d_rl_free_row == rows - 1 or board_np[d_rl_free_row + 1, d_rl_free_col] != 0:  # check that there's no 'air'
+                    return d_rl_free_col  # Block opponent
+
+    #3. Checking for pairs
+    # horizontally           
+    for row in range(rows):
+        for col in range(cols - connect + 2):
+            h_myself = 0
+            h_opponent = 0
+            free_cols = []  # Stores indices of free columns
+
+            for i in range(connect - 1):  # Check each cell in the (connect-1)-cell sequence
+                if board_np[row, col + i] == active_player_icon:
+                    h_myself += 1
+                elif board_np[row, col + i] != 0:  # opponent
+                    h_opponent += 1
+                else:  # Empty
+                    free_cols.append(col + i)
+
+            # Active player has a pair and at least one free space
+            if h_myself == connect - 2 and len(free_cols) > 0:
+                for free_col in free_cols:  # Check if the free space is valid
+                    if row == rows - 1 or board_np[row + 1, free_col] != 0:  # no 'air'
+                        return free_col  # Place chip to form a three-in-a-row
+
+            # Opponent has a pair and at least one free space
+            if h_opponent == connect - 2 and len(free_cols) > 0:
+                for free_col in free_cols:  # Check if the free space is valid
+                    if row == rows - 1 or board_np[row + 1, free_col] != 0:  # no 'air'
+                        return free_col  # Block the opponent so he can't form 3-in-a-row
+
+    # vertically
+    for col in range(cols):
+        for row in range(rows - connect + 2):  # Look at (connect-1)-cell vertical sequences
+            if all(board_np[row + i, col] == active_player_icon for i in range(1, connect - 1)):
+                if board_np[row, col] == 0:  # check if there's free space on top
+                    return col  # Place chip to form a three-in-a-row (column)
+
+            if all(board_np[row + i, col] != 0 and board_np[row + i, col] != active_player_icon for i in range(1, connect - 1)) and board_np[row, col] == 0:
+                    return col  # Block the opponent
+
+    # diagonally (left to right)
+    for col in range(cols - connect + 2):
+        for row in range(rows - connect + 2): 
+            d_lr_myself = 0
+            d_lr_opponent = 0
+            free_row, free_col = None, None
+
+            for i in range(connect - 1):  # Check each (connect-1)-cell-sequences in the diagonal
+                if board_np[row + i, col + i] == active_player_icon:
+                    d_lr_myself += 1
+                elif board_np[row + i, col + i] != 0:
+                    d_lr_opponent += 1
+                else:
+                    free_row, free_col = row + i, col + i
+
+            if d_lr_myself == connect - 2 and free_row is not None:
+                if free_row == rows - 1 or board_np[free_row + 1, free_col] != 0:  # no 'air'
+                    return free_col  # Form a three-in-a-row
+
+            if d_lr_opponent == connect - 2 and free_row is not None:
+                if free_row == rows - 1 or board_np[free_row + 1, free_col] != 0:  # no 'air'
+                    return free_col  # Block the opponent
+
+    # diagonally (right to left)
+    for col in range(connect - 2, cols):  # start at column 3
+        for row in range(rows - connect + 2):
+            d_rl_myself = 0
+            d_rl_opponent = 0
+            free_row, free_col = None, None
+
+            for i in range(connect - 1):  # Check each (connect-1)-cell-sequences in the diagonal
+                if col - i >= 0:  #makes sure we stay in the board
+                    if board_np[row + i, col - i] == active_player_icon:
+                        d_rl_myself += 1
+                    elif board_np[row + i, col - i] != 0:
+                        d_rl_opponent += 1
+                    else:
+                        free_row, free_col = row + i, col - i
+
+            if d_rl_myself == connect - 2 and free_row is not None:
+                if free_row == rows - 1 or board_np[free_row + 1, free_col] != 0:  # no air
+                    return free_col  # to form a three-in-a-row
+
+            if d_rl_opponent == connect - 2 and free_row is not None:
+                if free_row == rows - 1 or board_np[free_row + 1, free_col] != 0:  # no air
+                    return free_col  # Block the opponent's 3-in-a-row
+
+    # 4. Move when none of the above two is the case and centre is free at the bottom
+
+    center_left, center_right = (cols - 1) // 2, cols // 2  # 3 and 4 on the 8 column board
+    if board_np[0, center_left] == 0 and board_np[0, center_right] == 0:  # Checks if the two center columns are free at the top
+        return rng.randrange(center_left, center_right + 1) #3 or 4 (random)
+    if board_np[0, center_right] == 0:  # center right column
+        return center_right
+    if board_np[0, center_left] == 0:  # center left column
+        return center_left
+
+    # 5. Move when none of the above is the case (random move)
+    valid_cols = [col for col in range(cols) if board_np[0, col] == 0]
+    if valid_cols:
+        return rng.choice(valid_cols)
+
+
+# Strategies which can be selected by name (e.g. in the tournament runner)
+STRATEGIES = {
+    "heuristic": heuristic_move,
+    "random": random_move,
+    "search": search_move,
+}
+
+
+def get_strategy(name:str):
+    """
+    Returns the bot function for a strategy name.
+    Besides the names in STRATEGIES also "module:function" is accepted, so
+    bots from other modules can be used without changing this file.
+
+    Parameters:
+        name (str): strategy name or "module:function"
+
+    Returns:
+        callable: function(board_np, active_player_icon, rng, connect) -> column
+
+    Raises:
+        ValueError: if the strategy is unknown
+    """
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    if ":" in name:
+        import importlib
+        module_name, function_name = name.split(":", 1)
+        return getattr(importlib.import_module(module_name), function_name)
+    raise ValueError(f"Unknown strategy '{name}', available: {', '.join(STRATEGIES)}")
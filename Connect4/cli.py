@@ -0,0 +1,133 @@
+"""
+Console entry points (see setup.py):
+    connect4-server     starts the Connect4Server
+    connect4-play       plays a local, remote or headless game
+
+Only argparse is imported at startup, every mode imports just the modules it needs
+(e.g. a remote CLI client never loads Flask or the SenseHat modules).
+"""
+import argparse
+
+
+def server_main(argv:list = None) -> None:
+    """
+    Starts the Connect4Server.
+
+    Parameters:
+        argv (list): command line arguments (default None -> sys.argv)
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(prog="connect4-server", description="Connect 4 API server")
+    parser.add_argument("--host", default="0.0.0.0", help="address to listen on (default 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=5000, help="port to listen on (default 5000)")
+    parser.add_argument("--journal", default=None, help="folder of the game journal (games survive restarts)")
+    parser.add_argument("--archive", default=None, help="folder of the archive of finished games")
+    parser.add_argument("--takeback", action="store_true", help="allow players to take back their last move")
+    parser.add_argument("--no-swagger", action="store_true", help="don't serve the Swagger UI")
+    parser.add_argument("--store", default=None, help="SQLite database of the games (shared by the workers)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes sharing the --store (default 1)")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="answer clients which poll too fast with 429 (limits: ratelimit.DEFAULT_LIMITS)")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="run this many shard processes behind a router on --port (default 0 -> no sharding)")
+    parser.add_argument("--base-port", type=int, default=5100, help="port of the first shard (default 5100)")
+    parser.add_argument("--tcp-port", type=int, default=None,
+                        help="serve the binary TCP protocol for LAN clients on this port (default: off)")
+    parser.add_argument("--debug", action="store_true", help="run Flask in debug mode")
+    args = parser.parse_args(argv)
+
+    rate_limits = None
+    if args.rate_limit:
+        from ratelimit import DEFAULT_LIMITS
+        rate_limits = DEFAULT_LIMITS
+
+    if args.tcp_port is not None and (args.shards > 0 or args.workers > 1):
+        parser.error("--tcp-port needs a single server process (no --shards or --workers)")
+
+    if args.shards > 0:
+        if args.journal or args.store or args.workers > 1:
+            parser.error("--shards keeps the games in memory of the shards (no --journal, --store or --workers)")
+        from router import run_shards
+        run_shards(args.shards, args.host, args.port, args.base_port,
+                   archive_dir=args.archive, allow_takeback=args.takeback, rate_limits=rate_limits)
+        return
+
+    if args.workers > 1:
+        if not args.store:
+            parser.error("--workers needs a --store")
+        from server import run_workers
+        run_workers(args.store, args.workers, args.host, args.port, allow_takeback=args.takeback,
+                    rate_limits=rate_limits)
+        return
+
+    from server import Connect4Server
+    store = None
+    if args.store:
+        from store import SQLiteGameStore
+        store = SQLiteGameStore(args.store)
+    server = Connect4Server(journal_dir=args.journal, archive_dir=args.archive, allow_takeback=args.takeback,
+                            swagger=not args.no_swagger, store=store, rate_limits=rate_limits)
+    server.run(debug=args.debug, host=args.host, port=args.port, tcp_port=args.tcp_port)
+
+
+def play_main(argv:list = None) -> None:
+    """
+    Plays a game:
+        local       two players on this device (CLI or SenseHat)
+        remote      one player against the server (CLI, SenseHat or bot)
+        headless    many bot games without rendering (prints the results)
+
+    Parameters:
+        argv (list): command line arguments (default None -> sys.argv)
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(prog="connect4-play", description="Play Connect 4")
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    local = modes.add_parser("local", help="two players on this device")
+    local.add_argument("--raspi", action="store_true", help="play on the SenseHat")
+    local.add_argument("--rows", type=int, default=7, help="height of the board (default 7)")
+    local.add_argument("--cols", type=int, default=8, help="width of the board (default 8)")
+    local.add_argument("--connect", type=int, default=4, help="chips in a row needed to win (default 4)")
+
+    remote = modes.add_parser("remote", help="one player against the server")
+    remote.add_argument("api_url", nargs="?", default="http://127.0.0.1:5000", help="address of the server incl. port")
+    remote.add_argument("--raspi", action="store_true", help="play on the SenseHat")
+    remote.add_argument("--bot", action="store_true", help="let the bot play")
+    remote.add_argument("--game-id", default=None, help="game on the server (default: default game)")
+    remote.add_argument("--lobby", action="store_true", help="get paired with an opponent into a new game")
+    remote.add_argument("--rating", type=float, default=None, help="rating for the pairing in the lobby")
+    remote.add_argument("--tcp-port", type=int, default=None,
+                        help="play over the binary TCP protocol of the server on this port (default: HTTP)")
+
+    headless = modes.add_parser("headless", help="bot games without rendering")
+    headless.add_argument("strategies", nargs=2, help="strategies of player X and O (see bots.py)")
+    headless.add_argument("--games", type=int, default=1000, help="number of games (default 1000)")
+    headless.add_argument("--seed", type=int, default=None, help="seed of the random generator")
+    headless.add_argument("--rows", type=int, default=7, help="height of the board (default 7)")
+    headless.add_argument("--cols", type=int, default=8, help="width of the board (default 8)")
+    headless.add_argument("--connect", type=int, default=4, help="chips in a row needed to win (default 4)")
+    args = parser.parse_args(argv)
+
+    if args.mode == "remote":
+        from coordinator_remote import Coordinator_Remote
+        Coordinator_Remote(api_url=args.api_url, on_raspi=args.raspi, bot=args.bot, game_id=args.game_id,
+                           lobby=args.lobby, rating=args.rating, tcp_port=args.tcp_port).play()
+        return
+
+    from coordinator_local import Coordinator_Local
+    if args.mode == "local":
+        Coordinator_Local(on_raspi=args.raspi, rows=args.rows, cols=args.cols, connect=args.connect).play()
+    else:
+        coordinator = Coordinator_Local(rows=args.rows, cols=args.cols, connect=args.connect)
+        results = coordinator.play_many(*args.strategies, games=args.games, seed=args.seed)
+        print(f"X: {results['X']}  O: {results['O']}  draw: {results['draw']}  forfeit: {results['forfeit']}  "
+              f"({results['games_per_second']:.0f} games/s)")
+
+
+if __name__ == "__main__":
+    play_main()
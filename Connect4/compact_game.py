@@ -0,0 +1,637 @@
+import time
+import types
+import random
+import argparse
+import tracemalloc
+
+
+ICONS = ("X", "O")          # icon of player index 0 (player1) and 1 (player2)
+EMPTY = 0                   # board cell without a chip, otherwise player index + 1
+MAX_SIDE = 255              # rows and cols fit into one byte (column heights, archive, TCP state)
+MAX_CELLS = 4096            # largest board (rows * cols), a client can't make the server allocate huge boards
+
+
+class CompactBoard:
+    """
+    Read-only view of the board of a CompactConnect4 with the parts of the
+    np.ndarray interface the server uses (shape, size, board[row, col], rows, tolist()).
+    Nothing is copied, the view reads the cells of the game.
+
+    Attributes:
+        shape (tuple): (rows, cols) of the board
+        size (int): number of cells
+
+    Methods:
+        tolist(self) -> list
+            Returns the board as nested lists (0 for an empty cell, otherwise the icon)
+    """
+    __slots__ = ("_game",)
+
+    def __init__(self, game:"CompactConnect4") -> None:
+        self._game = game
+
+    @property
+    def shape(self) -> tuple:
+        return (self._game.rows, self._game.cols)
+
+    @property
+    def size(self) -> int:
+        return self._game.rows * self._game.cols
+
+    def __len__(self) -> int:
+        return self._game.rows
+
+    def __getitem__(self, index:tuple):
+        row, col = index
+        return self._game.cell(row, col)
+
+    def __iter__(self):
+        cols = self._game.cols
+        cells = [ICONS[cell - 1] if cell else EMPTY for cell in self._game.board]
+        for start in range(0, len(cells), cols):
+            yield cells[start:start + cols]
+
+    def tolist(self) -> list:
+        return list(self)
+
+
+class CompactConnect4:
+    """
+    Compact Connect 4 Game Class for servers which host many games
+
+        Same rules and the same interface as Connect4 (game.py), but with a fraction
+        of the memory per game:
+            - __slots__ instead of an instance dict
+            - the board is a bytearray (one byte per cell: 0 empty, 1 "X", 2 "O")
+            - column heights and moves are bytearrays
+            - players are stored by index (0 = player1, 1 = player2) instead of dicts
+            - no undo stack: every move can be taken back from the move list alone
+            - get_status() returns a cached, immutable status which is only rebuilt after a change
+
+        The dict attributes of Connect4 (player1, player2, active_player, winner) and Board
+        are available as read-only properties which are built on access.
+
+        Attributes:
+            rows:int
+                Height of the board
+            cols:int
+                Width of the board
+            connect:int
+                Number of chips in a row needed to win
+            board:bytearray
+                Cells of the board row by row (top row first)
+            heights:bytearray
+                Number of chips in every column
+            moves:bytearray
+                Columns of all moves made so far (in order)
+            redo_stack:bytearray
+                Columns of the moves taken back with undo() (cleared by a new move)
+            player_ids:list
+                Ids of player1 and player2 (None if not registered)
+            active:int
+                Index of the active player (-1 before the first registration)
+            winner_index:int
+                Index of the winner (-1 if there's no winner)
+            turncounter:int
+                Number of turns
+            started:float
+                Timestamp when the game was created
+
+        Methods:
+        get_status() -> types.MappingProxyType
+            returns the cached Status of the game (same keys as Connect4.get_status())
+        is_draw() -> bool
+            Checks in O(1) if the board is full without a winner
+        is_over() -> bool
+            Checks in O(1) if the game is finished (won or draw)
+        register_player(self, player_id)->str
+            registers a player with the id and returns icon
+        get_board() -> CompactBoard
+            Returns a read-only view of the Board
+        cell(row:int, col:int)
+            Returns the icon in a cell (0 if empty)
+        check_move(column:int, player_Id) -> bool
+            Checks if a move of a certain player is legal
+        update_status()
+            Makes a Status Update of the game
+        drop_chip(column:int, icon:str) -> int
+            Drops a chip into a column (move has to be checked before) and returns its row
+        get_config() -> dict
+            Returns the size of the board and the connect length
+        reset() -> None
+            Starts a new game on the same board with the same players (player1 starts)
+        play(column:int) -> bool
+            Checks and makes a move for the active player (drop and status update)
+        undo() -> int
+            Takes back the last move and restores the status exactly
+        redo() -> int
+            Makes the last move taken back with undo() again
+        forfeit(player_Id) -> bool
+            Ends the game, the opponent of the player wins
+        to_snapshot(self) -> dict
+            Returns the same JSON serializable state as Connect4.to_snapshot()
+        from_snapshot(cls, state:dict) -> CompactConnect4
+            Creates a game from a state made by to_snapshot() of either class
+        """
+    __slots__ = ("rows", "cols", "connect", "board", "heights", "moves", "redo_stack",
+                 "player_ids", "active", "winner_index", "turncounter", "started", "_won_after", "_last_move", "_status")
+
+    def __init__(self, rows:int = 7, cols:int = 8, connect:int = 4) -> None:
+        """
+        Init a compact Connect 4 Game with an empty board and no registered players.
+
+        Parameters:
+            rows (int): Height of the Board (default 7)
+            cols (int): Width of the Board (default 8)
+            connect (int): Chips in a row needed to win (default 4)
+
+        Raises:
+            ValueError: if the size (max. MAX_SIDE per side, MAX_CELLS cells) or connect length is invalid
+        """
+        if (not 1 <= rows <= MAX_SIDE or not 1 <= cols <= MAX_SIDE or rows * cols > MAX_CELLS
+                or connect < 2 or connect > max(rows, cols)):
+            raise ValueError(f"Invalid board {rows}x{cols} with connect {connect}")
+
+        self.rows: int = rows
+        self.cols: int = cols
+        self.connect: int = connect
+        self.board: bytearray = bytearray(rows * cols)
+        self.heights: bytearray = bytearray(cols)
+        self.moves: bytearray = bytearray()
+        self.redo_stack: bytearray = bytearray()
+        self.player_ids: list = [None, None]
+        self.active: int = -1
+        self.winner_index: int = -1
+        self.turncounter: int = 0
+        self.started: float = time.time()
+        self._won_after: int = -1       # number of moves when the game was won (later moves change no status)
+        self._last_move: int = -1       # board index of the last chip, used by _detect_win
+        self._status = None             # cached status, None after a change
+
+    # Connect4 compatible views (built on access)
+
+    @property
+    def Board(self) -> CompactBoard:
+        return CompactBoard(self)
+
+    @property
+    def player1(self) -> dict:
+        return self._player(0)
+
+    @property
+    def player2(self) -> dict:
+        return self._player(1)
+
+    @property
+    def active_player(self) -> dict:
+        if self.active < 0:
+            return {"id": None, "icon": None}
+        return self._player(self.active)
+
+    @property
+    def winner(self) -> dict:
+        return self._player(self.winner_index) if self.winner_index >= 0 else None
+
+    @property
+    def undo_stack(self) -> list:
+        """
+        Undo entries in the format of Connect4.undo_stack
+        (column, row, active_id, active_icon, turncounter, winner), derived from the moves.
+        """
+        heights = bytearray(self.heights)
+        active, turncounter, winner = self.active, self.turncounter, self.winner_index
+        stack = []
+        for number in range(len(self.moves), 0, -1):
+            column = self.moves[number - 1]
+            heights[column] -= 1
+            if number == self._won_after:
+                winner = -1
+            elif winner < 0:
+                active = 1 - active
+                turncounter -= 1
+            stack.append((column, self.rows - 1 - heights[column], self.player_ids[active], ICONS[active],
+                          turncounter, self._player(winner) if winner >= 0 else None))
+        stack.reverse()
+        return stack
+
+    def _player(self, index:int) -> dict:
+        player_id = self.player_ids[index]
+        return {"id": player_id, "icon": ICONS[index]} if player_id is not None else None
+
+    def get_status(self) -> types.MappingProxyType:
+        """
+        returns the status of the game (active player, winner, turn number, draw, game over).
+        The status is built once per change and shared by all callers, so it is read-only.
+
+        Parameters:
+            None
+
+        Returns:
+            MappingProxyType: Actual Status of the Game (same keys as Connect4.get_status())
+        """
+        if self._status is None:
+            active = self.active_player
+            self._status = types.MappingProxyType({
+                "active_player": active["icon"],
+                "active_id": active["id"],
+                "winner": self.winner,
+                "turn number": self.turncounter,
+                "draw": self.is_draw(),
+                "game_over": self.is_over()
+            })
+        return self._status
+
+    def is_draw(self) -> bool:
+        """
+        Checks if the board is full without a winner (from the number of moves, no board scan).
+
+        Parameters:
+            None
+
+        Returns:
+            bool: True if the game is a draw
+        """
+        return self.winner_index < 0 and len(self.moves) >= self.rows * self.cols
+
+    def is_over(self) -> bool:
+        """
+        Checks if the game is finished (won, forfeited or a draw), no move is legal afterwards.
+
+        Parameters:
+            None
+
+        Returns:
+            bool: True if the game is finished
+        """
+        return self.winner_index >= 0 or len(self.moves) >= self.rows * self.cols
+
+    def register_player(self, player_id) -> str:
+        """
+        Registers a player as player1 ("X") or player2 ("O") and updates the status.
+
+        Parameters:
+            player_id: Unique ID
+
+        Returns:
+            icon (str): Player Icon (or None if both players are registered)
+        """
+        for index in (0, 1):
+            if self.player_ids[index] is None:
+                self.player_ids[index] = player_id
+                self.update_status()
+                return ICONS[index]
+        return None
+
+    def get_board(self) -> CompactBoard:
+        """
+        Returns a read-only view of the board (board[row, col], rows, tolist()).
+
+        Parameters:
+            None
+
+        Returns:
+            CompactBoard: view of the board
+        """
+        return CompactBoard(self)
+
+    def cell(self, row:int, col:int):
+        """
+        Returns the content of a cell.
+
+        Parameters:
+            row (int): row of the cell (0 is the top row)
+            col (int): column of the cell
+
+        Returns:
+            str or int: icon of the chip, 0 if the cell is empty
+        """
+        value = self.board[row * self.cols + col]
+        return ICONS[value - 1] if value else EMPTY
+
+    def check_move(self, column:int, player_Id) -> bool:
+        """
+        Checks if the game isn't finished, the player is registered and the column exists and has space left.
+
+        Parameters:
+            column (int): Selected Column of Coin Drop
+            player_Id: Player ID
+
+        Returns:
+            bool: True if the move is valid
+        """
+        if player_Id is None or player_Id not in self.player_ids or self.is_over():
+            return False
+        return 0 <= column < self.cols and self.heights[column] < self.rows
+
+    def update_status(self) -> None:
+        """
+        Updates winner, active player and turn number after a move or registration.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        if self.winner_index < 0 and self.active >= 0 and self._detect_win():
+            self.winner_index = self.active
+            self._won_after = len(self.moves)
+        self._last_move = -1
+
+        if self.winner_index < 0:
+            self.turncounter += 1
+            self.active = 1 if self.active == 0 else 0
+        self._status = None
+
+    def drop_chip(self, column:int, icon:str) -> int:
+        """
+        Drops a chip into the lowest free cell of a column and saves the move.
+        The move has to be checked with check_move() before.
+
+        Parameters:
+            column (int): Selected Column
+            icon (str): Icon of the player who drops the chip
+
+        Returns:
+            int: Row where the chip landed
+        """
+        row = self.rows - 1 - self.heights[column]
+        self._last_move = row * self.cols + column
+        self.board[self._last_move] = ICONS.index(icon) + 1
+        self.heights[column] += 1
+        self.moves.append(column)
+        self._status = None
+        return row
+
+    def play(self, column:int) -> bool:
+        """
+        Makes a move for the active player: checks the column, drops the chip and updates the status.
+
+        Parameters:
+            column (int): Selected Column
+
+        Returns:
+            bool: True if the move was made, False if the column is full or invalid
+        """
+        if self.winner_index >= 0 or self.active < 0 or not 0 <= column < self.cols or self.heights[column] >= self.rows:
+            return False
+        self.drop_chip(column, ICONS[self.active])
+        self.update_status()
+        self.redo_stack.clear()
+        return True
+
+    def undo(self) -> int:
+        """
+        Takes back the last move and restores active player, turn counter and winner.
+        The winning move only set the winner, moves after it changed nothing,
+        every other move changed the active player and turn counter.
+
+        Parameters:
+            None
+
+        Returns:
+            int: Column of the move taken back (None if there is no move)
+        """
+        if not self.moves:
+            return None
+        column = self.moves.pop()
+        self.heights[column] -= 1
+        self.board[(self.rows - 1 - self.heights[column]) * self.cols + column] = EMPTY
+        if len(self.moves) + 1 == self._won_after:
+            self.winner_index = -1
+            self._won_after = -1
+        elif self.winner_index < 0:
+            self.active = 1 - self.active
+            self.turncounter -= 1
+        self._last_move = -1
+        self._status = None
+        self.redo_stack.append(column)
+        return column
+
+    def redo(self) -> int:
+        """
+        Makes the last move taken back with undo() again (for the active player).
+
+        Parameters:
+            None
+
+        Returns:
+            int: Column of the move (None if there is nothing to redo)
+        """
+        if not self.redo_stack:
+            return None
+        column = self.redo_stack.pop()
+        self.drop_chip(column, ICONS[self.active])
+        self.update_status()
+        return column
+
+    def forfeit(self, player_Id) -> bool:
+        """
+        Ends the game because the player gave up or ran out of time: the opponent wins.
+        A forfeit isn't a move, it stays in place if moves are taken back.
+
+        Parameters:
+            player_Id: ID of the player who forfeits
+
+        Returns:
+            bool: True if the game was ended, False if it is already finished or the player is unknown
+        """
+        if self.is_over() or None in self.player_ids or player_Id not in self.player_ids:
+            return False
+        self.winner_index = 1 - self.player_ids.index(player_Id)
+        self._won_after = 0             # no move number -> undo() never clears the winner
+        self._status = None
+        return True
+
+    def reset(self) -> None:
+        """
+        Starts a new game with the same board size and players. player1 starts
+        (like Connect4.reset, a new game on the server starts with player2).
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.board = bytearray(self.rows * self.cols)
+        self.heights = bytearray(self.cols)
+        self.moves = bytearray()
+        self.redo_stack = bytearray()
+        registered = sum(player_id is not None for player_id in self.player_ids)
+        self.turncounter = registered
+        self.active = 0 if registered else -1
+        self.winner_index = -1
+        self._won_after = -1
+        self.started = time.time()
+        self._last_move = -1
+        self._status = None
+
+    def get_config(self) -> dict:
+        """
+        Returns the size of the board and the number of chips in a row needed to win.
+
+        Parameters:
+            None
+
+        Returns:
+            dict: rows, cols and connect
+        """
+        return {"rows": self.rows, "cols": self.cols, "connect": self.connect}
+
+    def to_snapshot(self) -> dict:
+        """
+        Returns the state of the game in the format of Connect4.to_snapshot(),
+        so journals and snapshots work with both classes.
+
+        Parameters:
+            None
+
+        Returns:
+            dict: compact state of the game
+        """
+        return {
+            "board": ["".join(ICONS[cell - 1] if cell else "." for cell in self.board[start:start + self.cols])
+                      for start in range(0, len(self.board), self.cols)],
+            "connect": self.connect,
+            "player1": self.player1,
+            "player2": self.player2,
+            "active_player": self.active_player,
+            "turncounter": self.turncounter,
+            "winner": ICONS[self.winner_index] if self.winner_index >= 0 else None,
+            "moves": list(self.moves),
+            "started": self.started,
+            "undo": [[column, row, active_id, active_icon, turncounter, winner["icon"] if winner else None]
+                     for column, row, active_id, active_icon, turncounter, winner in self.undo_stack]
+        }
+
+    @classmethod
+    def from_snapshot(cls, state:dict) -> "CompactConnect4":
+        """
+        Creates a game from a state made by to_snapshot() (of this class or of Connect4).
+
+        Parameters:
+            state (dict): compact state of the game
+
+        Returns:
+            CompactConnect4: restored game
+        """
+        rows, cols = len(state["board"]), len(state["board"][0])
+        game = cls(rows, cols, state.get("connect", 4))
+        for row, cells in enumerate(state["board"]):
+            for col, cell in enumerate(cells):
+                if cell != ".":
+                    game.board[row * cols + col] = ICONS.index(cell) + 1
+                    game.heights[col] += 1
+        for index, player in enumerate((state["player1"], state["player2"])):
+            if player:
+                game.player_ids[index] = player["id"]
+        icon = state["active_player"]["icon"]
+        game.active = ICONS.index(icon) if icon else -1
+        game.winner_index = ICONS.index(state["winner"]) if state["winner"] else -1
+        if state["winner"]:
+            #the first undo entry with a winner belongs to the first move after the winning move
+            undo = state.get("undo", [])
+            game._won_after = next((number for number, entry in enumerate(undo) if entry[5]), len(undo))
+        game.turncounter = state["turncounter"]
+        game.moves = bytearray(state.get("moves", []))
+        game.started = state.get("started", game.started)
+        return game
+
+    def _detect_win(self) -> bool:
+        """
+        Detects if the active player has `connect` chips in a row. Only the lines through
+        the last chip are checked if it's known, otherwise the whole board is scanned.
+
+        Parameters:
+            None
+
+        Returns:
+            bool: True if there's a winner, False otherwise
+        """
+        value = self.active + 1
+        if self._last_move >= 0 and self.board[self._last_move] == value:
+            return self._line_through(*divmod(self._last_move, self.cols), value)
+        return any(cell == value and self._line_through(*divmod(index, self.cols), value)
+                   for index, cell in enumerate(self.board))
+
+    def _line_through(self, row:int, col:int, value:int) -> bool:
+        """
+        Checks if the chip at (row, col) is part of `connect` chips of the same player in a row
+        (horizontally, vertically or diagonally).
+
+        Parameters:
+            row (int): Row of the chip
+            col (int): Column of the chip
+            value (int): cell value of the player (index + 1)
+
+        Returns:
+            bool: True if there are enough chips in a row
+        """
+        rows, cols, board = self.rows, self.cols, self.board
+        for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            for sign in (1, -1):
+                r, c = row + sign * d_row, col + sign * d_col
+                while 0 <= r < rows and 0 <= c < cols and board[r * cols + c] == value:
+                    count += 1
+                    r += sign * d_row
+                    c += sign * d_col
+            if count >= self.connect:
+                return True
+        return False
+
+
+def measure_memory(game_class, games:int = 10000, moves:int = 20, seed:int = 1) -> dict:
+    """
+    Measures the memory per hosted game with tracemalloc: creates `games` games with two
+    registered players, plays `moves` random moves in each and asks every game for its status.
+    The player ids are created before the measurement (they cost the same in both classes).
+
+    Parameters:
+        game_class: Connect4 or CompactConnect4
+        games (int): number of games (default 10000)
+        moves (int): random moves per game (default 20)
+        seed (int): seed of the random moves (default 1)
+
+    Returns:
+        dict: games, total bytes and bytes per game
+    """
+    rng = random.Random(seed)
+    ids = [(f"player-{number}-1", f"player-{number}-2") for number in range(games)]
+    columns = [[rng.randrange(8) for _ in range(moves * 2)] for _ in range(games)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    hosted = []
+    for (id1, id2), choices in zip(ids, columns):
+        game = game_class()
+        game.register_player(id1)
+        game.register_player(id2)
+        played = 0
+        for column in choices:
+            if played == moves or game.winner:
+                break
+            player_id = game.active_player["id"]
+            if game.check_move(column, player_id):
+                game.drop_chip(column, game.active_player["icon"])
+                game.update_status()
+                played += 1
+        game.get_status()
+        hosted.append(game)
+    total = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return {"games": games, "bytes": total, "bytes_per_game": total / games}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory per hosted game of Connect4 and CompactConnect4")
+    parser.add_argument("--games", type=int, default=10000, help="number of games (default 10000)")
+    parser.add_argument("--moves", type=int, default=20, help="random moves per game (default 20)")
+    args = parser.parse_args()
+
+    from game import Connect4
+    for game_class in (Connect4, CompactConnect4):
+        result = measure_memory(game_class, args.games, args.moves)
+        print(f"{game_class.__name__}: {result['bytes_per_game']:.0f} bytes per game "
+              f"({result['bytes'] / 2**20:.1f} MiB for {result['games']} games)")
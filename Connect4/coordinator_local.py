@@ -1,6 +1,25 @@
+import time
+import random
+from typing import NamedTuple
 from game import Connect4
+from bots import get_strategy
 from player_local import Player_Local
-from player_local_raspi import Player_Raspi_Local
+
+
+class GameResult(NamedTuple):
+    """
+    Result of a headless game.
+
+    Attributes:
+        winner (str):   icon of the winner ("X" or "O", None for a draw)
+        draw (bool):    True if the board is full without a winner
+        forfeit (bool): True if the loser returned an illegal column
+        moves (list):   played columns (in order)
+    """
+    winner: str
+    draw: bool
+    forfeit: bool
+    moves: list
 
 
 class Coordinator_Local:
@@ -15,37 +34,55 @@ class Coordinator_Local:
         game (Connect4): Local Instance of a Connect4 Game
         player1 (Player_Local or Player_Raspi_Local): Local Instance of a Player
         player2 (Player_Local or Player_Raspi_Local): Local Instance of a Player
+        animations (AnimationScheduler): Animation scheduler of the SenseHat (None if not on raspi)
 
     Methods:
         def play(self)
-            Runs the game until theres a winner
+            Runs the game until theres a winner or the board is full
+        def play_headless(self, strategy1, strategy2, rng) -> GameResult
+            Plays one game between two strategies without any input or rendering
+        def play_many(self, strategy1, strategy2, games, seed) -> dict
+            Plays many headless games back-to-back on the same game engine
+        def wait_for_animations(self)
+            Waits until the SenseHat animations are finished
 
     """
     
 
-    def __init__(self, on_raspi:bool = False) -> None:
+    def __init__(self, on_raspi:bool = False, rows:int = 7, cols:int = 8, connect:int = 4) -> None:
         """
         Initialize the Coordinator_Local with a Game and 2 Players
 
         Parameters:
             on_raspi (bool): If game is played on raspi (default False)
+            rows (int): Height of the Board (default 7)
+            cols (int): Width of the Board (default 8)
+            connect (int): Chips in a row needed to win (default 4)
 
         Returns:
             None
 
         """
-        self.game: Connect4 = Connect4()
+        self.game: Connect4 = Connect4(rows, cols, connect)
         self.player1: Player_Local = Player_Local(game = self.game)
         self.player2: Player_Local = Player_Local(game = self.game)
-        self.sense: SenseHat = None
+        self.sense = None                           # SenseHatRenderer (only on raspi)
+        self.animations = None                      # AnimationScheduler (only on raspi)
         
 
         if on_raspi:
             try:
                 from sense_hat import SenseHat
-                self.sense = SenseHat()
-                self.player1: Player_Raspi_Local = Player_Raspi_Local(game = self.game,sense = self.sense)
-                self.player2: Player_Raspi_Local = Player_Raspi_Local(game = self.game,sense = self.sense)
+                #the SenseHat modules are only loaded on the raspi (faster start of CLI games)
+                from player_local_raspi import Player_Raspi_Local
+                from render import SenseHatRenderer
+                from animation import AnimationScheduler
+                from joystick import JoystickInput
+                self.sense = SenseHatRenderer(SenseHat())      # one diff-based renderer for the SenseHat
+                self.animations = AnimationScheduler(self.sense)   # one animation scheduler for both players
+                joystick = JoystickInput(self.sense.stick)          # one joystick reader for both players
+                self.player1: Player_Raspi_Local = Player_Raspi_Local(game = self.game,sense = self.sense, animations = self.animations, joystick = joystick)
+                self.player2: Player_Raspi_Local = Player_Raspi_Local(game = self.game,sense = self.sense, animations = self.animations, joystick = joystick)
             except ImportError:
                 raise RuntimeError("SenseHat Library not available. Make sure you're on a Raspberry Pi")
         
@@ -95,6 +132,14 @@ class Coordinator_Local:
                 if winner_found != None:
                     self.player1.visualize()
                     self.player1.celebrate_win()
+                    self.wait_for_animations()
+                    return
+
+                #a full board without a winner is a draw
+                if self.game.is_draw():
+                    self.player1.visualize()
+                    print("\033[1m" + "Draw, the board is full!" + "\033[0m")
+                    self.wait_for_animations()
                     return
                 
             #checking if its player2 turn    
@@ -113,9 +158,94 @@ class Coordinator_Local:
                 if winner_found != None:
                     self.player2.visualize()
                     self.player2.celebrate_win()
+                    self.wait_for_animations()
+                    return
+
+                #a full board without a winner is a draw
+                if self.game.is_draw():
+                    self.player2.visualize()
+                    print("\033[1m" + "Draw, the board is full!" + "\033[0m")
+                    self.wait_for_animations()
                     return
                 
 
+    def play_headless(self, strategy1, strategy2, rng:random.Random = None) -> GameResult:
+        """
+        Plays one game between two strategies on the game engine of the coordinator:
+        no input, no rendering. The engine is reset before the game, so it is reused
+        for every game. player1 ("X", strategy1) starts. A strategy which returns an
+        illegal column loses the game.
+
+        Parameters:
+            strategy1: strategy of player1, callable(board_np, icon, rng, connect) -> column or a name (see bots.get_strategy)
+            strategy2: strategy of player2 (same as strategy1)
+            rng (random.Random): random generator for the strategies (default None -> new generator)
+
+        Returns:
+            GameResult: winner, draw, forfeit and played columns
+        """
+        game = self.game
+        if game.player1 is None:
+            game.register_player(self.player1.id)
+        if game.player2 is None:
+            game.register_player(self.player2.id)
+        game.reset()
+
+        rng = rng or random.Random()
+        strategies = {game.player1["icon"]: get_strategy(strategy1) if isinstance(strategy1, str) else strategy1,
+                      game.player2["icon"]: get_strategy(strategy2) if isinstance(strategy2, str) else strategy2}
+
+        while True:
+            icon = game.active_player["icon"]
+            column = strategies[icon](game.Board, icon, rng, game.connect)
+
+            #illegal move -> the other player wins
+            if column is None or not game.play(int(column)):
+                winner = game.player2["icon"] if icon == game.player1["icon"] else game.player1["icon"]
+                return GameResult(winner, False, True, game.moves)
+            if game.winner:
+                return GameResult(game.winner["icon"], False, False, game.moves)
+            if game.is_draw():
+                return GameResult(None, True, False, game.moves)
+
+    def play_many(self, strategy1, strategy2, games:int, seed:int = None) -> dict:
+        """
+        Plays many headless games back-to-back on the same game engine.
+
+        Parameters:
+            strategy1: strategy of player1 (see play_headless)
+            strategy2: strategy of player2 (see play_headless)
+            games (int): number of games
+            seed (int): seed of the random generator (default None -> random games)
+
+        Returns:
+            dict: number of games won by "X" and "O", draws, forfeits and games per second
+        """
+        rng = random.Random(seed)
+        counts = {"X": 0, "O": 0, "draw": 0, "forfeit": 0}
+        start = time.perf_counter()
+        for _ in range(games):
+            result = self.play_headless(strategy1, strategy2, rng)
+            counts["draw" if result.draw else result.winner] += 1
+            counts["forfeit"] += result.forfeit
+        elapsed = time.perf_counter() - start
+        counts["games_per_second"] = games / elapsed if elapsed > 0 else float("inf")
+        return counts
+
+    def wait_for_animations(self) -> None:
+        """
+        Waits until the SenseHat animations (e.g. the celebration) are finished.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        if self.animations is not None:
+            self.animations.wait_idle()
+
+
 #gets called when running the coordinator_local-py
 if __name__ == "__main__":
 
@@ -1,6 +1,5 @@
 from time import sleep
 from player_remote import Player_Remote
-from player_remote_raspi import Player_Raspi_Remote
 
 
 class Coordinator_Remote:
@@ -16,33 +15,58 @@ class Coordinator_Remote:
     Attributes:
         api_url (str):      Address of Server, including Port Bsp: http://10.147.17.27:5000
         player (Player):    Local Instance of ONE remote Player (Raspi or Normal)
-        sense (SenseHat):   Optional Local Instance of a SenseHat (if on Raspi)
+        sense (SenseHatRenderer): Optional diff-based renderer of the local SenseHat (if on Raspi)
+        lobby (bool):       Find the opponent through the lobby of the server (new game) instead of registering
+        rating (float):     Rating of the player for the pairing in the lobby (None -> first come, first served)
+        tcp_port (int):     Port of the binary TCP protocol of the server (None -> HTTP only)
 
     Methods:
         wait_for_second_player(self)
             Waits for the second player to connect
         play(self)
             Main function to playe the game
+        wait_for_animations(self)
+            Waits until the SenseHat animations are finished
     """
 
-    def __init__(self, api_url:str, on_raspi:bool, bot:bool) -> None:
+    def __init__(self, api_url:str, on_raspi:bool, bot:bool, game_id:str = None,
+                 lobby:bool = False, rating:float = None, tcp_port:int = None) -> None:
         """
         Initializes the Coordinator_Remote.
 
         Parameters:
             api_url (str):      Address of Server, including Port
             on_raspi(bool):     True when player on raspi, False when not
+            game_id (str):      Game on the server (default None -> default game)
+            lobby (bool):       Get paired into a new game by the lobby of the server (default False)
+            rating (float):     Rating for the pairing in the lobby (default None)
+            tcp_port (int):     Play over the binary TCP protocol on this port (default None -> HTTP)
         """
         self.api_url: str = api_url
-        self.player: Player_Remote = Player_Remote(api_url)
+        self.tcp_port: int = tcp_port
+        if tcp_port is not None:
+            #pushed game changes over one open connection instead of polling with HTTP requests
+            from player_remote_tcp import Player_Remote_TCP
+            self.player: Player_Remote = Player_Remote_TCP(api_url, tcp_port = tcp_port, game_id = game_id)
+        else:
+            self.player: Player_Remote = Player_Remote(api_url, game_id = game_id)
         self.on_raspi: bool = on_raspi
         self.bot: bool = bot
+        self.lobby: bool = lobby
+        self.rating: float = rating
         
         if self.on_raspi:
             try:
                 from sense_hat import SenseHat
-                self.sense: SenseHat = SenseHat()
-                self.player: Player_Raspi_Remote = Player_Raspi_Remote(api_url = api_url,sense = self.sense)
+                #the SenseHat modules are only loaded on the raspi (faster start of CLI clients)
+                from player_remote_raspi import Player_Raspi_Remote, Player_Raspi_Remote_TCP
+                from render import SenseHatRenderer
+                self.sense: SenseHatRenderer = SenseHatRenderer(SenseHat())     # diff-based renderer for the SenseHat
+                if tcp_port is not None:
+                    self.player: Player_Raspi_Remote = Player_Raspi_Remote_TCP(api_url = api_url, sense = self.sense,
+                                                                               game_id = game_id, tcp_port = tcp_port)
+                else:
+                    self.player: Player_Raspi_Remote = Player_Raspi_Remote(api_url = api_url,sense = self.sense, game_id = game_id)
                 
             except ImportError:
                 raise RuntimeError("SenseHat Library not available. Make sure you're on a Raspberry Pi")
@@ -75,7 +99,8 @@ class Coordinator_Remote:
 
 
         This method manages the game loop, where players take turns making moves,
-        checks for a winner, and visualizes the game board.
+        checks for a winner or a draw, and visualizes the game board.
+        A finished game ends the loop at once (no more requests to the server).
 
         Parameters:
             None
@@ -83,49 +108,85 @@ class Coordinator_Remote:
         Returns:
             None
         """
-        #register the player into the game
-        self.player.register_in_game()
+        #register the player into the game (the lobby returns once the opponent is registered as well)
+        if self.lobby:
+            self.player.join_lobby(self.rating)
+        else:
+            self.player.register_in_game()
         
         while True:
             #wait till booth player are registered
             if self.wait_for_second_player():
+                #one status per round: a draw ends the game for both players (nobody can move anymore)
+                status = self.player.get_game_status()
+                if not status:
+                    continue
+                if self.player.is_draw(status):
+                    self.player.visualize()
+                    print("\033[1m" + "Draw, the board is full!" + "\033[0m")
+                    self.wait_for_animations()
+                    return
+                #the game is won (by a move or because a player ran out of time)
+                if status.get("winner"):
+                    if status["winner"].get("icon") == self.player.icon:
+                        self.player.celebrate_win()
+                        self.wait_for_animations()
+                        return
+                    if self.on_raspi:
+                        self.player.loser()
+                    self.player.visualize()
+                    #Visualize the board for 5 more seconds after a win (queued after the message)
+                    if self.on_raspi:
+                        from render import BLACK
+                        from animation import hold
+                        animations = self.player.animations
+                        animations.play(hold(animations.base_frame, 5, animations.fps), "final board")
+                        animations.show([BLACK] * 64)
+                    print("\033[1m" + "You have lost the Game!" + "\033[0m")
+                    self.wait_for_animations()
+                    return
                 #wait till it's the players turn
-                if self.player.is_my_turn():
+                if status.get("active_player") == self.player.icon:
                     print("\033[1m" + "It's your turn!" + "\033[0m")
                     self.player.visualize()
                     if self.bot:
                         self.player.make_move_with_bot()
-                        self.player.visualize()
-                        #checking for a Win
-                        if self.player.get_game_status().get("winner"):
-                            self.player.celebrate_win()
-                            return
                     else:
                         self.player.make_move()
-                        self.player.visualize()
-                        #checking for a Win
-                        if self.player.get_game_status().get("winner"):
-                            self.player.celebrate_win()
-                            return
-                    print("Waiting on other Player to make his move...")
-                #checking if the other player has won
-                elif not self.player.is_my_turn():
-                    if self.player.get_game_status().get("winner"):
-                        if self.on_raspi:
-                            self.player.loser()
-                        self.player.visualize()
-                        #Visualize the board for 5 more seconds after a win
-                        if self.on_raspi:
-                            sleep(5)
-                            self.player.sense.clear()
-                        print("\033[1m" + "You have lost the Game!" + "\033[0m")
+                    #the answer to the move has the new board and the winner (older servers: requested again)
+                    state = self.player.last_state
+                    self.player.visualize(self.player.last_board())
+                    state = state if state is not None else self.player.get_game_status()
+                    #checking for a Win or a Draw
+                    if state.get("winner"):
+                        self.player.celebrate_win()
+                        self.wait_for_animations()
+                        return
+                    if self.player.is_draw(state):
+                        print("\033[1m" + "Draw, the board is full!" + "\033[0m")
+                        self.wait_for_animations()
                         return
-                    #check if second player has already registered
-                    elif self.player.get_game_status().get("turn_number") == 2:
-                        print("Your opponent registered to the game! Wait now till he made his first move.")
-                        sleep(2)
+                    print("Waiting on other Player to make his move...")
+                #check if second player has already registered
+                elif status.get("turn_number") == 2:
+                    print("Your opponent registered to the game! Wait now till he made his first move.")
+                    sleep(2)
                     
 
+    def wait_for_animations(self) -> None:
+        """
+        Waits until the SenseHat animations (e.g. the celebration) are finished.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        if self.on_raspi:
+            self.player.animations.wait_idle()
+
+
 # To start a game
 if __name__ == "__main__":
     #api_url = "http://192.168.1.104:5000"  # Connect 4 API server URL
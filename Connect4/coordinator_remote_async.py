@@ -0,0 +1,277 @@
+import asyncio
+import uuid
+import aiohttp
+import numpy as np
+
+from player_remote_async import Player_Remote_Async, read_json
+from bots import get_strategy
+from search import rows_board
+
+
+class Coordinator_Remote_Async:
+    """
+    Coordinator for one async Remote player (asyncio variant of Coordinator_Remote).
+
+    Same game flow as Coordinator_Remote, but waiting never blocks: many coordinators
+    can run in one event loop (see run_bot_farm) and every game can be cancelled.
+
+    Attributes:
+        api_url (str):                  Address of Server, including Port Bsp: http://10.147.17.27:5000
+        player (Player_Remote_Async):   The player of this coordinator
+        bot (bool):                     True when the bot plays, False for CLI input
+        verbose (bool):                 Print the board and messages to the CLI
+
+    Methods:
+        play(self) -> str
+            Main coroutine to play the game, returns "won", "lost" or "draw"
+    """
+
+    def __init__(self, api_url:str, bot:bool = True, game_id:str = None, session:aiohttp.ClientSession = None,
+                 poll_interval:float = 0.5, strategy:str = "heuristic", verbose:bool = True) -> None:
+        """
+        Initializes the Coordinator_Remote_Async.
+
+        Parameters:
+            api_url (str):          Address of Server, including Port
+            bot (bool):             True when the bot plays (default True)
+            game_id (str):          Game on the server (default None -> default game)
+            session (aiohttp.ClientSession): Shared session (default None -> own session of the player)
+            poll_interval (float):  Seconds between two status requests while waiting (default 0.5)
+            strategy (str):         Bot strategy (default "heuristic")
+            verbose (bool):         Print the board and messages (default True)
+        """
+        self.api_url: str = api_url
+        self.player: Player_Remote_Async = Player_Remote_Async(api_url, game_id = game_id, session = session,
+                                                               poll_interval = poll_interval, strategy = strategy)
+        self.bot: bool = bot
+        self.verbose: bool = verbose
+
+    async def play(self) -> str:
+        """
+        Main coroutine to play the game: registers the player, waits for the turns
+        and makes the moves until the game is won, lost or the board is full.
+        Cancelling the task stops the game and closes the player's own session.
+
+        Parameters:
+            None
+
+        Returns:
+            str: "won", "lost" or "draw"
+        """
+        try:
+            await self.player.register_in_game()
+            while True:
+                status = await self.player.wait_for_turn()
+                if status.get("winner"):
+                    return await self._finish("won" if status["winner"].get("icon") == self.player.icon else "lost")
+                if status.get("draw"):
+                    return await self._finish("draw")
+
+                if self.verbose:
+                    print("\033[1m" + "It's your turn!" + "\033[0m")
+                    await self.player.visualize()
+
+                if self.bot:
+                    column = await self.player.make_move_with_bot()
+                    if column is None:
+                        #move rejected (e.g. the board changed) -> look again at the next status
+                        await asyncio.sleep(self.player.poll_interval)
+                        continue
+                else:
+                    await self.player.make_move()
+
+                #the answer to the move has the new state: a win or a full board ends the game without polling
+                state = self.player.last_state
+                if state is not None:
+                    if state.get("winner"):
+                        return await self._finish("won" if state["winner"].get("icon") == self.player.icon else "lost",
+                                                  self.player.last_board())
+                    if state.get("draw"):
+                        return await self._finish("draw", self.player.last_board())
+
+                if self.verbose:
+                    await self.player.visualize(self.player.last_board())
+                    print("Waiting on other Player to make his move...")
+        finally:
+            await self.player.close()
+
+    async def _finish(self, result:str, board:list = None) -> str:
+        """
+        Shows the end of the game (if verbose) and returns the result.
+        The board is requested unless the caller has it (e.g. from the answer to the last move).
+        """
+        if self.verbose:
+            await self.player.visualize(board)
+            if result == "won":
+                await self.player.celebrate_win()
+            elif result == "lost":
+                print("\033[1m" + "You have lost the Game!" + "\033[0m")
+            else:
+                print("\033[1m" + "Draw, the board is full!" + "\033[0m")
+        return result
+
+
+async def run_bot_farm(api_url:str, games:int, rows:int = 7, cols:int = 8, connect:int = 4,
+                       poll_interval:float = 0.2, strategies:tuple = ("heuristic", "heuristic"),
+                       max_connections:int = 100) -> dict:
+    """
+    Plays many bot games at once in one process: creates the games on the server and
+    lets two async bot players play each game. All players share one session.
+
+    Parameters:
+        api_url (str):          Address of Server, including Port
+        games (int):            Number of games
+        rows (int):             Height of the boards (default 7)
+        cols (int):             Width of the boards (default 8)
+        connect (int):          Chips in a row needed to win (default 4)
+        poll_interval (float):  Seconds between two status requests while waiting (default 0.2)
+        strategies (tuple):     Strategies of the first and the second player
+        max_connections (int):  Max. open connections to the server (default 100)
+
+    Returns:
+        dict: number of "won", "lost" and "draw" results (seen from the first player of each game)
+    """
+    connector = aiohttp.TCPConnector(limit = max_connections)
+    async with aiohttp.ClientSession(connector = connector) as session:
+        config = {"rows": rows, "cols": cols, "connect": connect}
+        game_ids = []
+        for _ in range(games):
+            async with session.post(f"{api_url}/connect4/new_game", json = config) as response:
+                game_ids.append((await response.json())["game_id"])
+
+        first_players = [Coordinator_Remote_Async(api_url, game_id = game_id, session = session, poll_interval = poll_interval,
+                                                  strategy = strategies[0], verbose = False) for game_id in game_ids]
+        second_players = [Coordinator_Remote_Async(api_url, game_id = game_id, session = session, poll_interval = poll_interval,
+                                                   strategy = strategies[1], verbose = False) for game_id in game_ids]
+        #the first players register first (-> "X") before the second players start
+        first_tasks = [asyncio.create_task(coordinator.play()) for coordinator in first_players]
+        await asyncio.sleep(0)
+        while any(coordinator.player.icon is None for coordinator in first_players) and not all(task.done() for task in first_tasks):
+            await asyncio.sleep(0.01)
+        results = await asyncio.gather(*first_tasks, *[coordinator.play() for coordinator in second_players])
+
+    counts = {"won": 0, "lost": 0, "draw": 0}
+    for result in results[:games]:
+        counts[result] += 1
+    return counts
+
+
+async def run_batch_bot_farm(api_url:str, games:int, rows:int = 7, cols:int = 8, connect:int = 4,
+                             strategies:tuple = ("heuristic", "heuristic"), batch_size:int = 500,
+                             max_retries:int = 3) -> dict:
+    """
+    Plays many bot games at once like run_bot_farm, but with the batch endpoints: after
+    the games are set up, one /connect4/batch/moves request per round makes the moves of
+    all running games and returns their new states (with the board), which already
+    tell the bots of the next round whose turn it is. Instead of a /status and a /board
+    poll per player and a /make_move per move, a round costs one request per batch_size games.
+    A rejected move is made again with another free column; a game whose moves are rejected
+    max_retries times in a row is given up.
+
+    Parameters:
+        api_url (str):          Address of Server (or shard router), including Port
+        games (int):            Number of games
+        rows (int):             Height of the boards (default 7)
+        cols (int):             Width of the boards (default 8)
+        connect (int):          Chips in a row needed to win (default 4)
+        strategies (tuple):     Strategies of the first and the second player
+        batch_size (int):       Moves per batch request (default 500, max. Connect4Server.MAX_BATCH)
+        max_retries (int):      Rejected moves in a row after which a game is given up (default 3)
+
+    Returns:
+        dict: number of "won", "lost" and "draw" results (seen from the first player of each game),
+              of the games given up ("aborted") and the number of "requests" of the rounds
+    """
+    bots = [get_strategy(strategy) for strategy in strategies]
+    counts = {"won": 0, "lost": 0, "draw": 0, "aborted": 0, "requests": 0}
+    async with aiohttp.ClientSession() as session:
+        config = {"rows": rows, "cols": cols, "connect": connect}
+        players = {}            # game_id -> ids of the first and the second player
+        for _ in range(games):
+            _, response = await _post(session, f"{api_url}/connect4/new_game", config)
+            game_id = response["game_id"]
+            players[game_id] = [f"farm-{uuid.uuid4()}", f"farm-{uuid.uuid4()}"]
+            for player_id in players[game_id]:
+                await _post(session, f"{api_url}/connect4/register", {"game_id": game_id, "player_id": player_id})
+
+        states = {}             # game_id -> latest state of a running game
+        rejected = {}           # game_id -> columns rejected in the current turn
+        pending = list(players)
+        while pending or states:
+            #games without a known state (new or rejected move) are read in batches
+            for start in range(0, len(pending), batch_size):
+                chunk = pending[start:start + batch_size]
+                _, response = await _post(session, f"{api_url}/connect4/batch/status", {"game_ids": chunk, "board": True})
+                counts["requests"] += 1
+                states.update((result["game_id"], result["state"]) for result in response["results"] if result["ok"])
+            pending = []
+
+            moves = []
+            for game_id, state in list(states.items()):
+                first, second = players[game_id]
+                if state["game_over"]:
+                    winner = state["winner"]
+                    counts["draw" if not winner else "won" if winner["id"] == first else "lost"] += 1
+                    del states[game_id]
+                    continue
+                bot = bots[0] if state["active_id"] == first else bots[1]
+                column = bot(np.array(rows_board(state["board"]), dtype=object), state["active_player"], connect = connect)
+                tried = rejected.get(game_id, ())
+                if column is None or int(column) in tried:
+                    #the bot insists on a rejected column -> the first other column with space left
+                    free = [col for col, cell in enumerate(state["board"][0]) if cell == "." and col not in tried]
+                    column = free[0] if free else None
+                if column is None or len(tried) >= max_retries:
+                    counts["aborted"] += 1
+                    del states[game_id]
+                    continue
+                moves.append({"game_id": game_id, "player_id": state["active_id"], "column": int(column)})
+
+            for start in range(0, len(moves), batch_size):
+                chunk = moves[start:start + batch_size]
+                _, response = await _post(session, f"{api_url}/connect4/batch/moves", {"moves": chunk})
+                counts["requests"] += 1
+                #the results come in the order of the moves
+                for move, result in zip(chunk, response["results"]):
+                    if result["ok"]:
+                        states[result["game_id"]] = result["state"]
+                        rejected.pop(result["game_id"], None)
+                    else:
+                        #read the game again, the next move avoids the rejected column
+                        del states[result["game_id"]]
+                        rejected.setdefault(result["game_id"], set()).add(move["column"])
+                        pending.append(result["game_id"])
+    return counts
+
+
+async def _post(session:aiohttp.ClientSession, url:str, data:dict) -> tuple[int, dict]:
+    """
+    Sends a POST request and returns the status code and the JSON response.
+    On 429 (too many requests) it waits like Player_Remote_Async._request.
+    """
+    backoff = 1.0
+    while True:
+        async with session.post(url, json = data) as response:
+            if response.status != 429:
+                return response.status, await read_json(response)
+            try:
+                retry_after = float(response.headers.get("Retry-After", backoff))
+            except ValueError:
+                retry_after = backoff
+        await asyncio.sleep(min(max(retry_after, backoff), Player_Remote_Async.MAX_BACKOFF))
+        backoff = min(backoff * 2, Player_Remote_Async.MAX_BACKOFF)
+
+
+# To start a game
+if __name__ == "__main__":
+    api_url = "http://127.0.0.1:5000"
+
+    # One bot player in the default game (like Coordinator_Remote with bot=True)
+    c_remote = Coordinator_Remote_Async(api_url=api_url, bot=True)
+    asyncio.run(c_remote.play())
+
+    # Or: 100 bot games in this single process
+    # print(asyncio.run(run_bot_farm(api_url, games=100)))
+
+    # Or: 100 bot games with one batch request per round
+    # print(asyncio.run(run_batch_bot_farm(api_url, games=100)))
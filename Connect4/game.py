@@ -1,6 +1,9 @@
+import time
 import uuid
 import numpy as np
 
+from compact_game import MAX_SIDE, MAX_CELLS
+
 
 class Connect4:
     """
@@ -31,10 +34,26 @@ class Connect4:
                 Number of turns
             winner:dict
                 If theres a winner the dict of active_player is set to te Attribute
+            moves:list
+                Columns of all moves made so far (in order)
+            started:float
+                Timestamp when the game was created
+            connect:int
+                Number of chips in a row needed to win
+            heights:list
+                Number of chips in every column (next free cell without scanning the column)
+            undo_stack:list
+                One entry per dropped chip with everything needed to take the move back
+            redo_stack:list
+                Columns of the moves taken back with undo() (cleared by a new move)
 
         Methods:
         get_status()
             returns the Status of the game who is active and is there a winner and which turn is it
+        is_draw() -> bool
+            Checks in O(1) if the board is full without a winner
+        is_over() -> bool
+            Checks in O(1) if the game is finished (won or draw)
         register_player(self, player_id:uuid.UUID)->str
             registers a player with the uuid and returns icon
         get_board()
@@ -43,35 +62,69 @@ class Connect4:
             Checks if a move of a certain player is legal and not and if its the players turn
         update_status()
             Makes a Status Update of the game
+        drop_chip(column:int, icon:str) -> int
+            Drops a chip into a column (move has to be checked before) and returns its row
+        get_config() -> dict
+            Returns the size of the board and the connect length
+        reset() -> None
+            Starts a new game on the same board with the same players (player1 starts)
+        play(column:int) -> bool
+            Checks and makes a move for the active player (drop and status update)
+        undo() -> int
+            Takes back the last move and restores the status exactly
+        redo() -> int
+            Makes the last move taken back with undo() again
+        to_snapshot(self) -> dict
+            Returns a compact, JSON serializable state of the game
+        from_snapshot(cls, state:dict) -> Connect4
+            Creates a game from a compact state (made by to_snapshot)
         __detect_win(self)->bool
             Detects if there is a Winner or not is used by the __update_status() Method
         """
     
-    def __init__(self) -> None:
+    def __init__(self, rows:int = 7, cols:int = 8, connect:int = 4) -> None:
         """ 
         Init a Connect 4 Game
             - Creates an empty Board
             - Creates two (non - registered and empty) players.
             - Sets the Turn Counter to 0
             - Sets the Winner to None
+            - Creates an empty move list and saves the start time
             - makes dict with keys "id" and "icon"
         Parameters:
-            None
+            rows (int): Height of the Board (default 7)
+            cols (int): Width of the Board (default 8)
+            connect (int): Chips in a row needed to win (default 4)
+
+        Raises:
+            ValueError: if the size (max. MAX_SIDE per side, MAX_CELLS cells) or connect length is invalid
         
         """
-        self.Board: np.ndarray = np.zeros((7,8),dtype=object)
+        if (not 1 <= rows <= MAX_SIDE or not 1 <= cols <= MAX_SIDE or rows * cols > MAX_CELLS
+                or connect < 2 or connect > max(rows, cols)):
+            raise ValueError(f"Invalid board {rows}x{cols} with connect {connect}")
+
+        self.Board: np.ndarray = np.zeros((rows,cols),dtype=object)
+        self.connect: int = connect
+        self.heights: list = [0] * cols
+        self._last_move: tuple = None   # (row, col) of the last chip, used by __detect_win
         self.player1: dict = None
         self.player2: dict = None
         self.active_player: dict = {"id": None, "icon": None}
         self.turncounter: int = 0
         self.winner: dict = None
-        
+        self.moves: list = []
+        self.started: float = time.time()
+        self.undo_stack: list = []
+        self.redo_stack: list = []
+
     def get_status(self) -> dict:
         """
         returns the status of the game with following information:
         - Who is the Active Player (icon and id)
         - Is there a Winner.
         - Which turn is it.
+        - Is it a draw and is the game over.
 
         Parameters:
             None
@@ -84,11 +137,38 @@ class Connect4:
             "active_player": self.active_player["icon"],
             "active_id": self.active_player["id"],
             "winner": self.winner,
-            "turn number": self.turncounter
+            "turn number": self.turncounter,
+            "draw": self.is_draw(),
+            "game_over": self.is_over()
         }
         
         return status
 
+    def is_draw(self) -> bool:
+        """
+        Checks if the game is a draw: every cell has a chip and there is no winner.
+        Every move fills one cell, so the number of moves tells it without looking at the board.
+
+        Parameters:
+            None
+
+        Returns:
+            bool: True if the board is full without a winner
+        """
+        return not self.winner and len(self.moves) >= self.Board.size
+
+    def is_over(self) -> bool:
+        """
+        Checks if the game is finished, won (or forfeited) or a draw. No move is legal afterwards.
+
+        Parameters:
+            None
+
+        Returns:
+            bool: True if the game is finished
+        """
+        return bool(self.winner) or len(self.moves) >= self.Board.size
+
     def register_player(self, player_id:uuid.UUID) -> str:
         """ 
         Registers a Player with a uuid and Saves the Player to 
@@ -147,6 +227,10 @@ class Connect4:
             bool:Returns a Bool if the Move is valid or not
         """
         
+        #No move is legal in a finished game
+        if self.is_over():
+            return False
+
         #Checking if Id matches with Player who wants to make a move
         if player_Id != self.player1["id"] and player_Id != self.player2["id"]:
             return False
@@ -156,7 +240,7 @@ class Connect4:
             return False
         
         #Checking column has space left
-        if self.Board[0, column] != 0: #Checks if the first row in the column isn't empty
+        if self.heights[column] >= self.Board.shape[0]: #Checks if the column is full
             return False
         return True
         
@@ -177,7 +261,8 @@ class Connect4:
 
         #checking if there's a winner
         if not self.winner and self.__detect_win():
-            self.winner = self.active_player
+            self.winner = dict(self.active_player)
+        self._last_move = None
 
         if not self.winner:
             #Updating the Active Player, the ID and the turncounter
@@ -191,54 +276,241 @@ class Connect4:
                 self.active_player["id"] = self.player1["id"]
                 self.active_player["icon"] = self.player1["icon"]
 
+    def drop_chip(self, column:int, icon:str) -> int:
+        """
+        Drops a chip into the lowest free cell of a column and saves the move.
+        The move has to be checked with check_move() before.
+        The free cell is known from the column heights -> no scanning of the column.
+        The status before the move is pushed to the undo stack, so every move can be taken back.
+
+        Parameters:
+            column (int): Selected Column
+            icon (str): Icon of the player who drops the chip
+
+        Returns:
+            int: Row where the chip landed
+        """
+        row = self.Board.shape[0] - 1 - self.heights[column]
+        self.undo_stack.append((column, row, self.active_player["id"], self.active_player["icon"],
+                                self.turncounter, self.winner))
+        self.Board[row, column] = icon
+        self.heights[column] += 1
+        self.moves.append(column)
+        self._last_move = (row, column)
+        return row
+
+    def play(self, column:int) -> bool:
+        """
+        Makes a move for the active player: checks the column, drops the chip and updates the status.
+        Clears the redo stack. Together with undo() a search can explore positions
+        in place instead of copying the board for every position.
+
+        Parameters:
+            column (int): Selected Column
+
+        Returns:
+            bool: True if the move was made, False if the column is full or invalid or a player isn't registered
+        """
+        if self.player1 is None or self.player2 is None:
+            return False
+        if self.winner or column < 0 or column >= self.Board.shape[1] or self.heights[column] >= self.Board.shape[0]:
+            return False
+        self.drop_chip(column, self.active_player["icon"])
+        self.update_status()
+        self.redo_stack.clear()
+        return True
+
+    def undo(self) -> int:
+        """
+        Takes back the last move: removes the chip and restores active player,
+        turn counter and winner as they were before the move.
+
+        Parameters:
+            None
+
+        Returns:
+            int: Column of the move taken back (None if there is no move)
+        """
+        if not self.undo_stack:
+            return None
+        column, row, active_id, active_icon, turncounter, winner = self.undo_stack.pop()
+        self.Board[row, column] = 0
+        self.heights[column] -= 1
+        self.moves.pop()
+        self.active_player["id"] = active_id
+        self.active_player["icon"] = active_icon
+        self.turncounter = turncounter
+        self.winner = winner
+        self._last_move = None
+        self.redo_stack.append(column)
+        return column
+
+    def redo(self) -> int:
+        """
+        Makes the last move taken back with undo() again (for the active player).
+
+        Parameters:
+            None
+
+        Returns:
+            int: Column of the move (None if there is nothing to redo)
+        """
+        if not self.redo_stack:
+            return None
+        column = self.redo_stack.pop()
+        self.drop_chip(column, self.active_player["icon"])
+        self.update_status()
+        return column
+
+    def reset(self) -> None:
+        """
+        Starts a new game with the same board size and players, so one engine can
+        play many games back-to-back without allocating a new game. player1 starts,
+        like in Coordinator_Local and the tournaments. This differs from a new game on
+        the server, where the second registration makes player2 the first to move.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.Board.fill(0)
+        self.heights = [0] * self.Board.shape[1]
+        self._last_move = None
+        self.turncounter = 2 if self.player2 else (1 if self.player1 else 0)
+        self.winner = None
+        self.moves = []
+        self.started = time.time()
+        self.undo_stack = []
+        self.redo_stack = []
+        if self.player1:
+            self.active_player = {"id": self.player1["id"], "icon": self.player1["icon"]}
+
+    def get_config(self) -> dict:
+        """
+        Returns the size of the board and the number of chips in a row needed to win.
+
+        Parameters:
+            None
+
+        Returns:
+            dict: rows, cols and connect
+        """
+        rows, cols = self.Board.shape
+        return {"rows": rows, "cols": cols, "connect": self.connect}
+
+    def to_snapshot(self) -> dict:
+        """
+        Returns a compact state of the game which can be stored as JSON.
+        The board is stored as one string per row ("." for an empty cell).
+
+        Parameters:
+            None
+
+        Returns:
+            dict: compact state of the game
+        """
+        return {
+            "board": ["".join(str(cell) if cell != 0 else "." for cell in row) for row in self.Board],
+            "connect": self.connect,
+            "player1": self.player1,
+            "player2": self.player2,
+            "active_player": dict(self.active_player),
+            "turncounter": self.turncounter,
+            "winner": self.winner["icon"] if self.winner else None,
+            "moves": self.moves,
+            "started": self.started,
+            "undo": [[column, row, active_id, active_icon, turncounter, winner["icon"] if winner else None]
+                     for column, row, active_id, active_icon, turncounter, winner in self.undo_stack]
+        }
+
+    @classmethod
+    def from_snapshot(cls, state:dict) -> "Connect4":
+        """
+        Creates a game from a compact state made by to_snapshot().
+
+        Parameters:
+            state (dict): compact state of the game
+
+        Returns:
+            Connect4: restored game
+        """
+        game = cls(len(state["board"]), len(state["board"][0]), state.get("connect", 4))
+        for row, cells in enumerate(state["board"]):
+            for col, cell in enumerate(cells):
+                if cell != ".":
+                    game.Board[row, col] = cell
+                    game.heights[col] += 1
+        game.player1 = state["player1"]
+        game.player2 = state["player2"]
+        game.active_player = dict(state["active_player"])
+        game.turncounter = state["turncounter"]
+        game.moves = list(state.get("moves", []))
+        game.started = state.get("started", game.started)
+
+        #winner is stored as icon -> restore the dict of the winning player
+        players = {player["icon"]: player for player in [game.player1, game.player2] if player}
+        if state["winner"]:
+            game.winner = dict(players[state["winner"]])
+        game.undo_stack = [(column, row, active_id, active_icon, turncounter, dict(players[winner]) if winner else None)
+                           for column, row, active_id, active_icon, turncounter, winner in state.get("undo", [])]
+        return game
+
     def __detect_win(self) -> bool:
         """ 
-        Internal method which detects if there are 4 Pieces in one Row horizontally, vertically
+        Internal method which detects if there are `connect` Pieces in one Row horizontally, vertically
         or diagonally. And returns True if so.
 
+        If the last chip is known (dropped with drop_chip) only the lines through
+        this chip are checked, which costs the same on every board size.
+        Otherwise the whole board is scanned.
+
         Parameters:
             None
         
         Returns:
             bool: True if there's a winner, False otherwise
         """  
-        
+        icon = self.active_player["icon"]
+        if self._last_move is not None:
+            row, col = self._last_move
+            if self.Board[row, col] == icon:
+                return self.__line_through(row, col, icon)
+
         #save rows and cols into a variable
         rows , cols = self.Board.shape
-        #Checking if there is a Winner Horizontaly
         for row in range(rows):
-            for col in range(cols-3):
-                if (self.Board[row,col] == self.active_player["icon"] and
-                    self.Board[row,col + 1] == self.active_player["icon"] and
-                    self.Board[row,col + 2] == self.active_player["icon"] and
-                    self.Board[row,col + 3] == self.active_player["icon"]):
-                    return True
-        
-        # Checking if there is a Winner Vertically
-        for col in range(cols):
-            for row in range(rows-3):
-                if (self.Board[row,col] == self.active_player["icon"] and
-                    self.Board[row + 1,col] == self.active_player["icon"] and
-                    self.Board[row + 2,col] == self.active_player["icon"] and
-                    self.Board[row + 3,col] == self.active_player["icon"]):
-                    return True
-                
-        #Checking if theres a winner diagonally from left to right
-        for col in range(cols-3):
-            for row in range(rows-3):
-                if (self.Board[row,col] == self.active_player["icon"] and
-                    self.Board[row+1,col+1] == self.active_player["icon"] and
-                    self.Board[row+2,col+2] == self.active_player["icon"] and
-                    self.Board[row+3,col+3] == self.active_player["icon"]):
-                    return True
-        
-        #Checking if there a winner diagonally from right to left
-        for col in range(cols-1,2,-1):
-            for row in range(rows-3):
-                if (self.Board[row,col] == self.active_player["icon"] and
-                    self.Board[row+1,col-1] == self.active_player["icon"] and
-                    self.Board[row+2,col-2] == self.active_player["icon"] and
-                    self.Board[row+3,col-3] == self.active_player["icon"]):
+            for col in range(cols):
+                if self.Board[row, col] == icon and self.__line_through(row, col, icon):
                     return True
+        return False
 
-        return False
\ No newline at end of file
+    def __line_through(self, row:int, col:int, icon:str) -> bool:
+        """
+        Internal method which checks if the chip at (row, col) is part of `connect` chips
+        of the same icon in a row (horizontally, vertically or diagonally).
+
+        Parameters:
+            row (int): Row of the chip
+            col (int): Column of the chip
+            icon (str): Icon of the chip
+
+        Returns:
+            bool: True if there are enough chips in a row
+        """
+        rows , cols = self.Board.shape
+        board = self.Board
+        #directions: horizontal, vertical, diagonal left to right, diagonal right to left
+        for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            #count the chips in both directions of the line
+            for sign in (1, -1):
+                r, c = row + sign * d_row, col + sign * d_col
+                while 0 <= r < rows and 0 <= c < cols and board[r, c] == icon:
+                    count += 1
+                    r += sign * d_row
+                    c += sign * d_col
+            if count >= self.connect:
+                return True
+        return False
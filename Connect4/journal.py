@@ -0,0 +1,273 @@
+import os
+import json
+import threading
+import time
+
+
+class GameJournal:
+    """
+    Append-only Journal for the Games hosted by the Connect4Server
+
+    Every change of a game (new game, registration, move, takeback, forfeit, eviction) is appended as one
+    compact line to the current journal file. The lines are written buffered and
+    made durable in batches (fsync every `batch_size` records or every
+    `fsync_interval` seconds, whatever comes first).
+
+    Every `snapshot_every` records a compact snapshot of all games is written and
+    a new journal file is started, so older journal files can be deleted.
+    On startup only the latest snapshot and the journal tail behind it have to be
+    read -> recovery time is bounded by `snapshot_every`, not by the uptime.
+
+    Record Format (one line per record, fields separated by a space):
+        <seq> N <game_id> <rows> <cols> <connect>   new game
+        <seq> R <game_id> <player_id>               player registered
+        <seq> M <game_id> <column> <player_id>      move made
+        <seq> U <game_id> <player_id>               move taken back
+        <seq> B <game_id> <strategy> <budget> <player_id>   server-side bot opponent
+        <seq> F <game_id> <player_id>               player forfeited (e.g. move clock ran out)
+        <seq> E <game_id>                           game evicted (idle or finished for too long)
+
+    Attributes:
+        directory (str):        Folder where journal and snapshot files are stored
+        batch_size (int):       Number of records after which the journal gets fsynced
+        fsync_interval (float): Max. Time in seconds a record waits for its fsync
+        snapshot_every (int):   Number of records after which a snapshot is made
+        seq (int):              Sequence number of the last written record
+
+    Methods:
+        recover(self) -> tuple[dict, list]
+            Loads the latest snapshot and returns it with the records behind it
+        append(self, kind:str, *fields) -> int
+            Appends a record to the journal
+        snapshot_due(self) -> bool
+            Checks if a new snapshot should be written
+        write_snapshot(self, state:dict) -> None
+            Writes a snapshot and rotates the journal file
+        flush(self) -> None
+            Writes all buffered records to disk (with fsync)
+        close(self) -> None
+            Flushes the journal and stops the background flusher
+    """
+
+    def __init__(self, directory:str, batch_size:int = 64, fsync_interval:float = 0.05, snapshot_every:int = 10000) -> None:
+        """
+        Initializes the Journal and creates the directory if necessary.
+
+        Parameters:
+            directory (str):        Folder for journal and snapshot files
+            batch_size (int):       Records per fsync (default 64)
+            fsync_interval (float): Seconds until pending records get fsynced (default 0.05)
+            snapshot_every (int):   Records between two snapshots (default 10000)
+
+        Returns:
+            None
+        """
+        self.directory: str = directory
+        self.batch_size: int = batch_size
+        self.fsync_interval: float = fsync_interval
+        self.snapshot_every: int = snapshot_every
+
+        self.seq: int = 0                   # sequence number of the last record
+        self._snapshot_seq: int = 0         # sequence number covered by the last snapshot
+        self._pending: int = 0              # records written but not yet fsynced
+        self._file = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed: bool = False
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        # background thread which fsyncs pending records after fsync_interval
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def recover(self) -> tuple[dict, list]:
+        """
+        Loads the latest snapshot and all journal records written after it.
+        A torn last line is cut off the file. Afterwards the journal is opened for appending new records.
+
+        Parameters:
+            None
+
+        Returns:
+            tuple[dict, list]: snapshot state (or None) and list of records (lists of str)
+        """
+        state = None
+        snapshots = self._list_files("snapshot-", ".json")
+        if snapshots:
+            snapshot_seq, name = snapshots[-1]
+            with open(os.path.join(self.directory, name), "r") as file:
+                state = json.load(file)
+            self._snapshot_seq = snapshot_seq
+            self.seq = snapshot_seq
+
+        records = []
+        for start_seq, name in self._list_files("journal-", ".log"):
+            path = os.path.join(self.directory, name)
+            with open(path, "rb") as file:
+                data = file.read()
+            # a torn last line (crash during write) has no newline: it is ignored and cut off,
+            # otherwise the next record would be appended to the fragment
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                with open(path, "r+b") as file:
+                    file.truncate(end)
+                    os.fsync(file.fileno())
+            for line in data[:end].decode().splitlines():
+                fields = line.split()
+                seq = int(fields[0])
+                if seq <= self.seq:
+                    continue
+                self.seq = seq
+                records.append(fields[1:])
+
+        # start a fresh journal file behind the recovered state
+        with self._lock:
+            self._open_journal(self.seq)
+        return state, records
+
+    def append(self, kind:str, *fields) -> int:
+        """
+        Appends one record to the journal. The record is durable after the next batch fsync.
+
+        Parameters:
+            kind (str): Record type ("N", "R", "M", "U" or "B")
+            fields:     Fields of the record (must not contain whitespace)
+
+        Returns:
+            int: Sequence number of the record
+        """
+        with self._lock:
+            if self._file is None:
+                self._open_journal(self.seq)
+            self.seq += 1
+            line = " ".join([str(self.seq), kind, *map(str, fields)])
+            self._file.write(line + "\n")
+            self._pending += 1
+
+            # batch full -> fsync right now, otherwise let the flusher do it
+            if self._pending >= self.batch_size:
+                self._sync()
+            else:
+                self._wakeup.set()
+            return self.seq
+
+    def snapshot_due(self) -> bool:
+        """
+        Checks if enough records were written since the last snapshot.
+
+        Parameters:
+            None
+
+        Returns:
+            bool: True if a snapshot should be written
+        """
+        return self.seq - self._snapshot_seq >= self.snapshot_every
+
+    def write_snapshot(self, state:dict) -> None:
+        """
+        Writes a snapshot of all games atomically, starts a new journal file and
+        deletes all older snapshots and journal files.
+
+        The caller has to make sure no record is appended while the state is collected.
+
+        Parameters:
+            state (dict): Compact state of all games
+
+        Returns:
+            None
+        """
+        with self._lock:
+            seq = self.seq
+            path = os.path.join(self.directory, f"snapshot-{seq:012d}.json")
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as file:
+                json.dump(state, file, separators=(",", ":"))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, path)
+
+            self._snapshot_seq = seq
+            self._open_journal(seq)
+
+            # everything up to seq is in the snapshot -> old files are not needed anymore
+            for old_seq, name in self._list_files("snapshot-", ".json"):
+                if old_seq < seq:
+                    os.remove(os.path.join(self.directory, name))
+            for old_seq, name in self._list_files("journal-", ".log"):
+                if old_seq < seq:
+                    os.remove(os.path.join(self.directory, name))
+
+    def flush(self) -> None:
+        """
+        Writes all buffered records to disk and fsyncs the journal file.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        """
+        Flushes the journal, closes the file and stops the background flusher.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self._closed = True
+        self._wakeup.set()
+        self._flusher.join()
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+    def _open_journal(self, start_seq:int) -> None:
+        """
+        Closes the current journal file (if any) and opens a new one
+        for the records behind start_seq. Lock has to be held by the caller.
+        """
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+        path = os.path.join(self.directory, f"journal-{start_seq:012d}.log")
+        self._file = open(path, "a")
+
+    def _sync(self) -> None:
+        """
+        Flushes the buffer and fsyncs the journal file. Lock has to be held by the caller.
+        """
+        if self._file is not None and self._pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def _flush_loop(self) -> None:
+        """
+        Background loop: waits for new records and fsyncs them after fsync_interval,
+        so several records share one fsync (group commit).
+        """
+        while not self._closed:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            time.sleep(self.fsync_interval)
+            with self._lock:
+                self._sync()
+
+    def _list_files(self, prefix:str, suffix:str) -> list[tuple[int, str]]:
+        """
+        Lists files with the given prefix/suffix sorted by their sequence number.
+        """
+        files = []
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(suffix):
+                files.append((int(name[len(prefix):-len(suffix)]), name))
+        return sorted(files)
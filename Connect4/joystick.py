@@ -0,0 +1,232 @@
+import time
+import queue
+import threading
+
+
+class JoystickInput:
+    """
+    Event-driven input layer for the SenseHat joystick
+
+    A reader thread blocks on stick.wait_for_event() and delivers every debounced
+    "pressed" event right away to a queue and to the registered listeners, so
+    nobody has to poll the joystick in a sleep loop.
+
+    Attributes:
+        stick:              joystick of the SenseHat (or FakeStick / ScriptedStick)
+        debounce (float):   seconds in which a second press of the same direction is ignored
+
+    Methods:
+        get(self, timeout) -> str
+            Returns the next direction (waits up to timeout seconds)
+        poll(self) -> str
+            Returns the next direction without waiting (None if there is none)
+        clear(self) -> None
+            Discards all queued directions
+        add_listener(self, callback) -> None
+            Calls callback(direction) for every event (on the reader thread)
+        remove_listener(self, callback) -> None
+            Removes a listener
+    """
+
+    def __init__(self, stick, debounce:float = 0.05) -> None:
+        """
+        Initializes the input layer and starts the reader thread.
+
+        Parameters:
+            stick: joystick of the SenseHat (needs wait_for_event())
+            debounce (float): seconds to ignore repeated presses of the same direction (default 0.05)
+
+        Returns:
+            None
+        """
+        self.stick = stick
+        self.debounce: float = debounce
+        self._queue: queue.Queue = queue.Queue()
+        self._listeners: list = []
+        self._last: dict = {}           # direction -> timestamp of the last accepted press
+
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def get(self, timeout:float = None) -> str:
+        """
+        Returns the next direction ("up", "down", "left", "right" or "middle").
+
+        Parameters:
+            timeout (float): max. seconds to wait (default None -> wait until an event arrives)
+
+        Returns:
+            str: direction (None after the timeout)
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def poll(self) -> str:
+        """
+        Returns the next direction without waiting.
+
+        Parameters:
+            None
+
+        Returns:
+            str: direction (None if no event is queued)
+        """
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def clear(self) -> None:
+        """
+        Discards all queued directions (e.g. presses during the opponent's turn).
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        while self.poll() is not None:
+            pass
+
+    def add_listener(self, callback) -> None:
+        """
+        Registers a callback which gets every direction (called on the reader thread).
+
+        Parameters:
+            callback: function(direction:str)
+
+        Returns:
+            None
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback) -> None:
+        """
+        Removes a registered callback.
+
+        Parameters:
+            callback: function registered with add_listener
+
+        Returns:
+            None
+        """
+        self._listeners.remove(callback)
+
+    def _read_loop(self) -> None:
+        """
+        Reader thread: waits for joystick events, debounces them and delivers them.
+        """
+        while True:
+            event = self.stick.wait_for_event()
+            if event is None:
+                return
+            if event.action != "pressed":
+                continue
+            timestamp = getattr(event, "timestamp", None) or time.time()
+            last = self._last.get(event.direction)
+            if last is not None and 0 <= timestamp - last < self.debounce:
+                continue
+            self._last[event.direction] = timestamp
+
+            self._queue.put(event.direction)
+            for callback in list(self._listeners):
+                callback(event.direction)
+
+
+class ColumnSelector:
+    """
+    Non-blocking column choice with the joystick: left / right move the selection,
+    middle confirms it. Directions are fed one by one, nothing waits.
+
+    Attributes:
+        width (int):        number of selectable columns
+        column (int):       currently selected column
+        on_change:          optional function(column) called when the selection moves
+
+    Methods:
+        feed(self, direction) -> int
+            Handles a direction, returns the column when it is confirmed
+    """
+
+    def __init__(self, width:int, column:int = 0, on_change = None) -> None:
+        self.width: int = width
+        self.column: int = column
+        self.on_change = on_change
+
+    def feed(self, direction:str) -> int:
+        """
+        Handles one joystick direction.
+
+        Parameters:
+            direction (str): direction of the joystick event
+
+        Returns:
+            int: the confirmed column (None if the selection wasn't confirmed)
+        """
+        if direction == "middle":
+            return self.column
+        if direction == "right" and self.column < self.width - 1:
+            self.column += 1
+        elif direction == "left" and self.column > 0:
+            self.column -= 1
+        else:
+            return None
+        if self.on_change is not None:
+            self.on_change(self.column)
+        return None
+
+
+class ScriptedStickEvent:
+    """
+    Joystick event of the ScriptedStick (same fields as sense_hat.InputEvent).
+    """
+
+    def __init__(self, direction:str, timestamp:float, action:str = "pressed") -> None:
+        self.timestamp: float = timestamp
+        self.direction: str = direction
+        self.action: str = action
+
+
+class ScriptedStick:
+    """
+    Scripted input source for offline tests: plays a list of directions through
+    wait_for_event(), optionally with a real pause between them. The events are
+    stamped `step` seconds apart, so quick scripts aren't swallowed by the debouncing.
+    When the script is over wait_for_event() returns None (the reader thread stops).
+
+    Attributes:
+        directions (list): directions still to play ("left", "right", "middle", ...)
+        interval (float): real seconds between two events
+        step (float): timestamp difference between two events
+
+    Methods:
+        wait_for_event(self, emptybuffer) -> ScriptedStickEvent
+            Returns the next scripted event
+        get_events(self) -> list
+            Returns all remaining scripted events at once
+    """
+
+    def __init__(self, directions:list, interval:float = 0.0, step:float = 0.1) -> None:
+        self.directions: list = list(directions)
+        self.interval: float = interval
+        self.step: float = step
+        self._timestamp: float = time.time()
+
+    def wait_for_event(self, emptybuffer:bool = False) -> ScriptedStickEvent:
+        if not self.directions:
+            return None
+        if self.interval:
+            time.sleep(self.interval)
+        return self._next(self.directions.pop(0))
+
+    def get_events(self) -> list:
+        events = [self._next(direction) for direction in self.directions]
+        self.directions = []
+        return events
+
+    def _next(self, direction:str) -> ScriptedStickEvent:
+        self._timestamp += self.step
+        return ScriptedStickEvent(direction, self._timestamp)
@@ -0,0 +1,207 @@
+import bisect
+import itertools
+import threading
+from collections import deque
+
+
+class LobbyTicket:
+    """
+    Place of one player in the Lobby.
+
+    Attributes:
+        player_id (str): id of the waiting player
+        config (tuple): (rows, cols, connect) of the wanted game
+        rating (float): rating of the player (None -> paired first come, first served)
+        seq (int): position in the order of arrival
+        match (dict): game of the player once paired (None while waiting)
+        paired (threading.Event): set when the player is paired
+        active (bool): False once the player left or was paired
+    """
+    __slots__ = ("player_id", "config", "rating", "seq", "match", "paired", "active")
+
+    def __init__(self, player_id:str, config:tuple, rating:float, seq:int) -> None:
+        self.player_id: str = player_id
+        self.config: tuple = config
+        self.rating: float = rating
+        self.seq: int = seq
+        self.match: dict = None
+        self.paired: threading.Event = threading.Event()
+        self.active: bool = True
+
+
+class Lobby:
+    """
+    Matchmaking Lobby: players enqueue and are paired into new games
+
+    Players are only paired with players who want the same board (rows, cols, connect).
+        - without rating: first come, first served (one deque per board)
+        - with rating: the waiting player with the nearest rating, if it differs by
+          at most max_rating_gap (one sorted list per board, found with bisect)
+    Pairing never scans the waiting players: a join costs O(1) (deque) or O(log n) (bisect).
+    The game itself is created by the on_pair callback (e.g. Connect4Server.create_game).
+
+    Attributes:
+        on_pair:                function(config, player_ids) -> list of match dicts (one per player, same order)
+        max_rating_gap (float): largest rating difference of two paired players
+
+    Methods:
+        join(self, player_id, rating, config) -> LobbyTicket
+            Enqueues a player (or returns its ticket if it is already in the lobby)
+        wait(self, player_id, timeout) -> dict
+            Waits until the player is paired and returns its match
+        leave(self, player_id) -> bool
+            Removes a player from the lobby
+        waiting(self) -> int
+            Returns the number of waiting players
+    """
+
+    def __init__(self, on_pair, max_rating_gap:float = 200.0) -> None:
+        """
+        Initializes an empty lobby.
+
+        Parameters:
+            on_pair: function(config:tuple, player_ids:list) -> list[dict], creates the game of a pair
+            max_rating_gap (float): largest rating difference of two paired players (default 200)
+
+        Returns:
+            None
+        """
+        self.on_pair = on_pair
+        self.max_rating_gap: float = max_rating_gap
+        self._lock = threading.Lock()
+        self._tickets: dict = {}            # player_id -> ticket (waiting or paired, until the match is fetched)
+        self._fifo: dict = {}               # config -> deque of tickets without rating
+        self._rated: dict = {}              # config -> sorted list of (rating, seq, ticket)
+        self._seq = itertools.count()
+        self._waiting: int = 0
+
+    def waiting(self) -> int:
+        """
+        Returns the number of players waiting for an opponent.
+
+        Parameters:
+            None
+
+        Returns:
+            int: number of waiting players
+        """
+        return self._waiting
+
+    def join(self, player_id:str, rating:float = None, config:tuple = (7, 8, 4)) -> LobbyTicket:
+        """
+        Enqueues a player. If a fitting opponent is waiting, both are paired right away
+        (the opponent, who waited longer, is registered first and gets "X").
+        A player who is already in the lobby keeps the existing ticket.
+
+        Parameters:
+            player_id (str): id of the player
+            rating (float): rating of the player (default None -> first come, first served)
+            config (tuple): (rows, cols, connect) of the wanted game (default (7, 8, 4))
+
+        Returns:
+            LobbyTicket: ticket of the player
+        """
+        with self._lock:
+            ticket = self._tickets.get(player_id)
+            if ticket is not None:
+                return ticket
+            ticket = LobbyTicket(player_id, tuple(config), rating, next(self._seq))
+            self._tickets[player_id] = ticket
+
+            opponent = self._pop_opponent(ticket)
+            if opponent is None:
+                self._enqueue(ticket)
+                return ticket
+
+            try:
+                matches = self.on_pair(ticket.config, [opponent.player_id, ticket.player_id])
+            except Exception:
+                #the opponent keeps waiting, the new player has to join again
+                del self._tickets[player_id]
+                self._enqueue(opponent)
+                raise
+            for paired, match in zip((opponent, ticket), matches):
+                paired.match = match
+                paired.active = False
+                paired.paired.set()
+            return ticket
+
+    def wait(self, player_id:str, timeout:float = None) -> dict:
+        """
+        Waits until the player is paired. The match is handed out once,
+        afterwards the player isn't in the lobby anymore.
+
+        Parameters:
+            player_id (str): id of the player
+            timeout (float): max. seconds to wait (default None -> until paired)
+
+        Returns:
+            dict: match of the player (None if the player isn't paired within the timeout or isn't in the lobby)
+        """
+        ticket = self._tickets.get(player_id)
+        if ticket is None or not ticket.paired.wait(timeout):
+            return None
+        with self._lock:
+            if self._tickets.get(player_id) is ticket:
+                del self._tickets[player_id]
+        return ticket.match
+
+    def leave(self, player_id:str) -> bool:
+        """
+        Removes a player from the lobby (a match which wasn't fetched yet is dropped).
+
+        Parameters:
+            player_id (str): id of the player
+
+        Returns:
+            bool: True if the player was in the lobby
+        """
+        with self._lock:
+            ticket = self._tickets.pop(player_id, None)
+            if ticket is None:
+                return False
+            if ticket.active:
+                ticket.active = False
+                self._waiting -= 1
+                if ticket.rating is not None:
+                    #rated tickets are removed right away, deque entries are skipped when they come up
+                    queue = self._rated[ticket.config]
+                    index = bisect.bisect_left(queue, (ticket.rating, ticket.seq))
+                    del queue[index]
+            return True
+
+    def _enqueue(self, ticket:LobbyTicket) -> None:
+        """
+        Puts a ticket into the queue of its board (the lock has to be held by the caller).
+        """
+        if ticket.rating is None:
+            self._fifo.setdefault(ticket.config, deque()).append(ticket)
+        else:
+            bisect.insort(self._rated.setdefault(ticket.config, []), (ticket.rating, ticket.seq, ticket))
+        self._waiting += 1
+
+    def _pop_opponent(self, ticket:LobbyTicket) -> LobbyTicket:
+        """
+        Takes the opponent of a new ticket out of the queue (the lock has to be held by the caller).
+            without rating: the longest waiting player
+            with rating:    the nearest rating below or above, if it is within max_rating_gap
+        """
+        if ticket.rating is None:
+            queue = self._fifo.get(ticket.config)
+            while queue:
+                opponent = queue.popleft()
+                if opponent.active:
+                    self._waiting -= 1
+                    return opponent
+            return None
+
+        queue = self._rated.get(ticket.config)
+        if not queue:
+            return None
+        index = bisect.bisect_left(queue, (ticket.rating, ticket.seq))
+        candidates = [i for i in (index - 1, index) if 0 <= i < len(queue)]
+        best = min(candidates, key=lambda i: abs(queue[i][0] - ticket.rating))
+        if abs(queue[best][0] - ticket.rating) > self.max_rating_gap:
+            return None
+        self._waiting -= 1
+        return queue.pop(best)[2]
@@ -10,6 +10,7 @@ class Player(ABC):
         icon: The player's icon used in the game. (set during registration)
         board_width (int):  Number of Horizontal Elements 
         board_height (int): Number of Vertical Elements
+        connect (int):      Number of chips in a row needed to win
     """
 
     def __init__(self) -> None:
@@ -18,6 +19,7 @@ class Player(ABC):
 
         self.board_width:int = 8        # Set the width of the board
         self.board_height:int = 7       # Set the height of the board
+        self.connect:int = 4            # Chips in a row needed to win (players update it from their game)
         
     @abstractmethod
     def register_in_game(self) -> str:
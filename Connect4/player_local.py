@@ -1,4 +1,28 @@
 from player import Player
+from search import Analyzer, board_rows
+
+
+# Hints of all local players share one analyzer (created with the first hint): the search runs
+# in a worker process and its cache is shared -> a position is only searched once
+HINT_WORKERS = 1
+HINT_TIMEOUT = 2.0              # seconds a hint waits for the search, the game never blocks longer
+_hints: Analyzer = None
+
+
+def hint_analyzer() -> Analyzer:
+    """
+    Returns the analyzer shared by the hints of all local players (created on the first call).
+
+    Parameters:
+        None
+
+    Returns:
+        Analyzer: analyzer with HINT_WORKERS worker processes
+    """
+    global _hints
+    if _hints is None:
+        _hints = Analyzer(workers=HINT_WORKERS)
+    return _hints
 
 
 class Player_Local(Player):
@@ -12,6 +36,7 @@ class Player_Local(Player):
             icon (str): The player's icon used in the game. (set during registration)
             board_width (int):  Number of Horizontal Elements 
             board_height (int): Number of Vertical Elements
+            connect (int):      Number of chips in a row needed to win
 
         Methods:
         register_in_game(self) -> str
@@ -26,6 +51,8 @@ class Player_Local(Player):
             Visualizes Player the game board
         celebrate_win(self) -> None
             player can celebrate if won
+        hint(self) -> None
+            prints the analysis of the current position
         
         """
 
@@ -45,6 +72,10 @@ class Player_Local(Player):
 
         # Saves Instance of game to Attribute self.game
         self.game: Connect4 = kwargs['game']
+
+        # Board size and connect length are given by the game
+        self.board_height, self.board_width = self.game.Board.shape
+        self.connect = self.game.connect
         
     def register_in_game(self) -> str:
         """
@@ -100,7 +131,7 @@ class Player_Local(Player):
         
     def make_move(self) -> int:
         """ 
-        Player gets Message to make a Move.
+        Player gets Message to make a Move ("h" shows a hint).
         The Move gets checked by using the Method check_move of the game and
         if the Move is valid ther will be returned the Column.
 
@@ -114,17 +145,19 @@ class Player_Local(Player):
 
         while True:
             try:
-                column = int(input(f"Player {self.icon}, enter the column (0-7) where you wanna drop your chip"))
+                choice = input(f"Player {self.icon}, enter the column (0-{self.board_width - 1}) where you wanna drop your chip (h for a hint)")
+                if choice.strip().lower() == "h":
+                    self.hint()
+                    continue
+                column = int(choice)
                 
                 #if check_move returns True, we check if the column has space left and the place the chip
                 if self.game.check_move(column, self.id): 
                     
-                    # Find the lowest available row in the selected column
-                    for row in range(6,-1,-1):
-                        if self.game.Board[row, column] == 0: #Checking for an empty cell
-                            self.game.Board[row, column] = self.icon #Change cell from empty to the icon of the player
-                            print(f"Player {self.icon} placed a chip in column {column}")
-                            return column
+                    # Drop the chip into the lowest free cell of the column
+                    self.game.drop_chip(column, self.icon)
+                    print(f"Player {self.icon} placed a chip in column {column}")
+                    return column
                 
                 else:
                     # Invalid move, when check_move returns false
@@ -132,7 +165,7 @@ class Player_Local(Player):
 
             except ValueError:
                 # ValueError is generated when e.g. the inpust is not an integer.
-                print("Invalid input: Please enter a number between 0-7")
+                print(f"Invalid input: Please enter a number between 0-{self.board_width - 1}")
 
     def visualize(self) -> None:
         """
@@ -169,4 +202,33 @@ class Player_Local(Player):
 
         """
 
-        print(f"\033[1mCongrats! Player {self.game.active_player['icon']}, you have won the Game!\033[0m")
\ No newline at end of file
+        print(f"\033[1mCongrats! Player {self.game.active_player['icon']}, you have won the Game!\033[0m")
+
+    def hint(self, depth:int = 6, timeout:float = HINT_TIMEOUT) -> None:
+        """
+        Prints the score of every column for the current position.
+        The search runs in a worker process, the hint waits at most `timeout` seconds for it.
+        A search which takes longer keeps running and is cached, asking again shows it.
+        Analyses are cached, so a position which was asked for before is answered at once.
+
+        Parameters:
+            depth (int): search depth in plies (default 6)
+            timeout (float): max. seconds to wait for the search (default HINT_TIMEOUT)
+
+        Returns:
+            None
+
+        """
+        analysis = hint_analyzer().analyze(board_rows(self.game.get_board()), self.icon, self.connect, depth,
+                                           timeout=timeout)
+        if analysis is None:
+            print("The hint is still being computed, press h again in a moment.")
+            return
+        for entry in analysis["scores"]:
+            if entry is None:
+                continue
+            if entry["result"] == "heuristic":
+                print(f"Column {entry['column']}: {entry['score']:+d}")
+            else:
+                print(f"Column {entry['column']}: {entry['result']} in {entry['in']}")
+        print(f"Best column: {analysis['best_column']}")
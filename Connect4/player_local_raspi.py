@@ -1,7 +1,8 @@
-import time
-import random
 from game import Connect4
 from player_local import Player_Local
+from render import SenseHatRenderer, board_pixels, check_board_size, BLACK, RED_CROSS
+from animation import AnimationScheduler, hold, message, matrix_rain, chip_drop
+from joystick import JoystickInput, ColumnSelector
 
 
 class Player_Raspi_Local(Player_Local):
@@ -15,7 +16,9 @@ class Player_Raspi_Local(Player_Local):
 
         The following attributes are only for Local Raspi Player
         color (tuple): Color in RGB Format for the player
-        sense (Sensehat): Sensehat instance for the player
+        sense (SenseHatRenderer): Diff-based renderer in front of the Sensehat of the player
+        animations (AnimationScheduler): Plays the animations without blocking the player
+        joystick (JoystickInput): Debounced joystick events of the SenseHat
 
     Methods:
 
@@ -39,24 +42,32 @@ class Player_Raspi_Local(Player_Local):
 
         Parameters:
             game (Connect4): Game instance.
-            sense (SenseHat): Shared SenseHat instance for all players. (if SHARED option is used)
+            sense (SenseHat or SenseHatRenderer): Shared SenseHat (renderer) for all players. (if SHARED option is used)
 
         Returns:
             Nothing
         
         Raises:
-            ValueError: If 'sense' is not provided in kwargs.
+            ValueError: If 'sense' is not provided in kwargs or the board doesn't fit onto the SenseHat (max. 7x8).
 
         """
         # Initialize the parent class (Player_Local)
         kwargs['game'] = game
         super().__init__(**kwargs)
+        check_board_size(self.board_height, self.board_width)
 
         # Extracts the SenseHat instance from kwargs
         try:
             self.sense: SenseHat = kwargs["sense"]
         except KeyError:
             raise ValueError(f"{type(self).__name__} requires a 'sense' (SenseHat instance) attribute")
+        #all drawing goes through a diff-based renderer (shared if the coordinator passes one)
+        if not isinstance(self.sense, SenseHatRenderer):
+            self.sense = SenseHatRenderer(self.sense)
+        #animations run on the scheduler thread (shared if the coordinator passes one)
+        self.animations: AnimationScheduler = kwargs.get("animations") or AnimationScheduler(self.sense)
+        #joystick events arrive through a queue (shared if the coordinator passes one)
+        self.joystick: JoystickInput = kwargs.get("joystick") or JoystickInput(self.sense.stick)
 
         self.color: list = None
         
@@ -99,12 +110,11 @@ class Player_Raspi_Local(Player_Local):
         Returns:
             None
         """
-        #Clear previous selected column
-        for col in range(8):
-            self.sense.set_pixel(col, 0, (0,0,0))
-        
-        #Light up the selected Column
-        self.sense.set_pixel(column,0,self.color)
+        #Clear previous selected column and light up the selected Column (top row of the board frame)
+        frame = list(self.animations.base_frame)
+        frame[:8] = [BLACK] * 8
+        frame[column] = self.color
+        self.animations.show(frame)
 
     
     def visualize(self) -> None:
@@ -117,30 +127,9 @@ class Player_Raspi_Local(Player_Local):
         Returns:
             None
         """
-        #Visualzation for Sensehat
+        #Visualzation for Sensehat (the renderer only pushes the changed pixels)
         board = self.game.get_board()
-        #Matrix for the sensehat
-        pixel_matrix=[]
-
-        # adds an empty row with the no color so that the matrix is 8x8
-        for i in range(8):
-            pixel_matrix.append((0,0,0))
-
-        #for every Row and for every column in the gameboard there will be the colors set dependend on the icon and added to the pixel_matrix
-        for row in range(7):
-            for col in range(8):
-                if row < 7 and col < 8:
-                    if board[row, col] == 0:
-                        pixel_matrix.append((0,0,0))
-                    elif board[row, col] == "X":
-                        pixel_matrix.append((255,0,0))
-                    elif board[row, col] == "O":
-                        pixel_matrix.append((0,255,0))
-                    else:
-                        pixel_matrix.append((0,0,0))
-                
-        #pixel_matrix gets set on the sensehat
-        self.sense.set_pixels(pixel_matrix)
+        self.animations.show(board_pixels(board))
         
         
         #Visualzation for CLI
@@ -158,57 +147,32 @@ class Player_Raspi_Local(Player_Local):
             None
 
         Returns:
-            col (int): the Selected column (0...7)
+            col (int): the Selected column (0...board_width-1)
         """
-        column = 0
+        #the sensehat can only show 8 columns
+        selector = ColumnSelector(self.board_width, on_change = self.visualize_choice)
+        self.visualize_choice(selector.column)
         while True:
-            self.sense.set_pixel(column,0,self.color)
-            
-            
-            #watches the joystick events if left/right the method calls visualize_choice
-            #if the joystick event is middle it calls the check_move method of the gameobject
-            for event in self.sense.stick.get_events():
+            #waits for the next joystick event (delivered by the input thread, no polling):
+            #left/right move the selection (visualize_choice), middle confirms the column
+            column = selector.feed(self.joystick.get())
+            if column is not None:
+                #if check_move returns True, we check if the column has space left and the place the chip
+                if self.game.check_move(column, self.id): 
                 
-                if event.direction == "right" and event.action =="pressed":
-                    if column < 7:
-                        column += 1
-                        self.visualize_choice(column)
-                        time.sleep(0.1)
-                if event.direction == "left" and event.action == "pressed":
-                    if column > 0:
-                        column -= 1
-                        self.visualize_choice(column)
-                        time.sleep(0.1)
-                if event.direction == "middle" and event.action == "pressed":
-
-                    #if check_move returns True, we check if the column has space left and the place the chip
-                    if self.game.check_move(column, self.id): 
-                
-                        # Find the lowest available row in the selected column
-                        for row in range(6,-1,-1):
-                            if self.game.Board[row, column] == 0: #Checking for an empty cell
-                                self.game.Board[row, column] = self.icon #Change cell from empty to the icon of the player
-                                print(f"Player {self.icon} placed a chip in column {column}")
-                                return column
+                    # Drop the chip into the lowest free cell of the column
+                    self.animations.play(chip_drop(self.animations.base_frame, column, self.color), "chip drop")
+                    self.game.drop_chip(column, self.icon)
+                    print(f"Player {self.icon} placed a chip in column {column}")
+                    return column
             
-                    else:
-                        # Invalid move, when check_move returns false
-                        red = (255, 0, 0)
-                        white = (0, 0, 0)
-                        red_cross_matrix = [
-                                        white, white, white, red,   red,   white, white, white,
-                                        white, white, white, red,   red,   white, white, white,
-                                        white, white, white, red,   red,   white, white, white,
-                                        red,   red,   red,   red,   red,   red,   red,   red,
-                                        red,   red,   red,   red,   red,   red,   red,   red,
-                                        white, white, white, red,   red,   white, white, white,
-                                        white, white, white, red,   red,   white, white, white,
-                                        white, white, white, red,   red,   white, white, white
-                                    ]
-                        self.sense.set_pixels(red_cross_matrix)
-                        time.sleep(0.5)
-                        self.visualize()
-                        print(f"Invalid move! Please try again.")
+                else:
+                    # Invalid move, when check_move returns false
+                    #the red cross is shown for 0.5 s, then the board again (without blocking)
+                    self.animations.play(hold(RED_CROSS, 0.5, self.animations.fps), "invalid move")
+                    self.visualize()
+                    self.visualize_choice(column)
+                    print(f"Invalid move! Please try again.")
 
             
         
@@ -226,37 +190,10 @@ class Player_Raspi_Local(Player_Local):
         Returns:
             None
         """
-        self.sense.show_message(f"Player {self.color_text} won!", text_colour = self.color, scroll_speed = 0.05)
-
-        # Create a 8x8 grid of black (background)
-        black = (0, 0, 0)
-        matrix = [[black for _ in range(8)] for _ in range(8)]
-        
-        # Start the matrix rain effect
-        while True:
-            # Shift all rows down
-            matrix = [row[:] for row in matrix]  # Copy current state
-            
-            # Randomly add green pixels to the top row (simulating falling rain)
-            for col in range(8):
-                if random.random() < 0.1:  # Adjust this value for more/less rain
-                    matrix[0][col] = self.color  # New green pixel at the top
-            
-            # Shift all pixels down and remove the bottom row
-            for row in range(7, 0, -1):
-                for col in range(8):
-                    matrix[row][col] = matrix[row - 1][col]
-
-            # Clear the screen and update with new matrix
-            self.sense.set_pixels([pixel for row in matrix for pixel in row])
-            
-            # Wait for a short time to simulate the fall of the rain
-            time.sleep(0.1)
-
-            if all(pixel == self.color for row in matrix for pixel in row):
-                time.sleep(3)
-                self.sense.clear()
-                break
+        #message and matrix rain effect are queued, the screen is cleared afterwards
+        self.animations.play(message(f"Player {self.color_text} won!", self.color), "won")
+        self.animations.play(matrix_rain(self.color, hold_frames = round(3 * self.animations.fps)), "matrix rain")
+        self.animations.show([BLACK] * 64)
 
         
         
@@ -1,7 +1,6 @@
+import time
 from player import Player
 import requests
-import numpy as np
-import random
 
 
 class Player_Remote(Player):
@@ -15,16 +14,26 @@ class Player_Remote(Player):
 
             The following attributes are only for Remote Player
             api_url (str): Address of Server, including Port Bsp: http://10.147.17.27:5000
+            game_id (str): Game on the server the player plays in (None -> default game)
+            max_backoff (float): Longest pause in seconds when the server answers 429 (too many requests)
+            last_state (dict): State of the game after the player's last move (version, board rows, winner,
+                               active_player, turn_number), None if the server doesn't send it
 
         Methods:
         register_in_game(self) -> str
             sends a API request to the server and returns the icon if succesful
+        join_lobby(self, rating, rows, cols, connect) -> str
+            waits in the lobby of the server until paired into a new game and returns the icon
         is_my_turn(self) -> bool
             sends a API request to the server and returns a boolean if succeded
         get_game_status(self)->dict
             sends the a API request to the server and returns a dictionary if succesful
+        is_draw(self, status) -> bool
+            checks with a status if the game ended in a draw
         make_move(self) -> int
             Player can make a move and sends a API request for checking the move and returns the column if succesful
+        last_board(self) -> list
+            returns the board after the player's last move (None if unknown)
         visualize(self) -> None
             gets the board with an API request and Visualizes Player the game board
         celebrate_win(self) -> None
@@ -32,12 +41,14 @@ class Player_Remote(Player):
         
         """
 
-    def __init__(self, api_url, **kwargs) -> None:
+    def __init__(self, api_url, game_id:str = None, max_backoff:float = 30.0, **kwargs) -> None:
         """ 
         Initializes a local player.
         
         Parameters:
             api_url (str):Address of Server, including Port Bsp: http://10.147.17.27:5000
+            game_id (str):Game on the server (default None -> default game of the server)
+            max_backoff (float):Longest pause in seconds when the server limits the requests (default 30)
 
 
         Returns:
@@ -49,11 +60,15 @@ class Player_Remote(Player):
 
         # Saves api_url to attribute self.api_url
         self.api_url: str = api_url
+        self.game_id: str = game_id
+        self.max_backoff: float = max_backoff
+        self.last_state: dict = None
         
     def register_in_game(self) -> str:
         """
         Makes an API request to server for registration assigns the icon to the player and 
-        returns the icon if registration is succesful.
+        returns the icon if registration is succesful. Afterwards the board size and connect
+        length of the game are requested from the server.
 
         Parameters:
             None
@@ -66,16 +81,59 @@ class Player_Remote(Player):
 
         """
         #Player registrates himself in the game by using API request 
-        registration = {"player_id": f"{self.id}"}
-        response = requests.post(f"{self.api_url}/connect4/register", json = registration)
+        registration = {"player_id": f"{self.id}", "game_id": self.game_id}
+        response = self._request("POST", "/connect4/register", registration)
         response = response.json()
 
         #Assigns Player a icon and if not sucessfull raises ValueError
         self.icon = response.get("player_icon")
         if self.icon is None:
             raise ValueError("Failed to register the player in the game")
+
+        #Board size and connect length of the game (servers without /config use the default board)
+        response = self._request("GET", "/connect4/config")
+        if response.status_code == 200:
+            config = response.json()
+            self.board_height = config.get("rows", self.board_height)
+            self.board_width = config.get("cols", self.board_width)
+            self.connect = config.get("connect", self.connect)
         
         return self.icon
+
+    def join_lobby(self, rating:float = None, rows:int = 7, cols:int = 8, connect:int = 4) -> str:
+        """
+        Enqueues the player in the lobby of the server and waits until an opponent is found.
+        Every request blocks on the server until the pairing (max. 30 s), so nothing is polled.
+        The player is registered in the new game and plays in it afterwards.
+
+        Parameters:
+            rating (float): rating of the player (default None -> first come, first served)
+            rows (int): height of the wanted board (default 7)
+            cols (int): width of the wanted board (default 8)
+            connect (int): chips in a row needed to win (default 4)
+
+        Returns:
+            str: The player's icon.
+
+        Raises:
+            ValueError: if the server rejects the request
+        """
+        request = {"player_id": f"{self.id}", "rating": rating, "rows": rows, "cols": cols, "connect": connect}
+        print("Waiting in the lobby for an opponent..")
+        while True:
+            response = self._request("POST", "/connect4/lobby", request)
+            if response.status_code == 200:
+                break
+            if response.status_code != 202:
+                raise ValueError(f"Failed to join the lobby: {response.json().get('message')}")
+
+        match = response.json()
+        self.game_id = match["game_id"]
+        self.icon = match["player_icon"]
+        self.board_height = match.get("rows", self.board_height)
+        self.board_width = match.get("cols", self.board_width)
+        self.connect = match.get("connect", self.connect)
+        return self.icon
         
     def is_my_turn(self) -> bool:
         """ 
@@ -89,7 +147,7 @@ class Player_Remote(Player):
 
         """
         #Checking if the Active Player in the Game is the same as the Attribute
-        response = requests.get(f"{self.api_url}/connect4/status")
+        response = self._request("GET", "/connect4/status")
         response = response.json()
 
         if response.get("active_player") == self.icon:
@@ -113,7 +171,7 @@ class Player_Remote(Player):
             
         """
         #Getting the status of the game and returns dictionary of status if request succesfull
-        response = requests.get(f"{self.api_url}/connect4/status")
+        response = self._request("GET", "/connect4/status")
         if response.status_code == 200:
             response = response.json()
             return response
@@ -121,9 +179,22 @@ class Player_Remote(Player):
             return False
         
         
+    def is_draw(self, status:dict) -> bool:
+        """
+        Checks with a status (or the state after a move) if the game ended in a draw
+        ("draw" of the server, the rules aren't repeated here).
+
+        Parameters:
+            status (dict): Status of the game
+
+        Returns:
+            bool: True if the board is full without a winner
+        """
+        return bool(status.get("draw"))
+
     def make_move(self) -> int:
         """ 
-        Player gets Message to make a Move. Player can choose between (0..7). When Player makes a move
+        Player gets Message to make a Move. Player can choose between (0..board_width-1). When Player makes a move
         API request is send to the server for checking. If Move is succesfull column is returned otherwise
         response is printed.
         
@@ -138,9 +209,8 @@ class Player_Remote(Player):
 
         while True:
             try:
-                column = int(input(f"Player {self.icon}, enter the column (0-7) where you wanna drop your chip"))
-                move = {"column": column, "player_id": f"{self.id}"}
-                response = requests.post(f"{self.api_url}/connect4/make_move", json = move)
+                column = int(input(f"Player {self.icon}, enter the column (0-{self.board_width - 1}) where you wanna drop your chip"))
+                response = self._send_move(column)
 
                 ##if API request returns True, we return the column
                 if response.status_code == 200:
@@ -155,282 +225,89 @@ class Player_Remote(Player):
 
             except ValueError:
                 # ValueError is generated when e.g. the inpust is not an integer.
-                print("Invalid input: Please enter a number between 0-7")
+                print(f"Invalid input: Please enter a number between 0-{self.board_width - 1}")
 
     def make_move_with_bot(self):
         column = self.bot()
         print(column)
-        move = {"column": column, "player_id": f"{self.id}"}
-        response = requests.post(f"{self.api_url}/connect4/make_move", json = move)
+        response = self._send_move(column)
 
         ##if API request returns True, we return the column
         if response.status_code == 200:
             return column
 
+    def last_board(self) -> list:
+        """
+        Returns the board after the player's last move, which the server sent with
+        the answer to the move (no extra request).
+
+        Parameters:
+            None
+
+        Returns:
+            list: rows of the board (0 for an empty cell), None if the server didn't send it
+        """
+        #search (and numpy) is only loaded when it is needed (faster start of CLI clients)
+        from search import rows_board
+
+        if self.last_state is None or "board" not in self.last_state:
+            return None
+        return rows_board(self.last_state["board"])
+
     def bot(self) -> int:
-        status = requests.get(f"{self.api_url}/connect4/status").json()
-        active_player_icon = status.get("active_player")
-        response = requests.get(f"{self.api_url}/connect4/board")
+        """
+        Gets the board from the server and lets the rule based bot
+        (bots.heuristic_move) select a column for the player.
+
+        Parameters:
+            None
+
+        Returns:
+            int: The column chosen by the bot (None if the board request failed)
+        """
+        #numpy and the bots are only loaded when the bot plays (faster start of CLI clients)
+        import numpy as np
+        from bots import heuristic_move
+
+        #the bot only moves in the player's turn, so the active player is the player itself
+        response = self._request("GET", "/connect4/board")
         if response.status_code == 200:
             board = response.json()
             board = board.get("board")
             board_np = np.array(board, dtype=object)
-            rows , cols = board_np.shape
-
-            #1. Checking for Winning moves
-            #horizontally
-            for row in range(rows):
-                for col in range(cols - 3):  # Look at 4-cell sequences
-                    h_myself = 0
-                    h_free_col = None
-
-                    for i in range(4):  # Check each cell in the 4-cell sequence
-                        if board_np[row, col + i] == active_player_icon:
-                            h_myself += 1
-                        elif board_np[row, col + i] == 0:  # Empty
-                            h_free_col = col + i
-
-                    # Check if there are 3 of the same chips and one free space
-                    if h_myself == 3 and h_free_col is not None:  # Active player can win
-                        if row == rows - 1 or board_np[row + 1, h_free_col] != 0:  # check if there is no 'air'
-                            return h_free_col 
-
-            #vertically
-            for col in range(cols):
-                for row in range(rows - 3): 
-                    v_myself = 0
-
-                    for i in range(4):  # Check each cell in the 4-cell sequence
-                        if board_np[row + i, col] == active_player_icon:
-                            v_myself += 1
-
-                    if v_myself == 3 and board_np[row, col] == 0:  # Active player can win
-                        return col 
-
-            #diagonally (left to right)
-            for col in range(cols - 3):
-                for row in range(rows - 3):
-                    d_lr_myself = 0
-                    d_lr_free_row, d_lr_free_col = None, None
-
-                    for i in range(4):  # Check each cell in the diagonal
-                        if board_np[row + i, col + i] == active_player_icon:
-                            d_lr_myself += 1
-                        elif board_np[row + i, col + i] == 0:
-                            d_lr_free_row, d_lr_free_col = row + i, col + i
-
-                    if d_lr_myself == 3 and d_lr_free_row is not None:
-                        if d_lr_free_row == rows - 1 or board_np[d_lr_free_row + 1, d_lr_free_col] != 0:  # check that there's no 'air'
-                            return d_lr_free_col  # Return column to place the chip
-
-            # diagonally right to left
-            for col in range(3, cols):
-                for row in range(rows - 3):
-                    d_rl_myself = 0
-                    d_rl_free_row, d_rl_free_col = None, None
-
-                    for i in range(4):  # Check each cell in the diagonal
-                        if board_np[row + i, col - i] == active_player_icon:
-                            d_rl_myself += 1
-                        elif board_np[row + i, col - i] == 0:
-                            d_rl_free_row, d_rl_free_col = row + i, col - i
-
-                    if d_rl_myself == 3 and d_rl_free_row is not None:
-                        if d_rl_free_row == rows - 1 or board_np[d_rl_free_row + 1, d_rl_free_col] != 0:  # check that there's no 'air'
-                            return d_rl_free_col
-                        
-
-            #2. Checking for blocking moves
-            #horizontally
-            for row in range(rows):
-                for col in range(cols - 3):  # Look at 4-cell sequences
-                    h_opponent = 0
-                    h_free_col = None
-
-                    for i in range(4):  # Check each cell in the 4-cell sequence
-                        if board_np[row, col + i] != 0 and board_np[row, col + i] != active_player_icon: 
-                            h_opponent += 1
-                        elif board_np[row, col + i] == 0:  # Empty
-                            h_free_col = col + i
-
-                    if h_opponent == 3 and h_free_col is not None:  # Opponent can win
-                        if row == rows - 1 or board_np[row + 1, h_free_col] != 0:  # check if there is no 'air'
-                            return h_free_col  # Block the opponent
-                        
-            #vertically
-            for col in range(cols):
-                for row in range(rows - 3): 
-                    v_opponent = 0
-
-                    for i in range(4):  # Check each cell in the 4-cell sequence
-                        if board_np[row + i, col] != active_player_icon and board_np[row + i, col] != 0:
-                            v_opponent += 1
-
-                    if v_opponent == 3 and board_np[row, col] == 0:  # Opponent can win
-                        return col  # Block the opponent
-                    
-            #diagonally (left to right)
-            for col in range(cols - 3):
-                for row in range(rows - 3):
-                    d_lr_opponent = 0
-                    d_lr_free_row, d_lr_free_col = None, None
-
-                    for i in range(4):  # Check each cell in the diagonal
-                        if board_np[row + i, col + i] != active_player_icon and board_np[row + i, col + i] != 0:
-                            d_lr_opponent += 1
-                        elif board_np[row + i, col + i] == 0:  # Empty
-                            d_lr_free_row, d_lr_free_col = row + i, col + i
-
-                    if d_lr_opponent == 3 and d_lr_free_row is not None:
-                        if d_lr_free_row == rows - 1 or board_np[d_lr_free_row + 1, d_lr_free_col] != 0:  # check that there's no 'air'
-                            return d_lr_free_col  # Block opponent
-                        
-            # diagonally right to left
-            for col in range(3, cols):
-                for row in range(rows - 3):
-                    d_rl_opponent = 0
-                    d_rl_free_row, d_rl_free_col = None, None
-
-                    for i in range(4):  # Check each cell in the diagonal
-                        if board_np[row + i, col - i] != active_player_icon and board_np[row + i, col - i] != 0:
-                            d_rl_opponent += 1
-                        elif board_np[row + i, col - i] == 0:
-                            d_rl_free_row, d_rl_free_col = row + i, col - i
-
-                    if d_rl_opponent == 3 and d_rl_free_row is not None:
-                        if d_rl_free_row == rows - 1 or board_np[d_rl_free_row + 1, d_rl_free_col] != 0:  # check that there's no 'air'
-                            return d_rl_free_col  # Block opponent
-
-            #3. Checking for pairs
-            # horizontally           
-            for row in range(rows):
-                for col in range(cols - 2):
-                    h_myself = 0
-                    h_opponent = 0
-                    free_cols = []  # Stores indices of free columns
-
-                    for i in range(3):  # Check each cell in the 3-cell sequence
-                        if board_np[row, col + i] == active_player_icon:
-                            h_myself += 1
-                        elif board_np[row, col + i] != 0:  # opponent
-                            h_opponent += 1
-                        else:  # Empty
-                            free_cols.append(col + i)
-
-                    # Active player has a pair and at least one free space
-                    if h_myself == 2 and len(free_cols) > 0:
-                        for free_col in free_cols:  # Check if the free space is valid
-                            if row == rows - 1 or board_np[row + 1, free_col] != 0:  # no 'air'
-                                return free_col  # Place chip to form a three-in-a-row
-
-                    # Opponent has a pair and at least one free space
-                    if h_opponent == 2 and len(free_cols) > 0:
-                        for free_col in free_cols:  # Check if the free space is valid
-                            if row == rows - 1 or board_np[row + 1, free_col] != 0:  # no 'air'
-                                return free_col  # Block the opponent so he can't form 3-in-a-row
-                            
-            # vertically
-            for col in range(cols):
-                for row in range(rows - 2):  # Look at 3-cell vertical sequences
-                    if board_np[row + 1, col] == active_player_icon and board_np[row + 2, col] == active_player_icon:
-                        if board_np[row, col] == 0:  # check if there's free space on top
-                            return col  # Place chip to form a three-in-a-row (column)
-
-                    if board_np[row + 1, col] != 0 and board_np[row + 1, col] != active_player_icon and board_np[row + 2, col] != 0 and board_np[row + 2, col] != active_player_icon and board_np[row, col] == 0:
-                            return col  # Block the opponent
-                        
-            # diagonally (left to right)
-            for col in range(cols - 2):
-                for row in range(rows - 2): 
-                    d_lr_myself = 0
-                    d_lr_opponent = 0
-                    free_row, free_col = None, None
-
-                    for i in range(3):  # Check each 3-cell-sequences in the diagonal
-                        if board_np[row + i, col + i] == active_player_icon:
-                            d_lr_myself += 1
-                        elif board_np[row + i, col + i] != 0:
-                            d_lr_opponent += 1
-                        else:
-                            free_row, free_col = row + i, col + i
-
-                    if d_lr_myself == 2 and free_row is not None:
-                        if free_row == rows - 1 or board_np[free_row + 1, free_col] != 0:  # no 'air'
-                            return free_col  # Form a three-in-a-row
-
-                    if d_lr_opponent == 2 and free_row is not None:
-                        if free_row == rows - 1 or board_np[free_row + 1, free_col] != 0:  # no 'air'
-                            return free_col  # Block the opponent
-                        
-            # diagonally (right to left)
-            for col in range(2, cols):  # start at column 3
-                for row in range(rows - 2):
-                    d_rl_myself = 0
-                    d_rl_opponent = 0
-                    free_row, free_col = None, None
-
-                    for i in range(3):  # Check each 3-cell-sequences in the diagonal
-                        if col - i >= 0:  #makes sure we stay in the board
-                            if board_np[row + i, col - i] == active_player_icon:
-                                d_rl_myself += 1
-                            elif board_np[row + i, col - i] != 0:
-                                d_rl_opponent += 1
-                            else:
-                                free_row, free_col = row + i, col - i
-
-                    if d_rl_myself == 2 and free_row is not None:
-                        if free_row == rows - 1 or board_np[free_row + 1, free_col] != 0:  # no air
-                            return free_col  # to form a three-in-a-row
-
-                    if d_rl_opponent == 2 and free_row is not None:
-                        if free_row == rows - 1 or board_np[free_row + 1, free_col] != 0:  # no air
-                            return free_col  # Block the opponent's 3-in-a-row
-                        
-            # 4. Move when none of the above two is the case and centre is free at the bottom
-
-            if board_np[0, 3] == 0 and board_np[0,4] == 0:  # Checks if the two center columns are free at the bottom
-                return random.randrange(3,5) #3 or 4 (random)
-            if board_np[0, 4] == 0:  # center right column
-                return 4
-            if board_np[0, 3] == 0:  # center left column
-                return 3
-            
-            # 5. Move when none of the above is the case (random move)
-            valid_cols = [col for col in range(cols) if board_np[0, col] == 0]
-            if valid_cols:
-                return random.choice(valid_cols)
+            return heuristic_move(board_np, self.icon, connect = self.connect)
 
-    def visualize(self) -> None:
+    def visualize(self, board:list = None) -> None:
         """
         Visualize the current state of the Connect 4 board by printing it to the console.
         By making a API request to the server. Board is formatted into the correct way to
         show in the CLI if status_code of response == 200.
         
         Parameters:
-            None
+            board (list): Board which was already requested from the server (default None -> request it)
         
         Returns:
             None
 
         """
 
-        #get current board by making API rewuest to the server
-        response = requests.get(f"{self.api_url}/connect4/board")
-        if response.status_code == 200:
-            board = response.json()
-            board = board.get("board")
-            for row in board:
+        #get current board by making API rewuest to the server (if the caller doesn't have it yet)
+        if board is None:
+            response = self._request("GET", "/connect4/board")
+            if response.status_code != 200:
+                print(f"Request error {response.status_code}")
+                return
+            board = response.json().get("board")
+        for row in board:
 
             # Check each element, printing "X" in red and "O" in green
-                print(" | ".join(
-                    "\033[91mX\033[0m" if cell == "X" else
-                    "\033[92mO\033[0m" if cell == "O" else
-                    str(cell)
-                    for cell in row
-                ))
-            print("\n")
-        else:
-            print(f"Request error {response.status_code}")
+            print(" | ".join(
+                "\033[91mX\033[0m" if cell == "X" else
+                "\033[92mO\033[0m" if cell == "O" else
+                str(cell)
+                for cell in row
+            ))
+        print("\n")
 
     def celebrate_win(self) -> None:
         """
@@ -443,10 +320,58 @@ class Player_Remote(Player):
             None
 
         """
-        response = requests.get(f"{self.api_url}/connect4/status")
-        response = response.json()
-        print(f"\033[1mCongrats! Player {response.get('winner').get('icon')}, you have won the Game!\033[0m")
-        
-            
+        #the answer to the winning move already has the winner
+        if self.last_state is not None and self.last_state.get("winner"):
+            winner = self.last_state["winner"]
+        else:
+            winner = self._request("GET", "/connect4/status").json().get("winner")
+        print(f"\033[1mCongrats! Player {winner.get('icon')}, you have won the Game!\033[0m")
 
-        
\ No newline at end of file
+    def _send_move(self, column:int) -> requests.Response:
+        """
+        Sends a move and asks for the new state of the game with the answer (saved in last_state),
+        so neither the board nor the status has to be requested after the move.
+
+        Parameters:
+            column (int): selected column
+
+        Returns:
+            requests.Response: answer of the server
+        """
+        move = {"column": column, "player_id": f"{self.id}", "game_id": self.game_id, "state": True}
+        self.last_state = None
+        response = self._request("POST", "/connect4/make_move", move)
+        if response.status_code == 200:
+            #servers without the state answer only with column and player_id
+            self.last_state = response.json().get("state")
+        return response
+
+    def _request(self, method:str, path:str, data:dict = None) -> requests.Response:
+        """
+        Sends a request to the server (GET with game_id and player_id as query, POST with data as JSON).
+        If the server answers 429 (too many requests) the player waits as long as the
+        Retry-After header says (at most max_backoff, doubled on every further 429) and sends it again.
+
+        Parameters:
+            method (str): "GET" or "POST"
+            path (str): endpoint, e.g. /connect4/status
+            data (dict): JSON body of a POST (default None)
+
+        Returns:
+            requests.Response: answer of the server
+        """
+        backoff = 1.0
+        while True:
+            if method == "GET":
+                response = requests.get(f"{self.api_url}{path}", params = {"game_id": self.game_id, "player_id": f"{self.id}"})
+            else:
+                response = requests.post(f"{self.api_url}{path}", json = data)
+            if response.status_code != 429:
+                return response
+            try:
+                retry_after = float(response.headers.get("Retry-After", backoff))
+            except ValueError:
+                #Retry-After may also be a date, then the own backoff is used
+                retry_after = backoff
+            time.sleep(min(max(retry_after, backoff), self.max_backoff))
+            backoff = min(backoff * 2, self.max_backoff)
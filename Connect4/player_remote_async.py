@@ -0,0 +1,326 @@
+import asyncio
+import aiohttp
+import numpy as np
+
+from player import Player
+from bots import get_strategy
+from search import rows_board
+
+
+async def read_json(response:aiohttp.ClientResponse) -> dict:
+    """
+    Returns the JSON body of a response. Error pages which aren't JSON (e.g. a 502 of a proxy
+    or an HTML error page of Flask) give {"message": body} instead of raising.
+
+    Parameters:
+        response (aiohttp.ClientResponse): answer of the server
+
+    Returns:
+        dict: JSON body (None for an empty body of a successful request)
+    """
+    if response.status < 400:
+        return await response.json(content_type=None)
+    try:
+        body = await response.json(content_type=None)
+    except ValueError:
+        body = None
+    return body if isinstance(body, dict) else {"message": await response.text()}
+
+
+class Player_Remote_Async(Player):
+    """
+    Remote Player with asyncio (same game semantics as Player_Remote, but non-blocking).
+
+    All server requests are coroutines on one aiohttp session, so a single process
+    can drive hundreds of players (load generation, bot farms). Several players
+    may share one session (and its connection pool).
+
+        Attributes:
+            Inherits all Attributes from Player
+
+            api_url (str):          Address of Server, including Port Bsp: http://10.147.17.27:5000
+            game_id (str):          Game on the server the player plays in (None -> default game)
+            session (aiohttp.ClientSession): Session used for the requests
+            poll_interval (float):  Seconds between two status requests while waiting
+            strategy (str):         Bot strategy for make_move_with_bot (see bots.get_strategy)
+            last_state (dict):      State of the game after the player's last move (version, board rows,
+                                    winner, active_player, turn_number), None if the server doesn't send it
+
+        Methods:
+        register_in_game(self) -> str
+            registers the player and reads the board size of the game
+        is_my_turn(self) -> bool
+            checks if it is the player's turn
+        get_game_status(self) -> dict
+            returns the status of the game (False before both players are registered)
+        wait_for_turn(self) -> dict
+            waits until it is the player's turn or the game is over
+        get_board(self) -> list
+            returns the board of the game
+        make_move(self) -> int
+            asks the CLI for a column (without blocking the event loop) and sends the move
+        make_move_with_bot(self) -> int
+            lets the bot select a column and sends the move
+        last_board(self) -> list
+            returns the board after the player's last move (None if unknown)
+        visualize(self, board) -> None
+            prints the board to the CLI
+        celebrate_win(self) -> None
+            prints the win to the CLI
+        close(self) -> None
+            closes the session (if the player created it)
+    """
+
+    MAX_BACKOFF = 30.0          # longest pause in seconds when the server answers 429
+
+    def __init__(self, api_url:str, game_id:str = None, session:aiohttp.ClientSession = None,
+                 poll_interval:float = 0.5, strategy:str = "heuristic") -> None:
+        """
+        Initializes an async remote player. Without a session the player opens its own
+        session with the first request.
+
+        Parameters:
+            api_url (str):          Address of Server, including Port Bsp: http://10.147.17.27:5000
+            game_id (str):          Game on the server (default None -> default game of the server)
+            session (aiohttp.ClientSession): Shared session (default None -> own session)
+            poll_interval (float):  Seconds between two status requests while waiting (default 0.5)
+            strategy (str):         Bot strategy (default "heuristic")
+
+        Returns:
+            None
+        """
+        super().__init__()
+
+        self.api_url: str = api_url
+        self.game_id: str = game_id
+        self.session: aiohttp.ClientSession = session
+        self.poll_interval: float = poll_interval
+        self.strategy: str = strategy
+        self.last_state: dict = None
+        self._own_session: bool = session is None
+        self._bot = get_strategy(strategy)
+
+    async def register_in_game(self) -> str:
+        """
+        Registers the player in the game and reads board size and connect length.
+
+        Parameters:
+            None
+
+        Returns:
+            str: The player's icon.
+
+        Raises:
+            ValueError: if the Registration wasnt successful
+        """
+        response = await self._request("POST", "/connect4/register", {"player_id": f"{self.id}"})
+        self.icon = response[1].get("player_icon") if response[1] else None
+        if self.icon is None:
+            raise ValueError("Failed to register the player in the game")
+
+        status, config = await self._request("GET", "/connect4/config")
+        if status == 200:
+            self.board_height = config.get("rows", self.board_height)
+            self.board_width = config.get("cols", self.board_width)
+            self.connect = config.get("connect", self.connect)
+        return self.icon
+
+    async def is_my_turn(self) -> bool:
+        """
+        Checks if it is the player's turn.
+
+        Parameters:
+            None
+
+        Returns:
+            bool: True if it's the player's turn, False otherwise.
+        """
+        status = await self.get_game_status()
+        return bool(status) and status.get("active_player") == self.icon
+
+    async def get_game_status(self) -> dict:
+        """
+        Gets the game's current status (active player, winner, turn number).
+
+        Parameters:
+            None
+
+        Returns:
+            dict: Status of the game (False if both players aren't registered yet)
+        """
+        status, response = await self._request("GET", "/connect4/status")
+        return response if status == 200 else False
+
+    async def wait_for_turn(self) -> dict:
+        """
+        Waits (without blocking the event loop) until both players are registered and
+        it is the player's turn or the game is over (won or draw, "game_over" of the status).
+        Can be cancelled at any time.
+
+        Parameters:
+            None
+
+        Returns:
+            dict: Status of the game
+        """
+        while True:
+            status = await self.get_game_status()
+            if status and (status.get("game_over") or status.get("active_player") == self.icon):
+                return status
+            await asyncio.sleep(self.poll_interval)
+
+    async def get_board(self) -> list:
+        """
+        Gets the board of the game.
+
+        Parameters:
+            None
+
+        Returns:
+            list: rows of the board (None if the request failed)
+        """
+        status, response = await self._request("GET", "/connect4/board")
+        return response.get("board") if status == 200 else None
+
+    async def make_move(self) -> int:
+        """
+        Asks for a column on the CLI (in a thread, the event loop keeps running)
+        until the server accepts the move.
+
+        Parameters:
+            None
+
+        Returns:
+            int: The column chosen by the player for the move.
+        """
+        while True:
+            try:
+                column = int(await asyncio.to_thread(input, f"Player {self.icon}, enter the column (0-{self.board_width - 1}) where you wanna drop your chip"))
+            except ValueError:
+                print(f"Invalid input: Please enter a number between 0-{self.board_width - 1}")
+                continue
+            if await self._send_move(column):
+                return column
+            print("Invalid move, try again")
+
+    async def make_move_with_bot(self) -> int:
+        """
+        Lets the bot select a column on the current board and sends the move.
+
+        Parameters:
+            None
+
+        Returns:
+            int: The column of the move (None if the board is full or the move was rejected)
+        """
+        board = await self.get_board()
+        if board is None:
+            return None
+        #the strategy runs in a thread, so a slow bot doesn't stall the other games of the event loop
+        column = await asyncio.to_thread(self._bot, np.array(board, dtype=object), self.icon, connect = self.connect)
+        if column is not None and await self._send_move(column):
+            return column
+        return None
+
+    def last_board(self) -> list:
+        """
+        Returns the board after the player's last move, which the server sent with
+        the answer to the move (no extra request).
+
+        Parameters:
+            None
+
+        Returns:
+            list: rows of the board (0 for an empty cell), None if the server didn't send it
+        """
+        if self.last_state is None or "board" not in self.last_state:
+            return None
+        return rows_board(self.last_state["board"])
+
+    async def visualize(self, board:list = None) -> None:
+        """
+        Prints the current board to the CLI ("X" in red and "O" in green).
+
+        Parameters:
+            board (list): Board which was already received from the server (default None -> request it)
+
+        Returns:
+            None
+        """
+        if board is None:
+            board = await self.get_board()
+        if board is None:
+            print("Request error")
+            return
+        for row in board:
+            print(" | ".join(
+                "\033[91mX\033[0m" if cell == "X" else
+                "\033[92mO\033[0m" if cell == "O" else
+                str(cell)
+                for cell in row
+            ))
+        print("\n")
+
+    async def celebrate_win(self) -> None:
+        """
+        Celebration of the async CLI Player
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        print(f"\033[1mCongrats! Player {self.icon}, you have won the Game!\033[0m")
+
+    async def close(self) -> None:
+        """
+        Closes the session, if the player opened it.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        if self._own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _send_move(self, column:int) -> bool:
+        """
+        Sends a move to the server, returns True if it was accepted. The answer has the
+        new state of the game (saved in last_state), so it doesn't have to be requested.
+        """
+        self.last_state = None
+        status, response = await self._request("POST", "/connect4/make_move",
+                                               {"column": int(column), "player_id": f"{self.id}", "state": True})
+        if status == 200:
+            #servers without the state answer only with column and player_id
+            self.last_state = response.get("state")
+        return status == 200
+
+    async def _request(self, method:str, path:str, data:dict = None) -> tuple[int, dict]:
+        """
+        Sends a request with the game_id of the player (query for GET, JSON for POST)
+        and returns the status code and the JSON response. On 429 (too many requests)
+        the player waits as long as Retry-After says (doubled on every further 429, max. MAX_BACKOFF).
+        """
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        backoff = 1.0
+        while True:
+            if method == "GET":
+                params = {"game_id": self.game_id, "player_id": f"{self.id}"} if self.game_id else {"player_id": f"{self.id}"}
+                request = self.session.get(f"{self.api_url}{path}", params = params)
+            else:
+                request = self.session.post(f"{self.api_url}{path}", json = {**data, "game_id": self.game_id})
+            async with request as response:
+                if response.status != 429:
+                    return response.status, await read_json(response)
+                try:
+                    retry_after = float(response.headers.get("Retry-After", backoff))
+                except ValueError:
+                    retry_after = backoff
+            await asyncio.sleep(min(max(retry_after, backoff), self.MAX_BACKOFF))
+            backoff = min(backoff * 2, self.MAX_BACKOFF)
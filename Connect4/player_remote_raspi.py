@@ -1,8 +1,8 @@
-import time
-import random
-import requests
-import numpy as np
 from player_remote import Player_Remote
+from player_remote_tcp import Player_Remote_TCP
+from render import SenseHatRenderer, board_pixels, check_board_size, BLACK, RED_CROSS
+from animation import AnimationScheduler, hold, message, matrix_rain, chip_drop
+from joystick import JoystickInput, ColumnSelector
 
 
 class Player_Raspi_Remote(Player_Remote):
@@ -16,12 +16,16 @@ class Player_Raspi_Remote(Player_Remote):
 
         The following attributes are only for Remote Raspi Player
         color (tuple): Color in RGB Format for the player
-        sense (Sensehat): Sensehat instance for the player
+        sense (SenseHatRenderer): Diff-based renderer in front of the Sensehat of the player
+        animations (AnimationScheduler): Plays the animations without blocking the player
+        joystick (JoystickInput): Debounced joystick events of the SenseHat
 
     Methods:
 
         register_in_game(self)->None
             Uses Registration Method of Player_Remote but adds then a color to the player
+        join_lobby(self, rating, rows, cols, connect)->None
+            Uses the lobby of Player_Remote and adds then a color to the player
         visualize_choice(self, column:int)->None
             Visualizes de Choice on the Raspberry Pi when moving the joystick
         visualize(self) -> None
@@ -39,7 +43,7 @@ class Player_Raspi_Remote(Player_Remote):
 
         Parameters:
             api_url (str): Address of Server, including Port Bsp: http://10.147.17.27:5000
-            sense (SenseHat): SenseHat instance for the player
+            sense (SenseHat or SenseHatRenderer): SenseHat (renderer) for the player
         
         Returns:
             Nothing
@@ -56,6 +60,13 @@ class Player_Raspi_Remote(Player_Remote):
             self.sense: SenseHat = kwargs["sense"]
         except KeyError:
             raise ValueError(f"{type(self).__name__} requires a 'sense' (SenseHat instance) attribute")
+        #all drawing goes through a diff-based renderer (shared if the coordinator passes one)
+        if not isinstance(self.sense, SenseHatRenderer):
+            self.sense = SenseHatRenderer(self.sense)
+        #animations run on the scheduler thread (shared if the coordinator passes one)
+        self.animations: AnimationScheduler = kwargs.get("animations") or AnimationScheduler(self.sense)
+        #joystick events arrive through a queue (shared if the coordinator passes one)
+        self.joystick: JoystickInput = kwargs.get("joystick") or JoystickInput(self.sense.stick)
 
         self.color: tuple = None
         
@@ -71,10 +82,38 @@ class Player_Raspi_Remote(Player_Remote):
 
         Returns:
             Nothing
+
+        Raises:
+            ValueError: if the board of the game doesn't fit onto the SenseHat (max. 7x8)
         """
         # first do normal register
         self.icon = super().register_in_game()# call method of Parent Class (Player_Local)
+        check_board_size(self.board_height, self.board_width)
+        self._set_color()
+
+    def join_lobby(self, rating:float = None, rows:int = 7, cols:int = 8, connect:int = 4) -> None:
+        """
+        Waits in the lobby of the server until paired (method of Player_Remote) then assigns
+        a color to the player.
+
+        Parameters:
+            rating (float): rating of the player (default None -> first come, first served)
+            rows (int), cols (int), connect (int): wanted board (default 7x8, connect 4)
+
+        Returns:
+            Nothing
 
+        Raises:
+            ValueError: if the wanted board doesn't fit onto the SenseHat (max. 7x8)
+        """
+        check_board_size(rows, cols)
+        self.icon = super().join_lobby(rating, rows, cols, connect)
+        self._set_color()
+
+    def _set_color(self) -> None:
+        """
+        Sets the color of the player depending on the icon.
+        """
         #setting color of Player
         if self.icon == "X":
             self.color = (255,0,0)
@@ -98,61 +137,38 @@ class Player_Raspi_Remote(Player_Remote):
         Returns:
             None
         """
-        #Clear previous selected column
-        for col in range(8):
-            self.sense.set_pixel(col, 0, (0,0,0))
-        
-        #Light up the selected Column
-        self.sense.set_pixel(column,0,self.color)
+        #Clear previous selected column and light up the selected Column (top row of the board frame)
+        frame = list(self.animations.base_frame)
+        frame[:8] = [BLACK] * 8
+        frame[column] = self.color
+        self.animations.show(frame)
 
     
-    def visualize(self) -> None:
+    def visualize(self, board:list = None) -> None:
         """
         Makes an API-request to get the gameboard and visualizes it on the sensehat.
 
         Parameters:
-            None
+            board (list): Board which was already received from the server (default None -> request it)
 
         Returns:
             None
         """
        
-        #Gets the gameboard from the server and makes it to a array
-        response = requests.get(f"{self.api_url}/connect4/board")
-        if response.status_code == 200:
+        #Gets the gameboard from the server (once for SenseHat and CLI)
+        if board is None:
+            response = self._request("GET", "/connect4/board")
+            if response.status_code != 200:
+                #if the request failed the status code is printed
+                print(f"Request error {response.status_code}")
+                return
             board = response.json().get("board")
-            board = np.array(board).reshape(7, 8)
-            
-            #Matrix for the sensehat
-            pixel_matrix=[]
-
-            # adds an empty row with the no color so that the matrix is 8x8
-            for i in range(8):
-                pixel_matrix.append((0,0,0))
-
-            #for every Row and for every column in the gameboard there will be the colors set dependend on the icon and added to the pixel_matrix
-            for row in range(7):
-                for col in range(8):
-                    if row < 7 and col < 8:
-                        if board[row, col] == 0:
-                            pixel_matrix.append((0,0,0))
-                        elif board[row, col] == "X":
-                            pixel_matrix.append((255,0,0))
-                        elif board[row, col] == "O":
-                            pixel_matrix.append((0,255,0))
-                        else:
-                            pixel_matrix.append((0,0,0))
-        
-        #if the request failed the status code is printed
-        else:
-            print(f"Request error {response.status_code}")
-                
-        #pixel_matrix gets set on the sensehat
-        self.sense.set_pixels(pixel_matrix)
-        
-        
+
+        #pixel_matrix gets set on the sensehat (the renderer only pushes the changed pixels)
+        self.animations.show(board_pixels(board))
+
         #Visualzation for CLI
-        super().visualize()
+        super().visualize(board)
 
         
 
@@ -167,55 +183,32 @@ class Player_Raspi_Remote(Player_Remote):
             None
 
         Returns:
-            col (int): the selected column (0...7)
+            col (int): the selected column (0...board_width-1)
         """
-        column = 0
+        #the sensehat can only show 8 columns
+        selector = ColumnSelector(self.board_width, on_change = self.visualize_choice)
+        self.visualize_choice(selector.column)
         while True:
-            self.sense.set_pixel(column,0,self.color)
-            
-            
-            #watches the joystick events if left/right the method calls visualize_choice
-            #if the joystick event is middle it sends an API request to valid the move
-            for event in self.sense.stick.get_events():
+            #waits for the next joystick event (delivered by the input thread, no polling):
+            #left/right move the selection (visualize_choice), middle confirms the column
+            column = selector.feed(self.joystick.get())
+            if column is not None:
+                response = self._send_move(column)
+
+                #if API request returns True, we return the column
+                if response.status_code == 200:
+                    self.animations.play(chip_drop(self.animations.base_frame, column, self.color), "chip drop")
+                    return column
                 
-                if event.direction == "right" and event.action =="pressed":
-                    if column < 7:
-                        column += 1
-                        self.visualize_choice(column)
-                        time.sleep(0.1)
-                if event.direction == "left" and event.action == "pressed":
-                    if column > 0:
-                        column -= 1
-                        self.visualize_choice(column)
-                        time.sleep(0.1)
-                if event.direction == "middle" and event.action == "pressed":
-                    move = {"column": column, "player_id": f"{self.id}"}
-                    response = requests.post(f"{self.api_url}/connect4/make_move", json = move)
-
-                    #if API request returns True, we return the column
-                    if response.status_code == 200:
-                        return column
-                
-                        
+                    
             
-                    else:
-                        # Invalid move, when check_move returns false
-                        red = (255, 0, 0)
-                        white = (0, 0, 0)
-                        red_cross_matrix = [
-                                        white, white, white, red,   red,   white, white, white,
-                                        white, white, white, red,   red,   white, white, white,
-                                        white, white, white, red,   red,   white, white, white,
-                                        red,   red,   red,   red,   red,   red,   red,   red,
-                                        red,   red,   red,   red,   red,   red,   red,   red,
-                                        white, white, white, red,   red,   white, white, white,
-                                        white, white, white, red,   red,   white, white, white,
-                                        white, white, white, red,   red,   white, white, white
-                                    ]
-                        self.sense.set_pixels(red_cross_matrix)
-                        time.sleep(0.5)
-                        self.visualize()
-                        print(f"Invalid move! Please try again.")
+                else:
+                    # Invalid move, when check_move returns false
+                    #the red cross is shown for 0.5 s, then the board again (without blocking)
+                    self.animations.play(hold(RED_CROSS, 0.5, self.animations.fps), "invalid move")
+                    self.visualize()
+                    self.visualize_choice(column)
+                    print(f"Invalid move! Please try again.")
 
             
         
@@ -233,37 +226,10 @@ class Player_Raspi_Remote(Player_Remote):
         Returns:
             None
         """
-        self.sense.show_message(f"You won!", text_colour = self.color, scroll_speed = 0.05)
-
-        # Create a 8x8 grid of black (background)
-        black = (0, 0, 0)
-        matrix = [[black for _ in range(8)] for _ in range(8)]
-        
-        # Start the matrix rain effect
-        while True:
-            # Shift all rows down
-            matrix = [row[:] for row in matrix]  # Copy current state
-            
-            # Randomly add green pixels to the top row (simulating falling rain)
-            for col in range(8):
-                if random.random() < 0.1:  # Adjust this value for more/less rain
-                    matrix[0][col] = self.color  # New green pixel at the top
-            
-            # Shift all pixels down and remove the bottom row
-            for row in range(7, 0, -1):
-                for col in range(8):
-                    matrix[row][col] = matrix[row - 1][col]
-
-            # Clear the screen and update with new matrix
-            self.sense.set_pixels([pixel for row in matrix for pixel in row])
-            
-            # Wait for a short time to simulate the fall of the rain
-            time.sleep(0.1)
-
-            if all(pixel == self.color for row in matrix for pixel in row):
-                time.sleep(3)
-                self.sense.clear()
-                break
+        #message and matrix rain effect are queued, the screen is cleared afterwards
+        self.animations.play(message(f"You won!", self.color), "won")
+        self.animations.play(matrix_rain(self.color, hold_frames = round(3 * self.animations.fps)), "matrix rain")
+        self.animations.show([BLACK] * 64)
 
         # CLI celebration
         super().celebrate_win()
@@ -279,5 +245,12 @@ class Player_Raspi_Remote(Player_Remote):
             None
         """
 
-        self.sense.show_message(f"Game over", text_colour = self.color, scroll_speed = 0.05)
+        self.animations.play(message(f"Game over", self.color), "lost")
         
+
+
+class Player_Raspi_Remote_TCP(Player_Remote_TCP, Player_Raspi_Remote):
+    """
+    Remote Raspi Player over the binary TCP protocol of the server:
+    the SenseHat player of Player_Raspi_Remote with the transport of Player_Remote_TCP.
+    """
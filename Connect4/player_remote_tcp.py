@@ -0,0 +1,282 @@
+import queue
+import socket
+import threading
+from urllib.parse import urlparse
+
+from player_remote import Player_Remote
+import tcp_protocol as protocol
+
+
+class _Answer:
+    """
+    Answer of the TCP protocol in the shape of a requests.Response (status_code, json()).
+    """
+    __slots__ = ("status_code", "_data")
+
+    def __init__(self, status_code:int, data:dict) -> None:
+        self.status_code: int = status_code
+        self._data: dict = data
+
+    def json(self) -> dict:
+        return self._data
+
+
+class Player_Remote_TCP(Player_Remote):
+    """
+    Remote Player over the binary TCP protocol of the server (see tcp_protocol.py)
+
+    Same methods as Player_Remote, only the transport differs: _request() answers the
+    requests of the game (register, config, status, board, make_move) over one open TCP
+    connection with binary frames instead of HTTP and JSON. All other requests (e.g. the
+    lobby) still go over HTTP. Subclasses of Player_Remote work unchanged on top of it
+    (see Player_Raspi_Remote_TCP).
+
+    With push (default) the server sends the state after every change of the game, so the
+    status is known without asking: while the opponent moves, get_game_status() waits for
+    the next change (max. poll_interval) instead of polling the server.
+
+        Attributes:
+            Inherits all Attributes from Player_Remote
+
+            tcp_address (tuple): host and port of the TCP protocol
+            push (bool): the server pushes every change of the game
+            poll_interval (float): max. seconds a status request waits for a change in the opponent's turn
+
+        Methods:
+        close(self) -> None
+            closes the connection
+    """
+
+    def __init__(self, api_url:str, tcp_port:int = 5001, push:bool = True, poll_interval:float = 0.5,
+                 **kwargs) -> None:
+        """
+        Initializes a remote player over TCP (the connection is opened with the first request).
+
+        Parameters:
+            api_url (str): Address of Server, including Port Bsp: http://10.147.17.27:5000 (host of the TCP protocol)
+            tcp_port (int): port of the TCP protocol (default 5001)
+            push (bool): let the server push every change of the game (default True)
+            poll_interval (float): max. seconds a status request waits for a change (default 0.5)
+            kwargs: further arguments of Player_Remote (e.g. game_id)
+
+        Returns:
+            None
+        """
+        super().__init__(api_url, **kwargs)
+        self.tcp_address: tuple = (urlparse(api_url).hostname, tcp_port)
+        self.push: bool = push
+        self.poll_interval: float = poll_interval
+        self._socket: socket.socket = None
+        self._answers: queue.Queue = queue.Queue()
+        self._joined: tuple = None              # (game_id, player_id) the connection is bound to
+        self._config: dict = None
+        self._state: dict = None                # latest state (answers and pushes), decoded
+        self._seen: int = -1                    # version of the latest state a status request returned
+        self._changed = threading.Condition()
+        self._lock = threading.Lock()           # one request at a time
+        self._routes: dict = {
+            ("POST", "/connect4/register"): self._register,
+            ("GET", "/connect4/config"): self._get_config,
+            ("GET", "/connect4/status"): self._get_status,
+            ("GET", "/connect4/board"): self._get_board,
+            ("POST", "/connect4/make_move"): self._make_move,
+        }
+
+    def close(self) -> None:
+        """
+        Closes the TCP connection.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+            self._joined = None
+
+    def _request(self, method:str, path:str, data:dict = None):
+        """
+        Answers the requests of the game over the TCP protocol, all others over HTTP.
+
+        Parameters:
+            method (str): "GET" or "POST"
+            path (str): endpoint, e.g. /connect4/status
+            data (dict): JSON body of a POST (default None)
+
+        Returns:
+            _Answer or requests.Response: answer with status_code and json()
+        """
+        route = self._routes.get((method, path))
+        if route is None:
+            return super()._request(method, path, data)
+        with self._lock:
+            return route(data or {})
+
+    def _register(self, data:dict) -> _Answer:
+        answer = self._join(register=True)
+        if isinstance(answer, _Answer):
+            return answer
+        return _Answer(200, {"player_icon": answer})
+
+    def _get_config(self, data:dict) -> _Answer:
+        answer = self._ensure_joined()
+        return answer or _Answer(200, dict(self._config))
+
+    def _get_status(self, data:dict) -> _Answer:
+        answer = self._ensure_joined()
+        if answer is not None:
+            return answer
+        state = self._current_state()
+        if isinstance(state, _Answer):
+            return state
+        if not state["ready"]:
+            return _Answer(400, {"status": "false"})
+        return _Answer(200, {"active_player": state["active_player"],
+                             "winner": {"icon": state["winner"]} if state["winner"] else None,
+                             "turn_number": state["turn_number"],
+                             "draw": state["finished"] and not state["winner"],
+                             "game_over": state["finished"]})
+
+    def _get_board(self, data:dict) -> _Answer:
+        answer = self._ensure_joined()
+        if answer is not None:
+            return answer
+        state = self._state if self.push and self._state is not None else self._fetch_state()
+        if isinstance(state, _Answer):
+            return state
+        return _Answer(200, {"board": self._board(state)})
+
+    def _make_move(self, data:dict) -> _Answer:
+        answer = self._ensure_joined()
+        if answer is not None:
+            return answer
+        column = data.get("column")
+        if not isinstance(column, int) or not 0 <= column <= 0xFFFF:
+            return _Answer(400, {"success": False})
+        kind, payload = self._call(protocol.MOVE, protocol.COLUMN.pack(column))
+        if kind != protocol.STATE_:
+            return _Answer(400, {"success": False})
+        state = self._update(protocol.decode_state(payload))
+        #same answer as /connect4/make_move with "state": true
+        return _Answer(200, {"column": column, "player_id": data.get("player_id"), "state": {
+            "version": state["version"], "active_player": state["active_player"],
+            "winner": {"icon": state["winner"]} if state["winner"] else None,
+            "turn_number": state["turn_number"],
+            "draw": state["finished"] and not state["winner"], "game_over": state["finished"],
+            "board": ["".join(protocol.ICONS[cell] or "." for cell in state["cells"][start:start + state["cols"]])
+                      for start in range(0, len(state["cells"]), state["cols"])]}})
+
+    def _ensure_joined(self) -> _Answer:
+        """
+        Binds the connection to the game of the player (e.g. after the lobby), returns an error answer or None.
+        """
+        if self._joined == (self.game_id, f"{self.id}"):
+            return None
+        answer = self._join(register=False)
+        return answer if isinstance(answer, _Answer) else None
+
+    def _join(self, register:bool):
+        """
+        Sends JOIN, returns the icon of the player (None if not registered) or an error answer.
+        """
+        flags = (protocol.REGISTER if register else 0) | (protocol.SUBSCRIBE if self.push else 0)
+        kind, payload = self._call(protocol.JOIN, bytes((flags,)) +
+                                   protocol.pack_strings(self.game_id or "", f"{self.id}"))
+        if kind != protocol.JOINED_:
+            return self._error(payload)
+        icon, rows, cols, connect = protocol.JOINED.unpack(payload)
+        self._joined = (self.game_id, f"{self.id}")
+        self._config = {"rows": rows, "cols": cols, "connect": connect}
+        with self._changed:
+            self._state, self._seen = None, -1
+        return protocol.ICONS[icon]
+
+    def _current_state(self):
+        """
+        Latest state of the game. With push it comes without a request: a status request in the
+        opponent's turn (or before the game starts) waits for the next change, max. poll_interval.
+        """
+        if not self.push or self._state is None:
+            return self._update(self._fetch_state())
+        with self._changed:
+            state = self._state
+            waiting = not state["finished"] and (not state["ready"] or state["active_player"] != self.icon)
+            if waiting and state["version"] <= self._seen:
+                self._changed.wait_for(lambda: self._state["version"] > self._seen, self.poll_interval)
+            self._seen = self._state["version"]
+            return self._state
+
+    def _fetch_state(self):
+        kind, payload = self._call(protocol.GET_STATE)
+        if kind != protocol.STATE_:
+            return self._error(payload)
+        return protocol.decode_state(payload)
+
+    def _update(self, state):
+        """
+        Keeps the newest of the known states (answers and pushes may arrive in any order).
+        """
+        if isinstance(state, _Answer):
+            return state
+        with self._changed:
+            if self._state is None or state["version"] >= self._state["version"]:
+                self._state = state
+                self._changed.notify_all()
+            return self._state
+
+    def _board(self, state:dict) -> list:
+        cols = state["cols"]
+        return [[protocol.ICONS[cell] or 0 for cell in state["cells"][start:start + cols]]
+                for start in range(0, len(state["cells"]), cols)]
+
+    def _error(self, payload:bytes) -> _Answer:
+        code = payload[0] if payload else protocol.BAD_FRAME
+        return _Answer(404 if code == protocol.UNKNOWN_GAME else 400,
+                       {"message": protocol.ERRORS.get(code, "error")})
+
+    def _call(self, kind:int, payload:bytes = b"") -> tuple:
+        """
+        Sends a request frame and waits for its answer (kind, payload).
+        """
+        if self._socket is None:
+            self._connect()
+        self._socket.sendall(protocol.frame(kind, payload))
+        answer = self._answers.get()
+        if answer is None:
+            raise ConnectionError("connection to the server closed")
+        return answer
+
+    def _connect(self) -> None:
+        """
+        Opens the connection (without Nagle's algorithm, every frame is sent at once)
+        and starts the thread which reads the answers and pushes.
+        """
+        self._socket = socket.create_connection(self.tcp_address)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._answers = queue.Queue()
+        threading.Thread(target=self._read, args=(self._socket, self._answers), daemon=True).start()
+
+    def _read(self, connection:socket.socket, answers:queue.Queue) -> None:
+        stream = connection.makefile("rb")
+        try:
+            while True:
+                header = stream.read(protocol.HEADER.size)
+                if len(header) < protocol.HEADER.size:
+                    break
+                length, kind = protocol.HEADER.unpack(header)
+                payload = stream.read(length)
+                if kind == protocol.PUSH:
+                    self._update(protocol.decode_state(payload))
+                else:
+                    answers.put((kind, payload))
+        except (OSError, ValueError):
+            pass
+        finally:
+            answers.put(None)
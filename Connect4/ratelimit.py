@@ -0,0 +1,161 @@
+import itertools
+import math
+import threading
+import time
+
+from flask import request, jsonify
+
+
+# requests per second and burst of a well-behaved client (a remote player polls about twice a second)
+DEFAULT_LIMITS = {
+    "status": (5.0, 20),
+    "board": (5.0, 20),
+    "make_move": (5.0, 10),
+    "analyze": (2.0, 10),
+    "new_game": (1.0, 10),
+    "lobby": (1.0, 5),
+    "batch/moves": (2.0, 10),           # one batch carries the moves of many games
+    "batch/status": (2.0, 10),
+    "*": (10.0, 40),
+}
+
+
+class RateLimiter:
+    """
+    Token Bucket Rate Limiter per client and endpoint
+
+    Every IP address has one bucket per endpoint with the limits of `players_per_ip` players
+    (several players behind one address, e.g. NAT or two clients on one machine). A request
+    with the player_id of a player who is registered in the requested game (checked with
+    `is_player`) takes a token from the bucket of that player as well, so one player can't use
+    up the share of the others behind the same address. A player_id is never trusted on its own:
+    a client can't escape the limit with new ids or drain the bucket of another player.
+    A bucket holds up to `burst` tokens and refills with `rate` tokens per second,
+    every request takes one token. Without a token the request is answered with
+    429 Too Many Requests and a Retry-After header (seconds until the next token).
+
+    A bucket is a small list in a dict and is refilled lazily when it is used, so a request
+    costs O(1) and nothing runs in the background. Full buckets are the same as new ones,
+    so they are dropped when the dict grows beyond max_buckets.
+
+    Attributes:
+        limits (dict): endpoint -> (rate per second, burst) of one player, "*" is used for all other endpoints
+        players_per_ip (int): an IP address gets this many times the limits of a player
+        is_player: function(game_id, player_id) -> bool, True if the player is registered in the game
+                   (None -> the player_id of a request is ignored, only IP addresses are limited)
+        max_buckets (int): number of buckets after which full buckets are dropped
+        clock: function returning the current time in seconds (default time.monotonic)
+
+    Methods:
+        acquire(self, client, endpoint, scale) -> float
+            Takes a token, returns 0 or the seconds until the next token
+        limit_request(self) -> tuple
+            Flask before_request hook, answers limited requests with 429
+    """
+
+    def __init__(self, limits:dict, players_per_ip:int = 4, is_player = None, max_buckets:int = 100000,
+                 clock = time.monotonic) -> None:
+        """
+        Initializes the rate limiter.
+
+        Parameters:
+            limits (dict): endpoint (e.g. "status") -> (rate per second, burst) of one player, "*" -> all other endpoints
+                           (an endpoint without limit and without "*" isn't limited)
+            players_per_ip (int): an IP address gets this many times the limits of a player (default 4)
+            is_player: function(game_id, player_id) -> bool which checks the registration of a player
+                       (default None -> only IP addresses are limited, e.g. in the router which has no games)
+            max_buckets (int): number of buckets after which full buckets are dropped (default 100000)
+            clock: function returning the current time in seconds (default time.monotonic)
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: if a rate, burst or players_per_ip isn't positive
+        """
+        for rate, burst in limits.values():
+            if rate <= 0 or burst < 1:
+                raise ValueError("rate and burst of a limit must be positive")
+        if players_per_ip < 1:
+            raise ValueError("players_per_ip must be positive")
+        self.limits: dict = dict(limits)
+        self.players_per_ip: int = players_per_ip
+        self.is_player = is_player
+        self.max_buckets: int = max_buckets
+        self.clock = clock
+        self._buckets: dict = {}            # (client, endpoint) -> [tokens, last refill, rate, burst]
+        self._lock = threading.Lock()
+
+    def acquire(self, client, endpoint:str, scale:int = 1) -> float:
+        """
+        Takes a token from the bucket of a client for an endpoint.
+
+        Parameters:
+            client: key of the client, e.g. ("ip", address) or ("player", player_id)
+            endpoint (str): name of the endpoint (e.g. "status")
+            scale (int): multiplies rate and burst of the limit (default 1, e.g. players_per_ip)
+
+        Returns:
+            float: 0 if the request may pass, otherwise seconds until the bucket has a token again
+        """
+        limit = self.limits.get(endpoint, self.limits.get("*"))
+        if limit is None:
+            return 0
+        rate, burst = limit[0] * scale, limit[1] * scale
+        if endpoint not in self.limits:
+            endpoint = "*"          #all unlisted endpoints share one bucket
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get((client, endpoint))
+            if bucket is None:
+                if len(self._buckets) >= self.max_buckets:
+                    self._drop_full(now)
+                bucket = self._buckets[(client, endpoint)] = [burst, now, rate, burst]
+            else:
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / rate
+
+    def limit_request(self):
+        """
+        Flask before_request hook: limits the requests to /connect4/<endpoint> per IP address and,
+        if the player_id of the request (query or JSON) is registered in its game, per player.
+
+        Parameters:
+            None
+
+        Returns:
+            tuple: 429 response with Retry-After if the client has to wait, otherwise None
+        """
+        if not request.path.startswith("/connect4/"):
+            return None
+        endpoint = request.path[len("/connect4/"):]
+        wait = self.acquire(("ip", request.remote_addr), endpoint, self.players_per_ip)
+        if self.is_player is not None:
+            data = request.get_json(silent=True) if request.is_json else None
+            data = data if isinstance(data, dict) else {}
+            player_id = request.args.get("player_id") or data.get("player_id")
+            game_id = request.args.get("game_id") or data.get("game_id")
+            #only a registered player has a bucket of its own (ids are made up for free)
+            if isinstance(player_id, str) and self.is_player(game_id, player_id):
+                wait = max(wait, self.acquire(("player", player_id), endpoint))
+        if wait == 0:
+            return None
+        retry_after = max(1, math.ceil(wait))
+        return jsonify({"message": "too many requests", "retry_after": wait}), 429, {"Retry-After": str(retry_after)}
+
+    def _drop_full(self, now:float) -> None:
+        """
+        Drops the buckets which are full again (the lock has to be held by the caller).
+        If most buckets are in use (e.g. many addresses at once), the oldest ones
+        are dropped as well, so the sweep runs at most every max_buckets / 4 new clients.
+        """
+        for key, (tokens, last, rate, burst) in list(self._buckets.items()):
+            if tokens + (now - last) * rate >= burst:
+                del self._buckets[key]
+        excess = len(self._buckets) - self.max_buckets * 3 // 4
+        for key in list(itertools.islice(self._buckets, max(excess, 0))):
+            del self._buckets[key]
@@ -0,0 +1,364 @@
+import time
+import random
+import argparse
+import threading
+from collections import deque
+
+
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+ICON_COLORS = {"X": RED, "O": GREEN}
+
+# red cross shown after an invalid move
+RED_CROSS = [RED if row in (3, 4) or col in (3, 4) else BLACK for row in range(8) for col in range(8)]
+
+# largest board the LED matrix shows (the top row is the column selection)
+MAX_ROWS, MAX_COLS = 7, 8
+
+
+def check_board_size(rows:int, cols:int) -> None:
+    """
+    Checks if a board fits onto the SenseHat (see board_pixels). Larger boards
+    can't be shown or played with the joystick.
+
+    Parameters:
+        rows (int): height of the board
+        cols (int): width of the board
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: if the board is larger than MAX_ROWS x MAX_COLS
+    """
+    if rows > MAX_ROWS or cols > MAX_COLS:
+        raise ValueError(f"The SenseHat shows boards up to {MAX_ROWS}x{MAX_COLS}, this board is {rows}x{cols}")
+
+
+def board_pixels(board) -> list:
+    """
+    Maps a board onto the 8x8 pixels of the SenseHat. The top row of the SenseHat shows
+    the column selection -> the lowest 7 rows and first 8 columns of the board are shown.
+
+    Parameters:
+        board: the board (np.ndarray or nested list, "X" / "O" for the chips)
+
+    Returns:
+        list: 64 pixels (row by row)
+    """
+    pixels = [BLACK] * 64
+    rows = len(board)
+    for row in range(max(0, rows - 7), rows):
+        for col, cell in enumerate(board[row][:8]):
+            if cell in ICON_COLORS:
+                pixels[(row - rows + 8) * 8 + col] = ICON_COLORS[cell]
+    return pixels
+
+
+class SenseHatRenderer:
+    """
+    Diff-based render layer in front of a SenseHat
+
+    Has the drawing methods of the SenseHat (set_pixel, set_pixels, clear, show_message)
+    and keeps the last frame written to the LED matrix. A new frame only pushes the pixels
+    which changed: a few changes as single set_pixel calls, many changes as one set_pixels
+    call. Unchanged frames cost nothing. Everything else (e.g. stick) is passed through
+    to the SenseHat, so the renderer can be handed to the players instead of the SenseHat.
+    All players drawing on the same SenseHat must share one renderer.
+
+    Attributes:
+        sense (SenseHat):       the SenseHat (or FakeSenseHat) to draw on
+        bulk_threshold (int):   more changed pixels than this are written with one set_pixels call
+        frames (int):           number of rendered frames
+        pixels_written (int):   number of pixels pushed to the SenseHat
+        calls (int):            number of write calls to the SenseHat
+
+    Methods:
+        set_pixels(self, pixels) -> int
+            Renders a whole frame (pushes only the changed pixels)
+        set_pixel(self, x, y, color) -> int
+            Sets one pixel (if it changed)
+        clear(self, color) -> int
+            Renders a frame in one color
+        show_message(self, *args, **kwargs) -> None
+            Scrolls a message and forgets the cached frame
+        invalidate(self) -> None
+            Forgets the cached frame, the next frame is written completely
+    """
+
+    def __init__(self, sense, bulk_threshold:int = 4) -> None:
+        """
+        Initializes the renderer. The first frame is always written completely.
+
+        Parameters:
+            sense (SenseHat): the SenseHat (or FakeSenseHat) to draw on
+            bulk_threshold (int): changed pixels up to which single set_pixel calls are used (default 4)
+
+        Returns:
+            None
+        """
+        self.sense = sense
+        self.bulk_threshold: int = bulk_threshold
+        self.frames: int = 0
+        self.pixels_written: int = 0
+        self.calls: int = 0
+        self._frame: list = None        # last frame on the LED matrix (None -> unknown)
+
+    def __getattr__(self, name:str):
+        # everything which isn't drawing (stick, sensors, ...) goes straight to the SenseHat
+        return getattr(self.sense, name)
+
+    def set_pixels(self, pixels:list) -> int:
+        """
+        Renders a frame: compares it with the cached frame and pushes only the changed pixels.
+
+        Parameters:
+            pixels (list): 64 pixels (row by row) as RGB tuples or lists
+
+        Returns:
+            int: number of pixels pushed to the SenseHat
+        """
+        frame = [tuple(pixel) for pixel in pixels]
+        if len(frame) != 64:
+            raise ValueError("Pixel lists must have 64 elements")
+        self.frames += 1
+
+        if self._frame is None:
+            changed = list(range(64))
+        else:
+            changed = [i for i in range(64) if frame[i] != self._frame[i]]
+
+        if len(changed) > self.bulk_threshold:
+            self.sense.set_pixels(frame)
+            self.calls += 1
+        else:
+            for i in changed:
+                self.sense.set_pixel(i % 8, i // 8, frame[i])
+            self.calls += len(changed)
+        self.pixels_written += len(changed)
+        self._frame = frame
+        return len(changed)
+
+    def set_pixel(self, x:int, y:int, color) -> int:
+        """
+        Sets one pixel, if it differs from the cached frame.
+
+        Parameters:
+            x (int): column of the pixel (0..7)
+            y (int): row of the pixel (0..7)
+            color: RGB tuple or list
+
+        Returns:
+            int: number of pixels pushed to the SenseHat (0 or 1)
+        """
+        color = tuple(color)
+        if self._frame is not None and self._frame[y * 8 + x] == color:
+            return 0
+        self.sense.set_pixel(x, y, color)
+        self.calls += 1
+        self.pixels_written += 1
+        if self._frame is not None:
+            self._frame[y * 8 + x] = color
+        return 1
+
+    def clear(self, color = BLACK) -> int:
+        """
+        Renders a frame in one color (default all pixels off).
+
+        Parameters:
+            color: RGB tuple or list (default black)
+
+        Returns:
+            int: number of pixels pushed to the SenseHat
+        """
+        return self.set_pixels([color] * 64)
+
+    def show_message(self, *args, **kwargs) -> None:
+        """
+        Scrolls a message over the SenseHat (see SenseHat.show_message).
+        The message overwrites the LED matrix -> the cached frame is forgotten.
+        """
+        self.sense.show_message(*args, **kwargs)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        Forgets the cached frame (e.g. after drawing on the SenseHat directly),
+        so the next frame is written completely.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self._frame = None
+
+
+class FakeStickEvent:
+    """
+    Joystick event of the FakeSenseHat (same fields as sense_hat.InputEvent).
+    """
+
+    def __init__(self, direction:str, action:str = "pressed") -> None:
+        self.timestamp: float = time.time()
+        self.direction: str = direction
+        self.action: str = action
+
+
+class FakeStick:
+    """
+    Joystick of the FakeSenseHat: events are queued with push() and returned
+    by get_events() or wait_for_event() like the events of the real joystick.
+    """
+
+    def __init__(self) -> None:
+        self._events: deque = deque()
+        self._available = threading.Condition()
+
+    def push(self, direction:str, action:str = "pressed") -> None:
+        with self._available:
+            self._events.append(FakeStickEvent(direction, action))
+            self._available.notify_all()
+
+    def get_events(self) -> list:
+        with self._available:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+    def wait_for_event(self, emptybuffer:bool = False) -> FakeStickEvent:
+        with self._available:
+            if emptybuffer:
+                self._events.clear()
+            while not self._events:
+                self._available.wait()
+            return self._events.popleft()
+
+
+class FakeSenseHat:
+    """
+    In-memory stand-in for the SenseHat, to run, test and benchmark the Raspi players
+    on a normal machine. Counts all write calls and written pixels; optionally every
+    call and pixel can be delayed to emulate the cost of the real LED matrix.
+
+    Attributes:
+        pixels (list):          the 64 pixels of the LED matrix (row by row)
+        stick (FakeStick):      joystick, events are added with stick.push()
+        calls (int):            number of write calls
+        pixels_written (int):   number of written pixels
+        messages (list):        all texts shown with show_message
+        call_delay (float):     emulated seconds per write call
+        pixel_delay (float):    emulated seconds per written pixel
+
+    Methods:
+        set_pixel(self, x, y, *color) -> None
+        set_pixels(self, pixels) -> None
+        get_pixel(self, x, y) -> list
+        get_pixels(self) -> list
+        clear(self, *color) -> None
+        show_message(self, text, **kwargs) -> None
+    """
+
+    def __init__(self, call_delay:float = 0.0, pixel_delay:float = 0.0) -> None:
+        self.pixels: list = [BLACK] * 64
+        self.stick: FakeStick = FakeStick()
+        self.calls: int = 0
+        self.pixels_written: int = 0
+        self.messages: list = []
+        self.call_delay: float = call_delay
+        self.pixel_delay: float = pixel_delay
+
+    def set_pixel(self, x:int, y:int, *color) -> None:
+        if not (0 <= x < 8 and 0 <= y < 8):
+            raise ValueError("X and Y position must be between 0 and 7")
+        color = color[0] if len(color) == 1 else color
+        self.pixels[y * 8 + x] = tuple(color)
+        self._write(1)
+
+    def set_pixels(self, pixels:list) -> None:
+        if len(pixels) != 64:
+            raise ValueError("Pixel lists must have 64 elements")
+        self.pixels = [tuple(pixel) for pixel in pixels]
+        self._write(64)
+
+    def get_pixel(self, x:int, y:int) -> list:
+        return list(self.pixels[y * 8 + x])
+
+    def get_pixels(self) -> list:
+        return [list(pixel) for pixel in self.pixels]
+
+    def clear(self, *color) -> None:
+        color = (color[0] if len(color) == 1 else color) or BLACK
+        self.set_pixels([color] * 64)
+
+    def show_message(self, text:str, **kwargs) -> None:
+        self.messages.append(text)
+        self.pixels = [BLACK] * 64
+        self._write(64)
+
+    def _write(self, pixels:int) -> None:
+        """
+        Counts a write call (and emulates its cost).
+        """
+        self.calls += 1
+        self.pixels_written += pixels
+        if self.call_delay or self.pixel_delay:
+            time.sleep(self.call_delay + pixels * self.pixel_delay)
+
+
+def benchmark(games:int = 100, call_delay:float = 0.0, pixel_delay:float = 0.0, seed:int = 1) -> dict:
+    """
+    Renders random games (one frame per move plus the joystick selection before every move)
+    once with full frames straight to a FakeSenseHat and once through the SenseHatRenderer.
+
+    Parameters:
+        games (int): number of random games (default 100)
+        call_delay (float): emulated seconds per write call of the LED matrix (default 0)
+        pixel_delay (float): emulated seconds per written pixel (default 0)
+        seed (int): seed of the random games (default 1)
+
+    Returns:
+        dict: frames, pixels written, write calls and frames per second of both variants
+    """
+    rng = random.Random(seed)
+    frames = []
+    for _ in range(games):
+        board = [[0] * 8 for _ in range(7)]
+        heights = [0] * 8
+        icon = "X"
+        while any(height < 7 for height in heights):
+            #joystick selection in the top row, then the chip
+            column = rng.choice([col for col in range(8) if heights[col] < 7])
+            selection = board_pixels(board)
+            selection[column] = ICON_COLORS[icon]
+            frames.append(selection)
+            heights[column] += 1
+            board[7 - heights[column]][column] = icon
+            frames.append(board_pixels(board))
+            icon = "O" if icon == "X" else "X"
+
+    results = {}
+    for name in ("full", "diff"):
+        sense = FakeSenseHat(call_delay, pixel_delay)
+        target = sense if name == "full" else SenseHatRenderer(sense)
+        start = time.perf_counter()
+        for frame in frames:
+            target.set_pixels(frame)
+        elapsed = time.perf_counter() - start
+        results[name] = {"frames": len(frames), "pixels_written": sense.pixels_written,
+                         "calls": sense.calls, "frames_per_second": len(frames) / elapsed}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the diff-based SenseHat rendering")
+    parser.add_argument("--games", type=int, default=100, help="number of random games (default 100)")
+    parser.add_argument("--call-delay", type=float, default=0.0, help="emulated seconds per write call")
+    parser.add_argument("--pixel-delay", type=float, default=0.0, help="emulated seconds per written pixel")
+    args = parser.parse_args()
+
+    for name, result in benchmark(args.games, args.call_delay, args.pixel_delay).items():
+        print(f"{name}: {result['frames']} frames, {result['pixels_written']} pixels in {result['calls']} calls, "
+              f"{result['frames_per_second']:.0f} frames/s")
@@ -0,0 +1,784 @@
+import argparse
+import bisect
+import hashlib
+import itertools
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import partial
+
+import requests
+from requests.adapters import HTTPAdapter
+from flask import Flask, Response, request, jsonify
+
+from lobby import Lobby
+from ratelimit import RateLimiter
+from timers import TimerService
+
+
+class HashRing:
+    """
+    Consistent Hashing of game ids to shards
+
+    Every shard is placed `replicas` times on a ring of 64 bit hashes, a game belongs to the
+    next shard point after the hash of its id. A joining shard takes over about 1/n of the
+    games (from all shards), a leaving shard hands its games to the shards after its points,
+    all other games keep their shard.
+        node_for:       O(log(n * replicas)) with bisect
+        add / remove:   O(replicas * log(n * replicas))
+
+    Attributes:
+        replicas (int): points of every shard on the ring
+
+    Methods:
+        add(self, node) -> None
+            Places a shard on the ring
+        remove(self, node) -> None
+            Removes a shard from the ring
+        node_for(self, key) -> str
+            Returns the shard of a key
+        nodes(self) -> list
+            Returns all shards
+    """
+
+    def __init__(self, nodes:list = (), replicas:int = 64) -> None:
+        """
+        Initializes the ring with the given shards.
+
+        Parameters:
+            nodes (list): names of the shards (e.g. their URLs)
+            replicas (int): points of every shard on the ring (default 64)
+
+        Returns:
+            None
+        """
+        self.replicas: int = replicas
+        self._points: list = []             # sorted hashes of all shard points
+        self._owners: dict = {}             # hash -> shard
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self) -> int:
+        return len(self.nodes())
+
+    @staticmethod
+    def _hash(key:str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def add(self, node:str) -> None:
+        """
+        Places a shard on the ring (nothing happens if it is there already).
+
+        Parameters:
+            node (str): name of the shard
+
+        Returns:
+            None
+        """
+        for replica in range(self.replicas):
+            point = self._hash(f"{node}#{replica}")
+            if point not in self._owners:
+                bisect.insort(self._points, point)
+                self._owners[point] = node
+
+    def remove(self, node:str) -> None:
+        """
+        Removes a shard from the ring.
+
+        Parameters:
+            node (str): name of the shard
+
+        Returns:
+            None
+        """
+        for replica in range(self.replicas):
+            point = self._hash(f"{node}#{replica}")
+            if self._owners.get(point) == node:
+                del self._owners[point]
+                del self._points[bisect.bisect_left(self._points, point)]
+
+    def node_for(self, key:str) -> str:
+        """
+        Returns the shard of a key.
+
+        Parameters:
+            key (str): e.g. a game_id
+
+        Returns:
+            str: name of the shard
+
+        Raises:
+            LookupError: if the ring is empty
+        """
+        if not self._points:
+            raise LookupError("no shards on the ring")
+        index = bisect.bisect(self._points, self._hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+    def nodes(self) -> list:
+        """
+        Returns all shards on the ring.
+
+        Parameters:
+            None
+
+        Returns:
+            list: names of the shards (sorted)
+        """
+        return sorted(set(self._owners.values()))
+
+
+class _Gate:
+    """
+    Lets many ring lookups pass at once, but pauses them while the shards are rebalanced
+    (a read/write lock: owner() and batch() read the ring, add/remove_shard() change it).
+    Only the lookup passes the gate, not the request to the shard (except new_game),
+    so a rebalance doesn't wait for long-polls.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._passing: int = 0
+        self._closed: bool = False
+
+    @contextmanager
+    def passing(self):
+        with self._condition:
+            while self._closed:
+                self._condition.wait()
+            self._passing += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._passing -= 1
+                self._condition.notify_all()
+
+    @contextmanager
+    def closed(self):
+        with self._condition:
+            while self._closed:
+                self._condition.wait()
+            self._closed = True
+            while self._passing:
+                self._condition.wait()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._closed = False
+                self._condition.notify_all()
+
+
+class LocalShards:
+    """
+    Starts Connect4Server shards as processes on this host (127.0.0.1:base_port, base_port + 1, ...).
+
+    Attributes:
+        base_port (int): port of the first shard
+        server_kwargs (dict): arguments of every Connect4Server (archive_dir gets a folder per shard)
+
+    Methods:
+        start(self) -> str
+            Starts a shard and returns its URL once it answers
+        stop(self, url) -> None
+            Stops a shard
+        close(self) -> None
+            Stops all shards
+    """
+
+    def __init__(self, base_port:int = 5100, **server_kwargs) -> None:
+        self.base_port: int = base_port
+        self.server_kwargs: dict = server_kwargs
+        self._processes: dict = {}          # url -> process
+        self._ports = itertools.count(base_port)
+
+    def start(self, timeout:float = 30.0) -> str:
+        """
+        Starts a shard and waits until it answers.
+
+        Parameters:
+            timeout (float): max. seconds until the shard has to answer (default 30)
+
+        Returns:
+            str: URL of the shard
+
+        Raises:
+            RuntimeError: if the shard doesn't answer in time
+        """
+        import multiprocessing
+        import os
+
+        port = next(self._ports)
+        number = port - self.base_port
+        kwargs = dict(self.server_kwargs)
+        if kwargs.get("archive_dir"):
+            kwargs["archive_dir"] = os.path.join(kwargs["archive_dir"], f"shard-{number}")
+        #spawn: the router already runs threads, which a forked child would inherit in an unknown state
+        #(no daemon process: the shard starts its own process pools)
+        process = multiprocessing.get_context("spawn").Process(target=_serve_shard, args=(port, kwargs),
+                                                               name=f"connect4-shard-{number}")
+        process.start()
+        url = f"http://127.0.0.1:{port}"
+        self._processes[url] = process
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and process.is_alive():
+            try:
+                requests.get(url + "/", timeout=1)
+                return url
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        self.stop(url)
+        raise RuntimeError(f"shard {url} didn't start")
+
+    def stop(self, url:str) -> None:
+        """
+        Stops a shard (its games have to be handed over before).
+
+        Parameters:
+            url (str): URL of the shard
+
+        Returns:
+            None
+        """
+        process = self._processes.pop(url, None)
+        if process is not None:
+            process.terminate()
+            process.join(5)
+
+    def close(self) -> None:
+        for url in list(self._processes):
+            self.stop(url)
+
+
+def _serve_shard(port:int, server_kwargs:dict) -> None:
+    """
+    Runs one shard: a Connect4Server which owns its games in memory (process target of LocalShards).
+    """
+    import multiprocessing
+    import os
+    import signal
+    from werkzeug.serving import make_server
+    from server import Connect4Server
+
+    def stop(*_) -> None:
+        #LocalShards.stop() terminates the shard, the workers of its process pools would be left behind
+        for child in multiprocessing.active_children():
+            child.terminate()
+        os._exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    server = Connect4Server(shard_api=True, default_game=False, swagger=False, **server_kwargs)
+    make_server("127.0.0.1", port, server.app, threaded=True).serve_forever()
+
+
+class ShardRouter:
+    """
+    ShardRouter: Front of a sharded deployment, forwards every request to the shard owning its game.
+
+    The shards are Connect4Servers (with shard_api) which keep their games in memory, the router
+    hashes the game_id of a request (query or JSON, default "default") on a HashRing and
+    forwards the request over a pool of keep-alive connections. Requests without a game
+    (new_game without game_id gets one from the router, POST analyze) go round robin.
+    The lobby runs in the router, so players on different shards are paired; the game
+    of a pair is created on the shard owning its new game_id.
+
+    When a shard joins or leaves, new ring lookups pause, the games whose owner changes are
+    exported from the old shard and imported into the new one, then forwarding goes on.
+    A request which reached the old shard after its game left gets 404 there and is sent
+    once more to the new owner.
+
+    Attributes:
+        ring (HashRing): shard of every game_id
+        launcher (LocalShards): starts and stops local shards (None -> shards are started elsewhere)
+        session (requests.Session): pooled connections to the shards
+        lobby (Lobby): matchmaking of all shards
+        timers (TimerService): expiry of lobby tickets
+        rate_limiter (RateLimiter): token buckets per client and endpoint (None -> unlimited)
+        app (Flask): Flask application of the router
+
+    Endpoints:
+        /connect4/...: forwarded to the shard of the game (lobby and lobby/leave are answered by the router)
+        /connect4/spectate: stream of the shard of the game, passed on while it lasts
+        /connect4/batch/moves, /connect4/batch/status: split by shard, the results are merged in request order
+        /router/shards: GET lists the shards, POST adds a shard (url, or a new local shard)
+        /router/shards/remove: Removes a shard (url), its games move to the other shards
+
+    Methods:
+        forward(self, endpoint, method, params, data) -> tuple
+            Sends a request to the shard of its game
+        owner(self, game_id) -> str
+            Returns the shard owning a game
+        batch(self, kind, data, field) -> list
+            Sends the items of a batch request to the shards of their games
+        open_stream(self, endpoint, params) -> requests.Response
+            Opens a streaming request to the shard of its game
+        add_shard(self, url) -> int
+            Adds a shard and moves its games to it
+        remove_shard(self, url) -> int
+            Moves the games of a shard to the others and removes it
+        run(self, host, port) -> None
+            Starts the router
+    """
+
+    DEFAULT_GAME_ID = "default"
+    MAX_LOBBY_WAIT = 30.0
+    LOBBY_TICKET_TTL = 30.0
+    MAX_BATCH = 1000            # moves or games of one batch request (like Connect4Server.MAX_BATCH)
+
+    def __init__(self, shards:list, replicas:int = 64, pool_size:int = 64, launcher:LocalShards = None,
+                 rate_limits:dict = None) -> None:
+        """
+        Initializes the router.
+
+        Parameters:
+            shards (list): URLs of the shards (e.g. "http://127.0.0.1:5100")
+            replicas (int): points of every shard on the ring (default 64)
+            pool_size (int): kept-alive connections per shard (default 64)
+            launcher (LocalShards): starts new shards for POST /router/shards without url (default None)
+            rate_limits (dict): endpoint -> (requests per second, burst) per player (default None -> unlimited).
+                                The router limits the clients by IP address (4 players each, it can't check
+                                registrations), the shards only see the router.
+
+        Returns:
+            None
+        """
+        self.ring: HashRing = HashRing(shards, replicas)
+        self.launcher: LocalShards = launcher
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.lobby: Lobby = Lobby(self._on_pair)
+        self.timers: TimerService = TimerService()
+        self._gate = _Gate()
+        self._round_robin = itertools.count()
+        self.rate_limiter: RateLimiter = RateLimiter(rate_limits) if rate_limits else None
+        self.app = Flask(__name__)
+        if self.rate_limiter is not None:
+            self.app.before_request(self.rate_limiter.limit_request)
+
+        @self.app.route('/')
+        def index():
+            return "Welcome to the Connect 4 API! (shard router)"
+
+        @self.app.route('/connect4/<path:endpoint>', methods=['GET', 'POST'])
+        def forward(endpoint):
+            data = request.get_json(silent=True) if request.method == 'POST' else None
+            content, status, headers = self.forward(endpoint, request.method, request.args.to_dict(), data,
+                                                    request.headers.get("Accept-Encoding"))
+            return Response(content, status=status, headers=headers)
+
+        @self.app.route('/connect4/spectate', methods=['GET'])
+        def spectate():
+            answer = self.open_stream("spectate", request.args.to_dict())
+            headers = {name: answer.headers[name] for name in ("Content-Type", "Cache-Control", "X-Accel-Buffering")
+                       if name in answer.headers}
+
+            def stream():
+                try:
+                    yield from answer.raw.stream(1024, decode_content=False)
+                finally:
+                    answer.close()
+
+            return Response(stream(), status=answer.status_code, headers=headers)
+
+        @self.app.route('/connect4/batch/<kind>', methods=['POST'])
+        def batch(kind):
+            data = request.get_json(silent=True) or {}
+            field = {"moves": "moves", "status": "game_ids"}.get(kind)
+            if field is None:
+                return jsonify({"message": "unknown batch"}), 404
+            if not isinstance(data.get(field), list):
+                return jsonify({"message": f"no list of {field} provided"}), 400
+            if len(data[field]) > self.MAX_BATCH:
+                return jsonify({"message": f"at most {self.MAX_BATCH} {'moves' if kind == 'moves' else 'games'} per batch"}), 400
+            return jsonify({"results": self.batch(kind, data, field)}), 200
+
+        @self.app.route('/connect4/lobby', methods=['POST'])
+        def join_lobby():
+            data = request.get_json(silent=True) or {}
+            player_id = data.get("player_id")
+            if not player_id:
+                return jsonify({"message": "no player_id provided"}), 400
+            try:
+                config = (int(data.get("rows", 7)), int(data.get("cols", 8)), int(data.get("connect", 4)))
+                rating = float(data["rating"]) if data.get("rating") is not None else None
+                wait = min(float(data.get("wait", 20)), self.MAX_LOBBY_WAIT)
+            except (TypeError, ValueError) as error:
+                return jsonify({"message": str(error)}), 400
+
+            self.timers.cancel(("lobby", player_id))
+            try:
+                self.lobby.join(player_id, rating, config)
+            except ValueError as error:
+                #the shard refused the board of the pair
+                return jsonify({"message": str(error)}), 400
+            match = self.lobby.wait(player_id, wait)
+            if match is None:
+                self.timers.schedule(("lobby", player_id), self.LOBBY_TICKET_TTL, partial(self.lobby.leave, player_id))
+                return jsonify({"status": "waiting", "waiting": self.lobby.waiting()}), 202
+            return jsonify(match), 200
+
+        @self.app.route('/connect4/lobby/leave', methods=['POST'])
+        def leave_lobby():
+            data = request.get_json(silent=True) or {}
+            player_id = data.get("player_id")
+            self.timers.cancel(("lobby", player_id))
+            return jsonify({"left": self.lobby.leave(player_id)}), 200
+
+        @self.app.route('/router/shards', methods=['GET', 'POST'])
+        def shards():
+            if request.method == 'POST':
+                url = (request.get_json(silent=True) or {}).get("url")
+                if url is None:
+                    if self.launcher is None:
+                        return jsonify({"message": "no url provided"}), 400
+                    url = self.launcher.start()
+                moved = self.add_shard(url)
+                return jsonify({"url": url, "moved": moved, "shards": self.ring.nodes()}), 200
+            return jsonify({"shards": self.ring.nodes()}), 200
+
+        @self.app.route('/router/shards/remove', methods=['POST'])
+        def remove_shard():
+            url = (request.get_json(silent=True) or {}).get("url")
+            try:
+                moved = self.remove_shard(url)
+            except ValueError as error:
+                return jsonify({"message": str(error)}), 400
+            if self.launcher is not None:
+                self.launcher.stop(url)
+            return jsonify({"url": url, "moved": moved, "shards": self.ring.nodes()}), 200
+
+    def forward(self, endpoint:str, method:str = "GET", params:dict = None, data:dict = None,
+                accept_encoding:str = None) -> tuple:
+        """
+        Sends a request to the shard owning its game.
+
+        Parameters:
+            endpoint (str): path below /connect4/ (e.g. "make_move")
+            method (str): GET or POST (default GET)
+            params (dict): query parameters (default None)
+            data (dict): JSON body of a POST (default None)
+            accept_encoding (str): Accept-Encoding of the client (default None -> plain content)
+
+        Returns:
+            tuple: (content, status, headers) of the answer of the shard (Content-Type, Content-Encoding,
+                   Vary and Retry-After). A gzipped answer is passed on as it is, without decompressing it.
+        """
+        params = params or {}
+        if endpoint == "new_game":
+            data = dict(data or {})
+            data.setdefault("game_id", str(uuid.uuid4()))
+        game_id = params.get("game_id") or (data or {}).get("game_id")
+
+        def send(url:str) -> requests.Response:
+            return self.session.request(method, f"{url}/connect4/{endpoint}", params=params,
+                                        json=data if method == "POST" else None, timeout=60, stream=True,
+                                        headers={"Accept-Encoding": accept_encoding or "identity"})
+
+        if game_id is None and endpoint == "analyze" and method == "POST":
+            #a supplied position belongs to no game, every shard can analyze it
+            with self._gate.passing():
+                shards = self.ring.nodes()
+                url = shards[next(self._round_robin) % len(shards)]
+            answer = send(url)
+        elif endpoint == "new_game":
+            #a game created on the old owner after the rebalance listed its games would stay there
+            with self._gate.passing():
+                answer = send(self.ring.node_for(game_id))
+        else:
+            #only the lookup waits for a rebalance, not the (maybe long-polling) request
+            url = self.owner(game_id)
+            answer = send(url)
+            if answer.status_code == 404:
+                #the game moved to another shard while the request was on its way
+                owner = self.owner(game_id)
+                if owner != url:
+                    answer.close()
+                    answer = send(owner)
+        content = answer.raw.read(decode_content=False)
+        headers = {name: answer.headers[name] for name in ("Content-Type", "Content-Encoding", "Vary", "Retry-After")
+                   if name in answer.headers}
+        return content, answer.status_code, headers
+
+    def owner(self, game_id:str) -> str:
+        """
+        Returns the shard owning a game (waits while the shards are rebalanced).
+
+        Parameters:
+            game_id (str): id of the game (None -> default game)
+
+        Returns:
+            str: URL of the shard
+        """
+        with self._gate.passing():
+            return self.ring.node_for(game_id if isinstance(game_id, str) and game_id else self.DEFAULT_GAME_ID)
+
+    def batch(self, kind:str, data:dict, field:str) -> list:
+        """
+        Splits a batch request by the shards of its games, sends one batch per shard
+        and merges the results in the order of the request. Items whose game moved to
+        another shard in the meantime are sent once more to the new owner.
+
+        Parameters:
+            kind (str): "moves" or "status"
+            data (dict): JSON body of the batch request
+            field (str): list of the items in the body ("moves" or "game_ids")
+
+        Returns:
+            list: result of every item (see Connect4Server.apply_moves and game_states)
+        """
+        items = data[field]
+        results = [None] * len(items)
+        pending = list(range(len(items)))
+        owners = {}
+        for _ in range(2):
+            with self._gate.passing():
+                by_shard = {}
+                for index in pending:
+                    item = items[index]
+                    game_id = item.get("game_id") if isinstance(item, dict) else item
+                    url = self.ring.node_for(game_id if isinstance(game_id, str) and game_id else self.DEFAULT_GAME_ID)
+                    if owners.get(index) != url:
+                        by_shard.setdefault(url, []).append(index)
+                        owners[index] = url
+            pending = []
+            for url, indices in by_shard.items():
+                answer = self.session.post(f"{url}/connect4/batch/{kind}", timeout=60,
+                                           json={**data, field: [items[index] for index in indices]})
+                if answer.status_code != 200:
+                    try:
+                        error = answer.json().get("message")
+                    except ValueError:
+                        error = None
+                    error = error or f"shard answered {answer.status_code}"
+                    for index in indices:
+                        item = items[index]
+                        results[index] = {"game_id": item.get("game_id") if isinstance(item, dict) else item,
+                                          "ok": False, "error": error}
+                    continue
+                for index, result in zip(indices, answer.json()["results"]):
+                    results[index] = result
+                    if not result["ok"] and result.get("error") == "unknown game_id":
+                        pending.append(index)
+            if not pending:
+                break
+        return results
+
+    def open_stream(self, endpoint:str, params:dict = None) -> requests.Response:
+        """
+        Opens a streaming GET request to the shard owning its game. Shard changes never wait
+        for a stream; if the game moves to another shard, the old shard ends the stream
+        and the client connects again (through the router to the new shard).
+
+        Parameters:
+            endpoint (str): path below /connect4/ (e.g. "spectate")
+            params (dict): query parameters (default None)
+
+        Returns:
+            requests.Response: the open answer of the shard (the caller reads and closes it)
+        """
+        params = params or {}
+        return self.session.get(f"{self.owner(params.get('game_id'))}/connect4/{endpoint}", params=params, stream=True,
+                                timeout=(10, None), headers={"Accept-Encoding": "identity"})
+
+    def _shard_call(self, url:str, path:str, data:dict = None) -> dict:
+        """
+        Calls an endpoint of a shard and returns its JSON answer (raises on errors).
+        """
+        if data is None:
+            answer = self.session.get(url + path, timeout=60)
+        else:
+            answer = self.session.post(url + path, json=data, timeout=60)
+        answer.raise_for_status()
+        return answer.json()
+
+    def _move_games(self, source:str, game_ids:list) -> int:
+        """
+        Moves games from a shard to their owners on the ring (forwarding has to be paused).
+        """
+        targets: dict = {}
+        for game_id in game_ids:
+            target = self.ring.node_for(game_id)
+            if target != source:
+                targets.setdefault(target, []).append(game_id)
+        moved = 0
+        for target, ids in targets.items():
+            state = self._shard_call(source, "/shard/export", {"game_ids": ids})
+            moved += self._shard_call(target, "/shard/import", state)["imported"]
+        return moved
+
+    def add_shard(self, url:str) -> int:
+        """
+        Adds a shard to the ring and moves the games it owns from now on to it.
+
+        Parameters:
+            url (str): URL of the new shard
+
+        Returns:
+            int: number of moved games
+        """
+        with self._gate.closed():
+            if url in self.ring.nodes():
+                return 0
+            others = self.ring.nodes()
+            self.ring.add(url)
+            return sum(self._move_games(other, self._shard_call(other, "/shard/games")["game_ids"])
+                       for other in others)
+
+    def remove_shard(self, url:str) -> int:
+        """
+        Removes a shard from the ring and moves its games to the shards owning them now.
+
+        Parameters:
+            url (str): URL of the shard
+
+        Returns:
+            int: number of moved games
+
+        Raises:
+            ValueError: if the shard is unknown or the last one
+        """
+        with self._gate.closed():
+            shards = self.ring.nodes()
+            if url not in shards:
+                raise ValueError(f"unknown shard {url}")
+            if len(shards) == 1:
+                raise ValueError("the last shard can't be removed")
+            self.ring.remove(url)
+            return self._move_games(url, self._shard_call(url, "/shard/games")["game_ids"])
+
+    def _on_pair(self, config:tuple, player_ids:list) -> list:
+        """
+        Creates the game of two players paired by the lobby on its shard and registers them in order.
+
+        Parameters:
+            config (tuple): rows, cols and connect of the game
+            player_ids (list): ids of both players (the first gets "X")
+
+        Returns:
+            list: match of each player (game_id, player_icon, rows, cols, connect)
+
+        Raises:
+            ValueError: if the shard refuses the game
+        """
+        rows, cols, connect = config
+        content, status, _ = self.forward("new_game", "POST", data={"rows": rows, "cols": cols, "connect": connect})
+        if status != 200:
+            raise ValueError(content.decode(errors="replace"))
+        game_id = json.loads(content)["game_id"]
+        matches = []
+        for player_id in player_ids:
+            content, _, _ = self.forward("register", "POST", data={"game_id": game_id, "player_id": player_id})
+            matches.append({"game_id": game_id, "player_icon": json.loads(content).get("player_icon"),
+                            "rows": rows, "cols": cols, "connect": connect})
+        return matches
+
+    def run(self, host:str = '0.0.0.0', port:int = 5000) -> None:
+        print(f"Router is running on {host}:{port} with shards {', '.join(self.ring.nodes())}")
+        self.app.run(host=host, port=port, threaded=True)
+
+
+def run_shards(shards:int = 2, host:str = '0.0.0.0', port:int = 5000, base_port:int = 5100,
+               **server_kwargs) -> None:
+    """
+    Runs a sharded deployment on this host: `shards` Connect4Server processes on
+    127.0.0.1:base_port, base_port + 1, ... (each owns its games in memory) and the
+    ShardRouter in front of them on host:port. More shards join with POST /router/shards.
+
+    Parameters:
+    shards (int): number of shards at the start (default 2)
+    host (str): address of the router (default 0.0.0.0)
+    port (int): port of the router (default 5000)
+    base_port (int): port of the first shard (default 5100)
+    server_kwargs: further arguments of Connect4Server (e.g. allow_takeback, archive_dir, move_timeout),
+                   rate_limits are applied by the router
+
+    Returns:
+    None
+
+    Raises:
+    ValueError: if a journal is requested (games move between the shards)
+    """
+    if server_kwargs.get("journal_dir"):
+        raise ValueError("a sharded deployment can't be journaled")
+    rate_limits = server_kwargs.pop("rate_limits", None)
+    launcher = LocalShards(base_port, **server_kwargs)
+    try:
+        router = ShardRouter([launcher.start() for _ in range(shards)], launcher=launcher, rate_limits=rate_limits)
+        router.forward("new_game", "POST", data={"game_id": ShardRouter.DEFAULT_GAME_ID})
+        router.run(host, port)
+    finally:
+        launcher.close()
+
+
+def benchmark(shard_counts:list = (1, 2, 4), clients:int = 16, games:int = 20, moves:int = 8,
+              port:int = 5090, base_port:int = 5100) -> list:
+    """
+    Measures the moves per second through the router for different numbers of shards:
+    `clients` threads each create `games` games, register two players and play `moves`
+    moves in every game (the columns are chosen so nobody wins).
+
+    Parameters:
+        shard_counts (list): numbers of shards to measure (default 1, 2, 4)
+        clients (int): concurrent clients (default 16)
+        games (int): games per client (default 20)
+        moves (int): moves per game (default 8)
+        port (int): port of the router (default 5090)
+        base_port (int): port of the first shard (default 5100)
+
+    Returns:
+        list: dict with shards, moves, seconds and moves_per_second per shard count
+    """
+    from werkzeug.serving import make_server
+
+    def client(url:str, number:int) -> None:
+        session = requests.Session()
+        for game in range(games):
+            game_id = session.post(url + "/connect4/new_game", json={}).json()["game_id"]
+            players = [f"bench-{number}-{game}-X", f"bench-{number}-{game}-O"]
+            for player_id in players:
+                session.post(url + "/connect4/register", json={"game_id": game_id, "player_id": player_id})
+            for move in range(moves):
+                #O moves first, every column gets one chip of each player at most
+                session.post(url + "/connect4/make_move",
+                             json={"game_id": game_id, "player_id": players[(move + 1) % 2], "column": move % 8})
+
+    results = []
+    for count in shard_counts:
+        launcher = LocalShards(base_port + 100 * len(results), finished_ttl=None, idle_ttl=None)
+        try:
+            router = ShardRouter([launcher.start() for _ in range(count)], pool_size=clients)
+            http = make_server("127.0.0.1", port + len(results), router.app, threaded=True)
+            threading.Thread(target=http.serve_forever, daemon=True).start()
+            url = f"http://127.0.0.1:{port + len(results)}"
+            threads = [threading.Thread(target=client, args=(url, number)) for number in range(clients)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            seconds = time.perf_counter() - start
+            http.shutdown()
+            router.timers.close()
+        finally:
+            launcher.close()
+        total = clients * games * moves
+        results.append({"shards": count, "moves": total, "seconds": seconds, "moves_per_second": total / seconds})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of the sharded deployment per number of shards")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4], help="numbers of shards (default 1 2 4)")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent clients (default 16)")
+    parser.add_argument("--games", type=int, default=20, help="games per client (default 20)")
+    args = parser.parse_args()
+
+    for result in benchmark(args.shards, args.clients, args.games):
+        print(f"{result['shards']} shards: {result['moves_per_second']:.0f} moves/s "
+              f"({result['moves']} moves in {result['seconds']:.1f} s)")
@@ -0,0 +1,456 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, Future, TimeoutError as FutureTimeoutError
+
+# local includes
+from game import Connect4
+
+
+WIN_SCORE = 100000      # score of a win on the next move, every ply later costs 1 point
+_windows_cache: dict = {}
+
+
+def board_rows(board) -> list[str]:
+    """
+    Converts a board (np.ndarray or nested list, 0 for an empty cell) into
+    one string per row ("." for an empty cell).
+
+    Parameters:
+        board: the board
+
+    Returns:
+        list[str]: rows of the board
+    """
+    return ["".join(str(cell) if cell not in (0, "", None) else "." for cell in row) for row in board]
+
+
+def rows_board(rows:list[str]) -> list:
+    """
+    Converts the rows of a board (see board_rows) back into nested lists
+    (0 for an empty cell, otherwise the icon), like /connect4/board returns them.
+
+    Parameters:
+        rows (list[str]): rows of the board
+
+    Returns:
+        list: the board
+    """
+    return [[cell if cell != "." else 0 for cell in row] for row in rows]
+
+
+def position_hash(rows:list[str], active_player_icon:str, connect:int) -> str:
+    """
+    Returns a short hash of a position, used as key of the analysis cache.
+
+    Parameters:
+        rows (list[str]): rows of the board (see board_rows)
+        active_player_icon (str): icon of the player who has to move
+        connect (int): chips in a row needed to win
+
+    Returns:
+        str: hash of the position (16 hex digits)
+    """
+    key = "/".join(rows) + f"|{active_player_icon}|{connect}"
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+def game_from_rows(rows:list[str], active_player_icon:str, connect:int = 4) -> Connect4:
+    """
+    Creates a Connect4 game with the players "X" and "O" from the rows of a board.
+
+    Parameters:
+        rows (list[str]): rows of the board (see board_rows)
+        active_player_icon (str): icon of the player who has to move
+        connect (int): chips in a row needed to win (default 4)
+
+    Returns:
+        Connect4: game in the given position
+    """
+    game = Connect4(len(rows), len(rows[0]), connect)
+    game.register_player("X")
+    game.register_player("O")
+    for row, cells in enumerate(rows):
+        for col, cell in enumerate(cells):
+            if cell != ".":
+                game.Board[row, col] = cell
+                game.heights[col] += 1
+    game.active_player["id"] = active_player_icon
+    game.active_player["icon"] = active_player_icon
+    return game
+
+
+def _windows(rows:int, cols:int, connect:int) -> list:
+    """
+    Returns all lines of `connect` cells on the board (cached per board size).
+    """
+    key = (rows, cols, connect)
+    if key not in _windows_cache:
+        windows = []
+        for row in range(rows):
+            for col in range(cols):
+                for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_row, end_col = row + (connect - 1) * d_row, col + (connect - 1) * d_col
+                    if 0 <= end_row < rows and 0 <= end_col < cols:
+                        windows.append([(row + i * d_row, col + i * d_col) for i in range(connect)])
+        _windows_cache[key] = windows
+    return _windows_cache[key]
+
+
+def evaluate(game:Connect4) -> int:
+    """
+    Heuristic value of a position for the active player: every line which still
+    can be completed counts the square of its chips, for the active player positive
+    and for the opponent negative.
+
+    Parameters:
+        game (Connect4): position to evaluate
+
+    Returns:
+        int: heuristic value (far below WIN_SCORE)
+    """
+    board = game.Board
+    icon = game.active_player["icon"]
+    rows, cols = board.shape
+    score = 0
+    for window in _windows(rows, cols, game.connect):
+        mine = theirs = 0
+        for row, col in window:
+            cell = board[row, col]
+            if cell == icon:
+                mine += 1
+            elif cell != 0:
+                theirs += 1
+        if mine and not theirs:
+            score += mine * mine
+        elif theirs and not mine:
+            score -= theirs * theirs
+    return score
+
+
+def negamax(game:Connect4, depth:int, alpha:int, beta:int, ply:int = 1, deadline:float = None) -> int:
+    """
+    Negamax search with alpha-beta pruning on the move stack of the game (play / undo),
+    so no board is copied during the search.
+
+    Parameters:
+        game (Connect4): position to search (is restored at the end)
+        depth (int): remaining search depth in plies
+        alpha (int): lower bound
+        beta (int): upper bound
+        ply (int): distance of the next move from the root position
+        deadline (float): time.perf_counter() value at which the search is aborted (default None -> no limit)
+
+    Returns:
+        int: score for the active player (WIN_SCORE - ply for a win, 0 for a draw)
+
+    Raises:
+        TimeoutError: the deadline passed (the game is left in the middle of the search)
+    """
+    if deadline is not None and time.perf_counter() > deadline:
+        raise TimeoutError("search deadline passed")
+    rows, cols = game.Board.shape
+    if sum(game.heights) >= rows * cols:
+        return 0
+    if depth == 0:
+        return evaluate(game)
+
+    best = -WIN_SCORE
+    for column in _move_order(cols):
+        if not game.play(column):
+            continue
+        if game.winner:
+            score = WIN_SCORE - ply
+        else:
+            score = -negamax(game, depth - 1, -beta, -alpha, ply + 1, deadline)
+        game.undo()
+        if score > best:
+            best = score
+        if best > alpha:
+            alpha = best
+        if alpha >= beta:
+            break
+    return best
+
+
+def _move_order(cols:int) -> list:
+    """
+    Columns ordered from the center to the edges (best moves first -> more pruning).
+    """
+    return sorted(range(cols), key=lambda col: abs(2 * col - (cols - 1)))
+
+
+def analyze_position(rows:list[str], active_player_icon:str, connect:int = 4, depth:int = 6,
+                     deadline:float = None) -> dict:
+    """
+    Scores every column of a position for the active player.
+
+    Every column gets a result:
+        "win"       the active player wins in `in` moves
+        "loss"      the opponent wins in `in` moves
+        "draw"      the board fills up without a winner
+        "heuristic" nothing proven within the depth, `score` is the heuristic value
+    Full columns get None.
+
+    Parameters:
+        rows (list[str]): rows of the board (see board_rows)
+        active_player_icon (str): icon of the player who has to move
+        connect (int): chips in a row needed to win (default 4)
+        depth (int): search depth in plies (default 6)
+        deadline (float): time.perf_counter() value at which the search is aborted (default None -> no limit)
+
+    Returns:
+        dict: scores (one entry per column), best_column, depth
+
+    Raises:
+        TimeoutError: the deadline passed before all columns were searched
+    """
+    game = game_from_rows(rows, active_player_icon, connect)
+    height, width = game.Board.shape
+    scores = []
+    best_column, best_score = None, None
+
+    for column in range(width):
+        if not game.play(column):
+            scores.append(None)
+            continue
+        if game.winner:
+            score = WIN_SCORE - 1
+        else:
+            score = -negamax(game, depth - 1, -WIN_SCORE, WIN_SCORE, 2, deadline)
+        empty_cells = height * width - sum(game.heights)
+        game.undo()
+
+        if score > WIN_SCORE // 2:
+            entry = {"column": column, "result": "win", "in": (WIN_SCORE - score + 1) // 2, "score": score}
+        elif score < -WIN_SCORE // 2:
+            entry = {"column": column, "result": "loss", "in": (WIN_SCORE + score) // 2, "score": score}
+        elif score == 0 and empty_cells < depth:
+            entry = {"column": column, "result": "draw", "in": empty_cells, "score": 0}
+        else:
+            entry = {"column": column, "result": "heuristic", "score": score}
+        scores.append(entry)
+
+    #best score wins, on equal scores the column closer to the center
+    for column in _move_order(width):
+        if scores[column] is not None and (best_score is None or scores[column]["score"] > best_score):
+            best_column, best_score = column, scores[column]["score"]
+
+    return {"scores": scores, "best_column": best_column, "depth": depth}
+
+
+def deepening_search(rows:list[str], active_player_icon:str, connect:int = 4, depth:int = 6,
+                     time_limit:float = None) -> dict:
+    """
+    Iterative deepening up to `depth`: analyzes the position with depth 1, 2, 3, ...
+    until the depth is reached, every column is proven or the time limit runs out,
+    and returns the deepest finished analysis. Its "depth" is less than requested if
+    the time ran out. Depth 1 always finishes.
+
+    Parameters:
+        rows (list[str]): rows of the board (see board_rows)
+        active_player_icon (str): icon of the player who has to move
+        connect (int): chips in a row needed to win (default 4)
+        depth (int): max. search depth in plies (default 6)
+        time_limit (float): seconds for the whole search (default None -> search `depth` without limit)
+
+    Returns:
+        dict: analysis of the deepest finished search (see analyze_position)
+    """
+    if time_limit is None:
+        return analyze_position(rows, active_player_icon, connect, depth)
+
+    deadline = time.perf_counter() + time_limit
+    analysis = analyze_position(rows, active_player_icon, connect, 1)
+    for current in range(2, depth + 1):
+        if all(entry is None or entry["result"] != "heuristic" for entry in analysis["scores"]):
+            break
+        try:
+            analysis = analyze_position(rows, active_player_icon, connect, current, deadline)
+        except TimeoutError:
+            break
+    return analysis
+
+
+def timed_search(rows:list[str], active_player_icon:str, connect:int = 4, budget:float = 1.0) -> dict:
+    """
+    Iterative deepening: analyzes the position with depth 1, 2, 3, ... until a win
+    is found, every column is proven or the time budget runs out (the running depth
+    is aborted at the deadline) and returns the deepest finished analysis.
+
+    Parameters:
+        rows (list[str]): rows of the board (see board_rows)
+        active_player_icon (str): icon of the player who has to move
+        connect (int): chips in a row needed to win (default 4)
+        budget (float): time budget in seconds (default 1.0)
+
+    Returns:
+        dict: analysis of the deepest finished search (see analyze_position)
+    """
+    deadline = time.perf_counter() + budget
+    empty_cells = sum(row.count(".") for row in rows)
+    analysis = analyze_position(rows, active_player_icon, connect, 1)
+    for depth in range(2, empty_cells + 1):
+        #stop when a result is proven
+        proven = all(entry is None or entry["result"] != "heuristic" for entry in analysis["scores"])
+        if proven or analysis["scores"][analysis["best_column"]]["result"] == "win":
+            break
+        try:
+            analysis = analyze_position(rows, active_player_icon, connect, depth, deadline)
+        except TimeoutError:
+            break
+    return analysis
+
+
+def search_move(board_np, active_player_icon:str, rng = None, connect:int = 4) -> int:
+    """
+    Search bot (same signature as the bots in bots.py): plays the best column of analyze_position.
+
+    Parameters:
+        board_np (np.ndarray): current board (0 for an empty cell)
+        active_player_icon (str): icon of the player who has to move
+        rng: not used (the search is deterministic)
+        connect (int): chips in a row needed to win (default 4)
+
+    Returns:
+        int: selected column (None if the board is full)
+    """
+    return analyze_position(board_rows(board_np), active_player_icon, connect, depth=4)["best_column"]
+
+
+class AnalyzerBusy(RuntimeError):
+    """
+    Raised by Analyzer.analyze when max_pending searches are already running.
+    """
+
+
+class Analyzer:
+    """
+    Runs position analyses in a process pool and keeps the results in a shared LRU cache.
+
+    Requests never wait for a search: analyze() returns the cached result or starts
+    the search in the pool (only once per position, also if several requests ask for it)
+    and returns None. Popular positions are analyzed once and then served from the cache.
+    Every search deepens iteratively and stops after time_limit seconds, so a large board
+    can't occupy a worker for long; the deepest finished depth is cached.
+
+    Attributes:
+        workers (int):      Number of worker processes (0 -> search in the calling thread)
+        cache_size (int):   Max. number of cached analyses
+        time_limit (float): Max. seconds per search
+        max_pending (int):  Max. number of searches which run or wait for a worker
+        hits (int):         Number of requests answered from the cache
+        misses (int):       Number of requests which started a search
+
+    Methods:
+        analyze(self, rows, active_player_icon, connect, depth, timeout) -> dict
+            Returns the analysis of a position (None if it is still running)
+        close(self) -> None
+            Stops the worker processes
+    """
+
+    def __init__(self, workers:int = None, cache_size:int = 10000, time_limit:float = 5.0,
+                 max_pending:int = 64) -> None:
+        """
+        Initializes the Analyzer. The process pool is started on the first search.
+
+        Parameters:
+            workers (int): Number of worker processes (default None -> number of cores, 0 -> no pool)
+            cache_size (int): Max. number of cached analyses (default 10000)
+            time_limit (float): Max. seconds per search (default 5.0, None -> no limit)
+            max_pending (int): Max. number of searches which run or wait for a worker (default 64)
+
+        Returns:
+            None
+        """
+        self.workers: int = workers
+        self.cache_size: int = cache_size
+        self.time_limit: float = time_limit
+        self.max_pending: int = max_pending
+        self.hits: int = 0
+        self.misses: int = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._pending: dict = {}
+        self._lock = threading.RLock()      # reentrant: without pool the search finishes inside _submit
+        self._pool: ProcessPoolExecutor = None
+
+    def analyze(self, rows:list[str], active_player_icon:str, connect:int = 4, depth:int = 6, timeout:float = 0) -> dict:
+        """
+        Returns the analysis of a position from the cache or starts it in the pool.
+
+        Parameters:
+            rows (list[str]): rows of the board (see board_rows)
+            active_player_icon (str): icon of the player who has to move
+            connect (int): chips in a row needed to win (default 4)
+            depth (int): search depth in plies (default 6)
+            timeout (float): seconds to wait for a running search (default 0 -> don't wait, None -> wait)
+
+        Returns:
+            dict: analysis with "position" and "cached" (None if the search is still running)
+
+        Raises:
+            AnalyzerBusy: the search would have to be started, but max_pending searches are running
+        """
+        key = (position_hash(rows, active_player_icon, connect), depth)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return {**self._cache[key], "position": key[0], "cached": True}
+
+            future = self._pending.get(key)
+            if future is None:
+                if len(self._pending) >= self.max_pending:
+                    raise AnalyzerBusy("too many pending analyses")
+                self.misses += 1
+                future = self._submit(rows, active_player_icon, connect, depth)
+                self._pending[key] = future
+                future.add_done_callback(lambda done, key=key: self._store(key, done))
+
+        if timeout == 0 and not future.done():
+            return None
+        try:
+            result = future.result(timeout)
+        except FutureTimeoutError:
+            return None
+        return {**result, "position": key[0], "cached": False}
+
+    def close(self) -> None:
+        """
+        Stops the worker processes.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _submit(self, rows:list[str], active_player_icon:str, connect:int, depth:int) -> Future:
+        """
+        Starts a search in the pool (or runs it right away without pool). Lock has to be held by the caller.
+        """
+        if self.workers == 0:
+            future = Future()
+            future.set_result(deepening_search(rows, active_player_icon, connect, depth, self.time_limit))
+            return future
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool.submit(deepening_search, rows, active_player_icon, connect, depth, self.time_limit)
+
+    def _store(self, key:tuple, future:Future) -> None:
+        """
+        Moves a finished search from the pending searches into the LRU cache.
+        """
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                return
+            self._cache[key] = future.result()
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
@@ -0,0 +1,231 @@
+import argparse
+import gzip
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, request
+
+try:
+    import orjson                           # optional, several times faster than the json module
+except ImportError:
+    orjson = None
+
+
+def dumps(payload, fast:bool = True) -> bytes:
+    """
+    Encodes a payload as compact JSON (UTF-8), with orjson if it is installed.
+
+    Parameters:
+        payload: dict, list, str, numbers, bool or None
+        fast (bool): use orjson if it is installed (default True)
+
+    Returns:
+        bytes: JSON document
+    """
+    if fast and orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+class ResponseEncoder:
+    """
+    JSON Responses of the Connect4Server
+
+    Payloads are encoded with dumps() (orjson if available, otherwise the json module).
+    Responses of at least gzip_min_size bytes are gzipped for clients which send
+    Accept-Encoding: gzip. Encodings of game state are cached by key (e.g. ("board", game_id))
+    together with a tag of the game version, so all clients polling an unchanged game
+    get the same bytes (and the same gzip) without building or encoding the payload again.
+
+    Attributes:
+        fast (bool): encode with orjson if it is installed
+        gzip_min_size (int): smallest body which is gzipped (None -> never)
+        gzip_level (int): gzip compression level (1 fast ... 9 small)
+        cache_size (int): number of cached encodings (0 -> no cache)
+        hits (int): requests answered from the cache
+        misses (int): requests which had to be encoded
+
+    Methods:
+        respond(self, payload, status, key, tag) -> Response
+            Returns the (cached, maybe gzipped) JSON response of a payload
+        encode(self, payload, key, tag) -> list
+            Returns the cache entry [tag, JSON bytes, gzip bytes or None] of a payload
+        discard(self, *keys) -> None
+            Drops the cached encodings of the keys
+    """
+
+    def __init__(self, fast:bool = True, gzip_min_size:int = 1024, gzip_level:int = 5, cache_size:int = 4096) -> None:
+        """
+        Initializes the encoder.
+
+        Parameters:
+            fast (bool): encode with orjson if it is installed (default True)
+            gzip_min_size (int): smallest body which is gzipped (default 1024, None -> never)
+            gzip_level (int): gzip compression level (default 5)
+            cache_size (int): number of cached encodings (default 4096, 0 -> no cache)
+
+        Returns:
+            None
+        """
+        self.fast: bool = fast
+        self.gzip_min_size: int = gzip_min_size
+        self.gzip_level: int = gzip_level
+        self.cache_size: int = cache_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._cache: OrderedDict = OrderedDict()    # key -> [tag, JSON bytes, gzip bytes]
+        self._lock = threading.Lock()
+
+    def encode(self, payload, key = None, tag = None) -> list:
+        """
+        Encodes a payload, or returns its cached encoding if the key has the same tag.
+
+        Parameters:
+            payload: JSON payload or function building it (only called if the encoding isn't cached)
+            key: hashable cache key (default None -> not cached)
+            tag: version of the payload (e.g. (game version, game start)), a new tag replaces the entry
+
+        Returns:
+            list: [tag, JSON bytes, gzip bytes (None until a client wants them)]
+        """
+        if key is not None and self.cache_size:
+            with self._lock:
+                entry = self._cache.get(key)
+                if entry is not None and entry[0] == tag:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return entry
+        entry = [tag, dumps(payload() if callable(payload) else payload, self.fast), None]
+        if key is not None and self.cache_size:
+            with self._lock:
+                self.misses += 1
+                self._cache[key] = entry
+                self._cache.move_to_end(key)
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return entry
+
+    def discard(self, *keys) -> None:
+        """
+        Drops the cached encodings of the keys, e.g. of a game which leaves the server:
+        its versions start again at 1 when it comes back, so old tags would match again.
+
+        Parameters:
+            keys: cache keys
+
+        Returns:
+            None
+        """
+        with self._lock:
+            for key in keys:
+                self._cache.pop(key, None)
+
+    def respond(self, payload, status:int = 200, key = None, tag = None) -> Response:
+        """
+        Returns the JSON response of a payload, gzipped if it is large and the client accepts gzip.
+
+        Parameters:
+            payload: JSON payload or function building it
+            status (int): HTTP status (default 200)
+            key: hashable cache key (default None -> not cached)
+            tag: version of the payload, see encode()
+
+        Returns:
+            Response: Flask response
+        """
+        entry = self.encode(payload, key, tag)
+        body = entry[1]
+        response = Response(body, status=status, mimetype="application/json")
+        if self.gzip_min_size is not None and len(body) >= self.gzip_min_size:
+            response.vary.add("Accept-Encoding")
+            if request.accept_encodings["gzip"]:
+                if entry[2] is None:
+                    #shared by every client of this version (entries are only replaced, never changed)
+                    entry[2] = gzip.compress(body, self.gzip_level, mtime=0)
+                response.set_data(entry[2])
+                response.headers["Content-Encoding"] = "gzip"
+        return response
+
+
+def benchmark(requests_per_endpoint:int = 2000, sizes:list = ((7, 8), (40, 40))) -> list:
+    """
+    Measures the responses of /connect4/board, /connect4/status and /connect4/analyze (POST)
+    of a Connect4Server for the encoders:
+        stdlib          json module, no cache, no gzip (like jsonify)
+        fast            orjson (if installed), no cache, no gzip
+        fast+cache      orjson and the encoding cache per game version
+        fast+cache+gzip like fast+cache, client sends Accept-Encoding: gzip
+    Serialization cost is the time of building and encoding the payload alone (what the
+    encoder saves), requests per second and bytes per request are measured through the
+    Flask test client (the whole request).
+
+    Parameters:
+        requests_per_endpoint (int): requests per endpoint, board size and encoder (default 2000)
+        sizes (list): (rows, cols) of the measured boards (default 7x8 and 40x40)
+
+    Returns:
+        list: dict with encoder, endpoint, board, encode_us, requests_per_second and bytes_per_request
+    """
+    from server import Connect4Server
+    from search import board_rows
+
+    encoders = [("stdlib", ResponseEncoder(fast=False, gzip_min_size=None, cache_size=0), {}),
+                ("fast", ResponseEncoder(gzip_min_size=None, cache_size=0), {}),
+                ("fast+cache", ResponseEncoder(gzip_min_size=None), {}),
+                ("fast+cache+gzip", ResponseEncoder(), {"Accept-Encoding": "gzip"})]
+    results = []
+    for name, encoder, headers in encoders:
+        server = Connect4Server(swagger=False, analysis_workers=0, encoder=encoder)
+        client = server.app.test_client()
+        for rows, cols in sizes:
+            game_id = server.create_game(rows=rows, cols=cols, connect=4)
+            server.register(game_id, "bench-X")
+            server.register(game_id, "bench-O")
+            for move in range(min(cols, 20)):
+                server.apply_move(game_id, move, ("bench-O", "bench-X")[move % 2])
+            game, version = server.store.get_versioned(game_id)
+            board = game.get_board().tolist()
+            analysis = {"active_player": "X", **server.analyzer.analyze(board_rows(board), "X", 4, 1, timeout=None)}
+            tag = (version, game.started)
+            #payload builders and requests of the endpoints (like in server.py)
+            endpoints = {
+                "board": (lambda: {"board": game.get_board().tolist()}, ("board", game_id),
+                          lambda: client.get(f"/connect4/board?game_id={game_id}", headers=headers)),
+                "status": (lambda: {**game.get_status()}, ("status", game_id),
+                           lambda: client.get(f"/connect4/status?game_id={game_id}", headers=headers)),
+                "analyze": (lambda: analysis, None,
+                            lambda: client.post("/connect4/analyze", headers=headers,
+                                                json={"board": board, "active_player": "X", "depth": 1})),
+            }
+            for endpoint, (build, key, call) in endpoints.items():
+                call()                      #warm up (fills the caches)
+                start = time.perf_counter()
+                for _ in range(requests_per_endpoint):
+                    encoder.encode(build, key, tag)
+                encode_us = (time.perf_counter() - start) / requests_per_endpoint * 1e6
+
+                size = 0
+                start = time.perf_counter()
+                for _ in range(requests_per_endpoint):
+                    size += len(call().get_data())
+                seconds = time.perf_counter() - start
+                results.append({"encoder": name, "endpoint": endpoint, "board": f"{rows}x{cols}",
+                                "encode_us": encode_us, "requests_per_second": requests_per_endpoint / seconds,
+                                "bytes_per_request": size / requests_per_endpoint})
+        server.analyzer.close()
+        server.timers.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serialization cost and bytes on the wire of the server responses")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint and encoder (default 2000)")
+    args = parser.parse_args()
+
+    print(f"fast encoder: {'orjson' if orjson is not None else 'not installed (json module)'}")
+    for result in benchmark(args.requests):
+        print(f"{result['encoder']:>16} {result['endpoint']:>8} {result['board']:>6}: "
+              f"{result['encode_us']:7.1f} us encoding {result['requests_per_second']:7.0f} requests/s "
+              f"{result['bytes_per_request']:8.0f} bytes/request")
@@ -1,9 +1,23 @@
+import os                                                   # debug reloader
+import queue                                                # spectator streams
 import socket                                               # to get own IP
-from flask import Flask, request, jsonify                   # for api
-from flask_swagger_ui import get_swaggerui_blueprint        # for swagger documentation
+import threading                                            # lock for game changes
+import uuid                                                 # ids for new games
+from functools import partial                               # timer callbacks
+from flask import Flask, Response, request, jsonify, stream_with_context   # for api
 
 # local includes
-from game import Connect4
+from compact_game import CompactConnect4                    # compact state, many games per server
+from journal import GameJournal
+from archive import GameArchive
+from search import Analyzer, AnalyzerBusy, board_rows
+from bot_opponent import BotOpponents
+from timers import TimerService
+from lobby import Lobby
+from store import GameStore, MemoryGameStore
+from ratelimit import RateLimiter
+from serializer import ResponseEncoder
+from spectators import SpectatorHub
 
 
 class Connect4Server:
@@ -14,15 +28,46 @@ class Connect4Server:
     retrieving game status, viewing the board, and making moves. It also includes a Swagger UI.
 
     Attributes:
-        game (Connect4): Instance of the Connect 4 game containing game logic and rules.
+        store (GameStore): All hosted Connect 4 games by their game_id (in memory or shared by several workers).
+        game (CompactConnect4): Default game, used when a request contains no game_id.
+        journal (GameJournal): Optional journal to recover the games after a restart.
+        archive (GameArchive): Optional archive where finished games are stored.
+        lock (threading.Lock): Serializes changes of the games (and their journal records).
+        allow_takeback (bool): Enables the /connect4/takeback endpoint.
+        analyzer (Analyzer): Runs position analyses in a process pool with a shared LRU cache.
+        bots (BotOpponents): Server-side bot opponents, thinking in their own process pool.
+        lobby (Lobby): Matchmaking lobby, pairs waiting players into new games.
+        timers (TimerService): Idle, eviction and move clock timers of all games (one heap).
+        idle_ttl (float): Seconds without activity after which a game is evicted (None -> never).
+        finished_ttl (float): Seconds a finished game stays readable before it is evicted (None -> forever).
+        move_timeout (float): Seconds a player has for a move before forfeiting (None -> unlimited).
+        spectators (SpectatorHub): Read-only spectators of the games, every change is encoded once for all of them.
+        encoder (ResponseEncoder): Fast JSON encoding, gzip and an encoding cache per game version of the read endpoints.
+        rate_limiter (RateLimiter): Token buckets per client and endpoint, answers floods with 429 (None -> unlimited).
+        shard_api (bool): Serves the /shard endpoints, the server is one shard behind a ShardRouter (see router.py).
+        listeners (list): Functions called with (game_id, game, version) after every change of a game (under the lock).
+        completion_listeners (list): Functions called with (game_id, game, version) once when a game is finished (under the lock).
         app (Flask): Flask application instance managing the server.
 
     Endpoints:
         /: Provides a welcome message.
-        /connect4/status: Retrieves the current game status.
+        /connect4/status: Retrieves the current game status (with "draw" and "game_over").
         /connect4/register: Allows a new player to register.
         /connect4/board: Returns the current game board state.
-        /connect4/make_move: Allows a player to make a move.
+        /connect4/make_move: Allows a player to make a move (with "state": true the answer has the new state of the game).
+        /connect4/new_game: Creates a new game (optional game_id, rows, cols, connect, bot, bot_time) and returns its game_id.
+        /connect4/config: Returns the board size and connect length of a game.
+        /connect4/takeback: Takes back the last move of a player (only if allow_takeback is set).
+        /connect4/analyze: Scores every column of the current (GET) or a supplied (POST) position.
+        /connect4/lobby: Waits (blocking, max. MAX_LOBBY_WAIT s) until the player is paired into a new game.
+        /connect4/lobby/leave: Removes a player from the lobby.
+        /connect4/spectate: Streams every change of a game to a spectator (server-sent events).
+        /connect4/spectate/poll: Waits (long-poll, max. MAX_SPECTATE_WAIT s) for a newer state of a game than `since`.
+        /connect4/batch/moves: Makes many moves (of many games) in one request, returns the state of each game.
+        /connect4/batch/status: Returns the states of many games in one request.
+        /shard/games, /shard/export, /shard/import: Hand games over between shards (only with shard_api).
+
+        All /connect4 endpoints take an optional game_id (query or JSON), default is "default".
 
     Swagger Configuration:
         URL: '/swagger/connect4/'
@@ -31,47 +76,157 @@ class Connect4Server:
     Methods:
         setup_routes():
                 Defines API endpoints and their logic.
-        run(debug, host, port):
-                Starts the Flask server.
+        get_game(game_id):
+                Returns the game with the given id (or the default game).
+        create_game(game_id, rows, cols, connect, bot, bot_time):
+                Creates a new game (optionally against a server-side bot) and journals it.
+        register(game_id, player_id):
+                Registers a player in a game and journals it.
+        apply_move(game_id, column, player_id):
+                Drops a chip into a column and journals the move.
+        apply_moves(moves, board):
+                Makes many moves, returns the state of the game (or the error) of each move.
+        game_states(game_ids, board):
+                Returns the states (version, status, board) of many games.
+        takeback(game_id, player_id):
+                Takes back the last move of a player and journals it.
+        forfeit(game_id, player_id):
+                Ends a game, the opponent of the player wins. Journals and archives it.
+        evict(game_id):
+                Archives (if needed) and releases a game.
+        export_games(game_ids):
+                Removes games and returns their state (handover to another shard).
+        import_games(state):
+                Takes over games exported by another shard.
+        recover():
+                Rebuilds all games from the latest snapshot and the journal.
+        add_listener(listener), remove_listener(listener):
+                Adds or removes a function called after every change of a game (e.g. the TCP protocol).
+        add_completion_listener(listener), remove_completion_listener(listener):
+                Adds or removes a function called once when a game is finished (won or draw).
+        run(debug, host, port, tcp_port):
+                Starts the Flask server (and the binary TCP protocol on tcp_port).
     """
 
-    def __init__(self) -> None:
+    DEFAULT_GAME_ID = "default"
+    MAX_ANALYSIS_DEPTH = 8
+    MAX_BOT_TIME = 10.0
+    MAX_LOBBY_WAIT = 30.0       # seconds a lobby request blocks at most
+    LOBBY_TICKET_TTL = 30.0     # seconds a waiting player stays in the lobby without asking again
+    MAX_SPECTATE_WAIT = 30.0    # seconds a spectator long-poll blocks at most
+    SPECTATE_KEEPALIVE = 15.0   # seconds between keep-alive comments of an idle spectator stream
+    MAX_BATCH = 1000            # moves or games of one batch request
+
+    def __init__(self, journal_dir:str = None, archive_dir:str = None, allow_takeback:bool = False,
+                 analysis_workers:int = None, bot_workers:int = 2, swagger:bool = True,
+                 idle_ttl:float = 3600.0, finished_ttl:float = 600.0, move_timeout:float = None,
+                 store:GameStore = None, default_game:bool = True, shard_api:bool = False,
+                 rate_limits:dict = None, encoder:ResponseEncoder = None, spectator_queue:int = 16) -> None:
         """
         Initializes the Connect4Server instance.
 
         Sets up the Connect 4 game instance, Flask server, Swagger UI configuration,
-        and API endpoints.
+        and API endpoints. If a journal directory is given, all games are recovered from it.
 
         Parameters:
-        None
+        journal_dir (str): Folder for the game journal (default None -> games only in memory)
+        archive_dir (str): Folder for the archive of finished games (default None -> no archive)
+        allow_takeback (bool): Players may take back their last move (default False)
+        analysis_workers (int): Processes for /connect4/analyze (default None -> number of cores)
+        bot_workers (int): Processes for the server-side bots (default 2)
+        swagger (bool): Serve the Swagger UI (default True, False skips loading flask_swagger_ui)
+        idle_ttl (float): Evict games without activity after this many seconds (default 3600, None -> never)
+        finished_ttl (float): Evict finished games after this many seconds (default 600, None -> never)
+        move_timeout (float): A player who doesn't move in time forfeits (default None -> no move clock)
+        store (GameStore): Where the games are kept (default None -> MemoryGameStore of this process).
+                           Several worker processes can share a SQLiteGameStore.
+        default_game (bool): Create the default game (default True, a shard gets it from the router)
+        shard_api (bool): Serve the /shard endpoints which hand games over to other shards (default False)
+        rate_limits (dict): endpoint -> (requests per second, burst) per registered player, "*" for all other endpoints
+                            (an IP address gets 4 times the limits, see RateLimiter)
+                            (default None -> unlimited, ratelimit.DEFAULT_LIMITS for a public server)
+        encoder (ResponseEncoder): Encodes the responses of status, board, config and analyze
+                                   (default None -> ResponseEncoder(): orjson if installed, gzip from 1 KiB)
+        spectator_queue (int): States a streaming spectator may fall behind before it is dropped (default 16)
 
         Returns:
         None
+
+        Raises:
+        ValueError: if a journal is combined with a shared store (the store is durable itself) or with the shard API
         """
+        if journal_dir and store is not None and not isinstance(store, MemoryGameStore):
+            raise ValueError("the journal only works with the MemoryGameStore")
+        if journal_dir and shard_api:
+            raise ValueError("games handed over between shards can't be journaled")
+        self.shard_api: bool = shard_api
 
-        self.game: Connect4 = Connect4()  # Connect4 game instance
+        self.store: GameStore = store if store is not None else MemoryGameStore()   # all hosted games by game_id
+        self.lock = threading.Lock()                # serializes game changes
+        self.journal: GameJournal = None
+        self.allow_takeback: bool = allow_takeback
+        self.analyzer: Analyzer = Analyzer(workers=analysis_workers)
+        self.archive: GameArchive = GameArchive(archive_dir) if archive_dir else None
+        self.bots: BotOpponents = BotOpponents(self, workers=bot_workers)
+        self.timers: TimerService = TimerService()
+        self.idle_ttl: float = idle_ttl
+        self.finished_ttl: float = finished_ttl
+        self.move_timeout: float = move_timeout
+        self.lobby: Lobby = Lobby(self._on_pair)
+        self.rate_limiter: RateLimiter = RateLimiter(rate_limits, is_player=self._is_player) if rate_limits else None
+        self.encoder: ResponseEncoder = encoder if encoder is not None else ResponseEncoder()
+        self.spectators: SpectatorHub = SpectatorHub(queue_size=spectator_queue)
+        self.listeners: list = []
+        self.completion_listeners: list = []
+        self._completed: set = set()                # finished games whose resources are released
+
+        if journal_dir:
+            self.journal = GameJournal(journal_dir)
+            self.recover()
+            #bots which had to move before the restart continue thinking
+            for game_id in list(self.bots.bots):
+                self.bots.on_change(game_id)
+
+        if default_game and self.DEFAULT_GAME_ID not in self.store:
+            try:
+                self.create_game(self.DEFAULT_GAME_ID)
+            except ValueError:
+                pass                                # created by another worker in the meantime
         self.app: Flask = Flask(__name__)  # Flask app instance
+        if self.rate_limiter is not None:
+            #a flooding client gets 429 before its request touches a game
+            self.app.before_request(self.rate_limiter.limit_request)
 
-        # Swagger UI Configuration
-        SWAGGER_URL = '/swagger/connect4/'
-        API_URL = '/static/swagger.json'
-        
-        swaggerui_blueprint = get_swaggerui_blueprint(
-            SWAGGER_URL,
-            API_URL,
-            config={  # Swagger UI config overrides
-                'app_name': "Connect 4 API",
-                'layout': "BaseLayout"
-            }
-        )
+        if swagger:
+            # Swagger UI Configuration (flask_swagger_ui is only loaded when the UI is wanted)
+            from flask_swagger_ui import get_swaggerui_blueprint
+
+            SWAGGER_URL = '/swagger/connect4/'
+            API_URL = '/static/swagger.json'
 
-        # Registers the Swagger UI blueprint
-        self.app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
+            swaggerui_blueprint = get_swaggerui_blueprint(
+                SWAGGER_URL,
+                API_URL,
+                config={  # Swagger UI config overrides
+                    'app_name': "Connect 4 API",
+                    'layout': "BaseLayout"
+                }
+            )
+
+            # Registers the Swagger UI blueprint
+            self.app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
 
 
         # Defines API routes within the constructor
         self.setup_routes()
 
+    @property
+    def game(self) -> CompactConnect4:
+        """
+        Default Connect4 game instance (a copy if the store is shared by several workers).
+        """
+        return self.get_game(self.DEFAULT_GAME_ID)
+
     def setup_routes(self) -> None:
         """
         Defines API routes for the Connect 4 server.
@@ -99,12 +254,21 @@ class Connect4Server:
         # 1. Expose get_status method
         @self.app.route('/connect4/status', methods=['GET'])
         def get_status():
-            status = self.game.get_status()
-            if self.game.player1 and self.game.player2:
-                return jsonify({"active_player": status.get("active_player"), 
-                                "active_id": status.get("active_id"),
-                                "winner":status.get("winner"),
-                                "turn_number":status.get("turn number")}), 200
+            game_id = request.args.get("game_id") or self.DEFAULT_GAME_ID
+            game, version = self.store.get_versioned(game_id)
+            if game is None:
+                return jsonify({"message": "unknown game_id"}), 404
+
+            if game.player1 and game.player2:
+                status = game.get_status()
+                #every poll of an unchanged game gets the cached encoding
+                return self.encoder.respond(lambda: {"active_player": status.get("active_player"),
+                                                     "active_id": status.get("active_id"),
+                                                     "winner":status.get("winner"),
+                                                     "turn_number":status.get("turn number"),
+                                                     "draw":status.get("draw"),
+                                                     "game_over":status.get("game_over")},
+                                            key=("status", game_id), tag=(version, game.started))
             else:
                 return jsonify({"status": "false"}), 400
 
@@ -114,20 +278,31 @@ class Connect4Server:
         def register_player():
             data = request.get_json()
             player_id = data.get("player_id")
+            game_id = data.get("game_id") or self.DEFAULT_GAME_ID
+            game = self.get_game(game_id)
 
             if not player_id:
                 return jsonify({"message": "no player_id provided"}), 400
+            elif game is None:
+                return jsonify({"message": "unknown game_id"}), 404
             
             else:
-                registration = self.game.register_player(player_id)
+                registration = self.register(game_id, player_id)
+                self.bots.on_change(game_id)
                 return jsonify({"player_icon": registration}), 200
 
 
         # 3. Expose get_board method
         @self.app.route('/connect4/board', methods=['GET'])
         def get_board():
-            board = self.game.get_board().tolist()
-            return jsonify({"board": board})
+            game_id = request.args.get("game_id") or self.DEFAULT_GAME_ID
+            game, version = self.store.get_versioned(game_id)
+            if game is None:
+                return jsonify({"message": "unknown game_id"}), 404
+
+            #the board is only converted to lists once per game version
+            return self.encoder.respond(lambda: {"board": game.get_board().tolist()},
+                                        key=("board", game_id), tag=(version, game.started))
         
 
 
@@ -139,36 +314,855 @@ class Connect4Server:
             data = request.get_json()
             column = data.get("column")
             player_id = data.get("player_id")
+            game_id = data.get("game_id") or self.DEFAULT_GAME_ID
+            game = self.get_game(game_id)
+            if game is None:
+                return jsonify({"message": "unknown game_id"}), 404
 
-            #saving the icon from the player who made the move, because if check_move is true, it's gonna change the active_player
-            for player in [self.game.player1, self.game.player2]:
-                if player["id"] == player_id:
-                    player_icon = player["icon"]
-            
-            if self.game.check_move(column, player_id):
-                #Find the lowest available row in the selected column
-                    for row in range(6,-1,-1):
-                        if self.game.Board[row, column] == 0: #Checking for an empty cell
-                            self.game.Board[row, column] = player_icon #Change cell from empty to the icon of the player who made the move
-                            self.game.update_status()
-                            #print(f"Player {self.icon} placed a chip in column {column}")
-                            return jsonify({"column": column, "player_id": player_id}), 200
+            if data.get("state"):
+                #the new state saves the client a /board and a /status request after every move
+                result = self.apply_moves([{"game_id": game_id, "column": column, "player_id": player_id}])[0]
+                if not result["ok"]:
+                    return jsonify({"success": False}), 400
+                return self.encoder.respond({"column": column, "player_id": player_id, "state": result["state"]})
+
+            if self.apply_move(game_id, column, player_id):
+                #a server-side bot starts thinking right after the committed move
+                self.bots.on_change(game_id)
+                return jsonify({"column": column, "player_id": player_id}), 200
             else:
                 return jsonify({"success": False}), 400
 
 
-    def run(self, debug=True, host='0.0.0.0', port=5000):
+        # 5. Create a new game (optionally against a server-side bot)
+        @self.app.route('/connect4/new_game', methods=['POST'])
+        def new_game():
+            data = request.get_json(silent=True) or {}
+            try:
+                game_id = self.create_game(game_id=data.get("game_id"),
+                                           rows=int(data.get("rows", 7)),
+                                           cols=int(data.get("cols", 8)),
+                                           connect=int(data.get("connect", 4)),
+                                           bot=data.get("bot"),
+                                           bot_time=min(float(data.get("bot_time", 1.0)), self.MAX_BOT_TIME))
+            except (TypeError, ValueError) as error:
+                return jsonify({"message": str(error)}), 400
+            response = {"game_id": game_id, **self.get_game(game_id).get_config()}
+            if self.bots.is_bot(game_id):
+                response["bot"] = self.bots.bots[game_id]
+            return jsonify(response), 200
+
+
+        # 6. Expose board size and connect length
+        @self.app.route('/connect4/config', methods=['GET'])
+        def get_config():
+            game = self.get_game(request.args.get("game_id"))
+            if game is None:
+                return jsonify({"message": "unknown game_id"}), 404
+            return self.encoder.respond(game.get_config())
+
+
+        # 7. Analyze a position: GET for the position of a game, POST for a supplied position
+        @self.app.route('/connect4/analyze', methods=['GET', 'POST'])
+        def analyze():
+            if request.method == 'POST':
+                data = request.get_json(silent=True) or {}
+                board = data.get("board")
+                active_player = data.get("active_player")
+                connect = data.get("connect", 4)
+            else:
+                data = request.args
+                game = self.get_game(data.get("game_id"))
+                if game is None:
+                    return jsonify({"message": "unknown game_id"}), 404
+                board = game.get_board()
+                active_player = game.active_player["icon"]
+                connect = game.connect
+
+            try:
+                depth = min(int(data.get("depth", 6)), self.MAX_ANALYSIS_DEPTH)
+                wait = min(float(data.get("wait", 0)), 10.0)
+                rows = board_rows(board)
+                if active_player not in ("X", "O") or not rows or any(len(row) != len(rows[0]) for row in rows):
+                    raise ValueError("board and active_player (X or O) needed")
+                #checks board size and connect length
+                CompactConnect4(len(rows), len(rows[0]), int(connect))
+            except (TypeError, ValueError) as error:
+                return jsonify({"message": str(error)}), 400
+
+            #the search runs in the worker pool, the request only waits up to `wait` seconds
+            try:
+                analysis = self.analyzer.analyze(rows, active_player, int(connect), depth, timeout=wait)
+            except AnalyzerBusy:
+                return jsonify({"message": "too many pending analyses"}), 503
+            if analysis is None:
+                return jsonify({"status": "pending", "depth": depth}), 202
+            return self.encoder.respond({"active_player": active_player, **analysis})
+
+
+        # 8. Take back the last move (optional)
+        @self.app.route('/connect4/takeback', methods=['POST'])
+        def takeback():
+            if not self.allow_takeback:
+                return jsonify({"message": "takeback is disabled on this server"}), 403
+
+            data = request.get_json()
+            player_id = data.get("player_id")
+            game_id = data.get("game_id") or self.DEFAULT_GAME_ID
+            game = self.get_game(game_id)
+            if game is None:
+                return jsonify({"message": "unknown game_id"}), 404
+
+            column = self.takeback(game_id, player_id)
+            if column is None:
+                return jsonify({"success": False}), 400
+            #the bot was thinking about the position before the takeback
+            self.bots.cancel(game_id)
+            return jsonify({"column": column, "player_id": player_id}), 200
+
+
+        # 9. Matchmaking: blocks until the player is paired into a new game
+        @self.app.route('/connect4/lobby', methods=['POST'])
+        def join_lobby():
+            data = request.get_json(silent=True) or {}
+            player_id = data.get("player_id")
+            if not player_id:
+                return jsonify({"message": "no player_id provided"}), 400
+            try:
+                config = (int(data.get("rows", 7)), int(data.get("cols", 8)), int(data.get("connect", 4)))
+                CompactConnect4(*config)
+                rating = float(data["rating"]) if data.get("rating") is not None else None
+                wait = min(float(data.get("wait", 20)), self.MAX_LOBBY_WAIT)
+            except (TypeError, ValueError) as error:
+                return jsonify({"message": str(error)}), 400
+
+            self.timers.cancel(("lobby", player_id))
+            self.lobby.join(player_id, rating, config)
+            match = self.lobby.wait(player_id, wait)
+            if match is None:
+                #the player has to ask again, otherwise the place in the lobby expires
+                self.timers.schedule(("lobby", player_id), self.LOBBY_TICKET_TTL, partial(self.lobby.leave, player_id))
+                return jsonify({"status": "waiting", "waiting": self.lobby.waiting()}), 202
+            return jsonify(match), 200
+
+
+        # 10. Leave the lobby
+        @self.app.route('/connect4/lobby/leave', methods=['POST'])
+        def leave_lobby():
+            data = request.get_json(silent=True) or {}
+            player_id = data.get("player_id")
+            self.timers.cancel(("lobby", player_id))
+            return jsonify({"left": self.lobby.leave(player_id)}), 200
+
+
+        # 11. Watch a game: one stream (server-sent events) per spectator, every change is encoded once for all
+        @self.app.route('/connect4/spectate', methods=['GET'])
+        def spectate():
+            game_id = request.args.get("game_id") or self.DEFAULT_GAME_ID
+            subscription = self.spectators.subscribe(game_id, partial(self._spectator_frame, game_id))
+            if subscription is None:
+                if game_id not in self.store:
+                    return jsonify({"message": "unknown game_id"}), 404
+                return jsonify({"message": "too many spectators"}), 503
+
+            def stream():
+                version = -1
+                try:
+                    while True:
+                        try:
+                            frame = subscription.frames.get(timeout=self.SPECTATE_KEEPALIVE)
+                        except queue.Empty:
+                            if subscription.closed:
+                                return
+                            yield b": keep-alive\n\n"
+                            continue
+                        #None: the game is gone, the final frame of a finished game is still sent
+                        if frame is None:
+                            return
+                        if frame.version > version:
+                            version = frame.version
+                            yield frame.event
+                        #closed: the spectator was too slow and is dropped after the queued frames
+                        if frame.final or (subscription.closed and subscription.frames.empty()):
+                            return
+                finally:
+                    self.spectators.unsubscribe(subscription)
+
+            return Response(stream_with_context(stream()), mimetype="text/event-stream",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+        # 12. Watch a game by long-polling: returns as soon as the game is newer than `since`
+        @self.app.route('/connect4/spectate/poll', methods=['GET'])
+        def spectate_poll():
+            game_id = request.args.get("game_id") or self.DEFAULT_GAME_ID
+            try:
+                since = int(request.args.get("since", -1))
+                wait = min(float(request.args.get("wait", 20)), self.MAX_SPECTATE_WAIT)
+            except (TypeError, ValueError) as error:
+                return jsonify({"message": str(error)}), 400
+            frame = self.spectators.wait(game_id, since, wait, partial(self._spectator_frame, game_id))
+            if frame is None:
+                if game_id not in self.store:
+                    return jsonify({"message": "unknown game_id"}), 404
+                return Response(status=204)
+            return Response(frame.data, mimetype="application/json")
+
+
+        # 13. Batch endpoints for bot farms: one request for the moves or states of many games
+        @self.app.route('/connect4/batch/moves', methods=['POST'])
+        def batch_moves():
+            data = request.get_json(silent=True) or {}
+            moves = data.get("moves")
+            if not isinstance(moves, list):
+                return jsonify({"message": "no list of moves provided"}), 400
+            if len(moves) > self.MAX_BATCH:
+                return jsonify({"message": f"at most {self.MAX_BATCH} moves per batch"}), 400
+            return self.encoder.respond({"results": self.apply_moves(moves, board=bool(data.get("board", True)))})
+
+        @self.app.route('/connect4/batch/status', methods=['POST'])
+        def batch_status():
+            data = request.get_json(silent=True) or {}
+            game_ids = data.get("game_ids")
+            if not isinstance(game_ids, list):
+                return jsonify({"message": "no list of game_ids provided"}), 400
+            if len(game_ids) > self.MAX_BATCH:
+                return jsonify({"message": f"at most {self.MAX_BATCH} games per batch"}), 400
+            return self.encoder.respond({"results": self.game_states(game_ids, board=bool(data.get("board", False)))})
+
+
+        # 14. Handover of games between shards (see router.py)
+        if self.shard_api:
+            @self.app.route('/shard/games', methods=['GET'])
+            def shard_games():
+                return jsonify({"game_ids": [game_id for game_id, _ in self.store.items()]}), 200
+
+            @self.app.route('/shard/export', methods=['POST'])
+            def shard_export():
+                data = request.get_json(silent=True) or {}
+                return jsonify(self.export_games(data.get("game_ids", []))), 200
+
+            @self.app.route('/shard/import', methods=['POST'])
+            def shard_import():
+                data = request.get_json(silent=True) or {}
+                return jsonify({"imported": self.import_games(data)}), 200
+
+
+    def _on_pair(self, config:tuple, player_ids:list) -> list:
+        """
+        Creates the game of two players paired by the lobby and registers them in order.
+
+        Parameters:
+        config (tuple): rows, cols and connect of the game
+        player_ids (list): ids of both players (the first gets "X")
+
+        Returns:
+        list: match of each player (game_id, player_icon, rows, cols, connect)
+        """
+        rows, cols, connect = config
+        game_id = self.create_game(rows=rows, cols=cols, connect=connect)
+        return [{"game_id": game_id, "player_icon": self.register(game_id, player_id),
+                 "rows": rows, "cols": cols, "connect": connect} for player_id in player_ids]
+
+    def get_game(self, game_id:str = None) -> CompactConnect4:
+        """
+        Returns the game with the given id. With a store shared by several workers
+        this is a copy, changes have to be made with the methods of the server.
+
+        Parameters:
+        game_id (str): id of the game (default None -> default game)
+
+        Returns:
+        CompactConnect4: the game or None if the id is unknown
+        """
+        return self.store.get(game_id or self.DEFAULT_GAME_ID)
+
+    def create_game(self, game_id:str = None, rows:int = 7, cols:int = 8, connect:int = 4,
+                    bot:str = None, bot_time:float = 1.0) -> str:
+        """
+        Creates a new game and writes it to the journal.
+        With a bot, the bot registers first (player1 "X") and moves after the human player.
+
+        Parameters:
+        game_id (str): id of the new game (default None -> new uuid)
+        rows (int): height of the board (default 7)
+        cols (int): width of the board (default 8)
+        connect (int): chips in a row needed to win (default 4)
+        bot (str): strategy of a server-side bot opponent (default None -> no bot)
+        bot_time (float): time budget of the bot per move in seconds (default 1.0)
+
+        Returns:
+        str: id of the new game
+
+        Raises:
+        ValueError: if the board size, connect length or bot strategy is invalid or the game_id exists
+        """
+        game_id = game_id or str(uuid.uuid4())
+        game = CompactConnect4(rows, cols, connect)
+        if bot is not None and bot_time <= 0:
+            raise ValueError("bot_time must be positive")
+        with self.lock:
+            if game_id in self.store:
+                raise ValueError(f"game {game_id} exists already")
+            if bot is not None:
+                bot_id = self.bots.add(game_id, bot, bot_time)
+                game.register_player(bot_id)
+            if not self.store.create(game_id, game):
+                raise ValueError(f"game {game_id} exists already")
+            self._journal("N", game_id, rows, cols, connect)
+            if bot is not None:
+                self._journal("B", game_id, bot, bot_time, bot_id)
+                self._journal("R", game_id, bot_id)
+            self._touch(game_id, game, 1)
+        return game_id
+
+    def register(self, game_id:str, player_id:str) -> str:
+        """
+        Registers a player in the game and writes the registration to the journal.
+
+        Parameters:
+        game_id (str): id of the game
+        player_id (str): id of the player
+
+        Returns:
+        str: icon of the player (or None if the game is full or unknown)
+        """
+        with self.lock:
+            icon, game, version = self.store.update(game_id, lambda game: game.register_player(player_id))
+            if icon is not None:
+                self._journal("R", game_id, player_id)
+                self._touch(game_id, game, version)
+        return icon
+
+    def apply_move(self, game_id:str, column:int, player_id:str, journal:bool = True, version:int = None) -> bool:
+        """
+        Checks a move and if it is legal drops the chip into the column,
+        updates the status of the game and writes the move to the journal.
+        When the move ends the game, the game is stored in the archive.
+
+        Parameters:
+        game_id (str): id of the game
+        column (int): selected column
+        player_id (str): id of the player who makes the move
+        journal (bool): write the move to the journal (default True, False during recovery)
+        version (int): only move if the game is still at this store version (default None -> always)
+
+        Returns:
+        bool: True if the move was made, False if it was illegal
+        """
+        with self.lock:
+            if version is not None and self.store.get_versioned(game_id)[1] != version:
+                return False
+            return self._commit_move(game_id, column, player_id, journal)[0] is not None
+
+    def apply_moves(self, moves:list, board:bool = True) -> list:
+        """
+        Makes many moves (e.g. of a bot farm) one after the other. Every move is made or
+        rejected on its own, a move sees the moves before it in the list.
+
+        Parameters:
+        moves (list): dicts with game_id (default: default game), player_id and column
+        board (bool): add the board (one string per row, "." for an empty cell) to the states (default True)
+
+        Returns:
+        list: per move {"game_id", "ok": True, "state"} (see game_states) or {"game_id", "ok": False, "error"}
+        """
+        results = []
+        for move in moves:
+            if not isinstance(move, dict):
+                results.append({"game_id": None, "ok": False, "error": "a move needs game_id, player_id and column"})
+                continue
+            game_id = move.get("game_id") or self.DEFAULT_GAME_ID
+            with self.lock:
+                game, version = self._commit_move(game_id, move.get("column"), move.get("player_id"))
+                state = self._game_state(game, version, board) if game is not None else None
+            if state is None:
+                error = "unknown game_id" if game_id not in self.store else "illegal move"
+                results.append({"game_id": game_id, "ok": False, "error": error})
+                continue
+            #a server-side bot starts thinking right after the committed move
+            self.bots.on_change(game_id)
+            results.append({"game_id": game_id, "ok": True, "state": state})
+        return results
+
+    def game_states(self, game_ids:list, board:bool = False) -> list:
+        """
+        Returns the states of many games.
+
+        Parameters:
+        game_ids (list): ids of the games
+        board (bool): add the board (one string per row, "." for an empty cell) to the states (default False)
+
+        Returns:
+        list: per game {"game_id", "ok": True, "state": {version, active_player, active_id, winner, turn_number, draw, game_over, board}}
+              or {"game_id", "ok": False, "error"}
+        """
+        results = []
+        for game_id in game_ids:
+            if not isinstance(game_id, str):
+                results.append({"game_id": None, "ok": False, "error": "game_id has to be a string"})
+                continue
+            game, version = self.store.get_versioned(game_id)
+            if game is None:
+                results.append({"game_id": game_id, "ok": False, "error": "unknown game_id"})
+                continue
+            results.append({"game_id": game_id, "ok": True, "state": self._game_state(game, version, board)})
+        return results
+
+    def _commit_move(self, game_id:str, column:int, player_id:str, journal:bool = True) -> tuple:
+        """
+        Makes a move (see apply_move). The lock has to be held by the caller.
+        Returns (game, version) after the move, (None, None) if the move was illegal.
+        """
+        def move(game:CompactConnect4) -> bool:
+            #saving the icon from the player who made the move, because if check_move is true, it's gonna change the active_player
+            player_icon = None
+            for player in [game.player1, game.player2]:
+                if player and player["id"] == player_id:
+                    player_icon = player["icon"]
+
+            if player_icon is None or not isinstance(column, int) or not game.check_move(column, player_id):
+                return False
+
+            #Drop the chip into the lowest free cell of the column (known from the column heights)
+            game.drop_chip(column, player_icon)
+            game.update_status()
+            return True
+
+        moved, game, version = self.store.update(game_id, move)
+        if not moved:
+            return None, None
+        if journal:
+            self._journal("M", game_id, column, player_id)
+            if game.winner and self.archive:
+                self.archive.add(game)
+        self._touch(game_id, game, version)
+        return game, version
+
+    def takeback(self, game_id:str, player_id:str, journal:bool = True) -> int:
+        """
+        Takes back the last move of the game, if it was made by the player
+        and the game isn't won yet. Writes the takeback to the journal.
+
+        Parameters:
+        game_id (str): id of the game
+        player_id (str): id of the player who wants to take back his move
+        journal (bool): write the takeback to the journal (default True, False during recovery)
+
+        Returns:
+        int: column of the move taken back (None if not allowed)
+        """
+        def undo(game:CompactConnect4) -> int:
+            if not game.moves or game.winner:
+                return None
+
+            #only the player who made the last move can take it back
+            column, row = game.undo_stack[-1][:2]
+            for player in [game.player1, game.player2]:
+                if player and player["id"] == player_id and player["icon"] == game.Board[row, column]:
+                    game.undo()
+                    game.redo_stack.clear()
+                    return column
+            return None
+
+        with self.lock:
+            column, game, version = self.store.update(game_id, undo)
+            if column is None:
+                return None
+            if journal:
+                self._journal("U", game_id, player_id)
+            self._touch(game_id, game, version)
+            return column
+
+    def forfeit(self, game_id:str, player_id:str, journal:bool = True, move_number:int = None) -> bool:
+        """
+        Ends a game because a player gave up or ran out of time: the opponent wins.
+        Writes the forfeit to the journal and stores the game in the archive.
+
+        Parameters:
+        game_id (str): id of the game
+        player_id (str): id of the player who forfeits
+        journal (bool): write the forfeit to the journal (default True, False during recovery)
+        move_number (int): only forfeit if the game still has this number of moves (default None -> always)
+
+        Returns:
+        bool: True if the game was ended
+        """
+        def end(game:CompactConnect4) -> bool:
+            if move_number is not None and len(game.moves) != move_number:
+                return False
+            return game.forfeit(player_id)
+
+        with self.lock:
+            ended, game, version = self.store.update(game_id, end)
+            if not ended:
+                return False
+            if journal:
+                self._journal("F", game_id, player_id)
+                if self.archive:
+                    self.archive.add(game)
+            self._touch(game_id, game, version)
+        return True
+
+    def evict(self, game_id:str, journal:bool = True, version:int = None) -> bool:
+        """
+        Releases a game (idle or finished for too long). A game which wasn't archived
+        when it ended (draw or abandoned after some moves) is archived before.
+        The default game is never evicted.
+
+        Parameters:
+        game_id (str): id of the game
+        journal (bool): write the eviction to the journal (default True, False during recovery)
+        version (int): only evict if the game wasn't changed since this version
+                       (e.g. by another worker) (default None -> always)
+
+        Returns:
+        bool: True if the game was released
+        """
+        if game_id == self.DEFAULT_GAME_ID:
+            return False
+        with self.lock:
+            game = self.store.get(game_id)
+            if game is None or not self.store.delete(game_id, version):
+                return False
+            for kind in ("idle", "move", "evict"):
+                self.timers.cancel((kind, game_id))
+            self._completed.discard(game_id)
+            if journal:
+                #won games are archived when they are won
+                if self.archive and not game.winner and game.moves and game.player2:
+                    self.archive.add(game)
+                self._journal("E", game_id)
+        self.bots.remove(game_id)
+        self.spectators.close(game_id)
+        self._discard_encodings(game_id)
+        return True
+
+    def export_games(self, game_ids:list) -> dict:
+        """
+        Removes games from this server and returns their state, so another
+        server (shard) can take them over with import_games(). Timers and bots of the games stop here.
+
+        Parameters:
+        game_ids (list): ids of the games
+
+        Returns:
+        dict: {"games": game_id -> snapshot, "bots": game_id -> bot} of the games which were found
+        """
+        state = {"games": {}, "bots": {}}
+        with self.lock:
+            for game_id in game_ids:
+                game = self.store.get(game_id)
+                if game is None or not self.store.delete(game_id):
+                    continue
+                state["games"][game_id] = game.to_snapshot()
+                for kind in ("idle", "move", "evict"):
+                    self.timers.cancel((kind, game_id))
+                self._completed.discard(game_id)
+                if self.bots.is_bot(game_id):
+                    state["bots"][game_id] = self.bots.bots[game_id]
+        for game_id in state["bots"]:
+            self.bots.remove(game_id)
+        #spectators connect again through the router and watch the game on its new shard
+        for game_id in state["games"]:
+            self.spectators.close(game_id)
+            self._discard_encodings(game_id)
+        return state
+
+    def import_games(self, state:dict) -> int:
+        """
+        Takes over games exported by another server (replaces games with the same id).
+        Their timers start again and bots which have to move start thinking.
+
+        Parameters:
+        state (dict): {"games": game_id -> snapshot, "bots": game_id -> bot} made by export_games()
+
+        Returns:
+        int: number of imported games
+        """
+        with self.lock:
+            for game_id, snapshot in state.get("games", {}).items():
+                game = CompactConnect4.from_snapshot(snapshot)
+                self.store.delete(game_id)
+                self.store.create(game_id, game)
+                #the versions start again, encodings of an earlier stay of the game would match them
+                self._discard_encodings(game_id)
+                self._touch(game_id, game, self.store.get_versioned(game_id)[1])
+            self.bots.bots.update(state.get("bots", {}))
+        for game_id in state.get("bots", {}):
+            self.bots.on_change(game_id)
+        return len(state.get("games", {}))
+
+    def recover(self) -> None:
+        """
+        Rebuilds all games: loads the latest snapshot and replays the journal records behind it.
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        state, records = self.journal.recover()
+        if state:
+            for game_id, game in state["games"].items():
+                self.store.create(game_id, CompactConnect4.from_snapshot(game))
+            self.bots.bots = state.get("bots", {})
+
+        for record in records:
+            kind, game_id = record[0], record[1]
+            if kind == "N":
+                self.store.create(game_id, CompactConnect4(*map(int, record[2:5])))
+            elif kind == "R":
+                self.store.update(game_id, lambda game: game.register_player(record[2]))
+            elif kind == "M":
+                self.apply_move(game_id, int(record[2]), record[3], journal=False)
+            elif kind == "U":
+                self.takeback(game_id, record[2], journal=False)
+            elif kind == "B":
+                self.bots.add(game_id, record[2], float(record[3]), record[4])
+            elif kind == "F":
+                self.forfeit(game_id, record[2], journal=False)
+            elif kind == "E":
+                self.evict(game_id, journal=False)
+
+        #the recovered games start with fresh timers, which only act on the version replay left the game at
+        with self.lock:
+            for game_id, game in self.store.items():
+                self._touch(game_id, game, self.store.get_versioned(game_id)[1])
+
+    def _touch(self, game_id:str, game:CompactConnect4, version:int) -> None:
+        """
+        Restarts the timers of a game after a change and publishes it to the spectators of the game.
+        The lock has to be held by the caller.
+            running game:   idle timer (evicts the game) and move clock of the active player (forfeits)
+            finished game:  eviction timer, the resources of the game are released once (see _complete)
+        Every timer is one heap entry in self.timers, replacing it costs O(log n).
+        The timers only act on the game version they were started for, so a worker
+        never evicts or forfeits a game which another worker changed in the meantime.
+        """
+        finished = game.is_over()
+        evictable = game_id != self.DEFAULT_GAME_ID
+        self.spectators.publish(game_id, version, partial(self._spectator_state, game_id, game, version, finished))
+        for listener in self.listeners:
+            listener(game_id, game, version)
+        if finished:
+            self.timers.cancel(("idle", game_id))
+            self.timers.cancel(("move", game_id))
+            if evictable and self.finished_ttl is not None:
+                self.timers.schedule(("evict", game_id), self.finished_ttl, partial(self.evict, game_id, version=version))
+            if game_id not in self._completed:
+                self._completed.add(game_id)
+                self._complete(game_id, game, version)
+            return
+
+        #a draw which was taken back is running again
+        self._completed.discard(game_id)
+        if evictable and self.idle_ttl is not None:
+            self.timers.schedule(("idle", game_id), self.idle_ttl, partial(self.evict, game_id, version=version))
+        if self.move_timeout is not None and game.player1 and game.player2:
+            self.timers.schedule(("move", game_id), self.move_timeout,
+                                 partial(self.forfeit, game_id, game.active_player["id"],
+                                         move_number=len(game.moves)))
+
+    def _discard_encodings(self, game_id:str) -> None:
+        """
+        Drops the cached status and board encodings of a game which leaves this server or comes back.
+        """
+        self.encoder.discard(("status", game_id), ("board", game_id))
+
+    def _is_player(self, game_id:str, player_id:str) -> bool:
+        """
+        Checks if a player is registered in a game (the rate limiter only trusts registered player_ids).
+        """
+        game = self.store.get(game_id or self.DEFAULT_GAME_ID)
+        return game is not None and player_id in game.player_ids
+
+    def _complete(self, game_id:str, game:CompactConnect4, version:int) -> None:
+        """
+        Releases what a finished game doesn't need anymore, right after its last change
+        (the lock has to be held by the caller):
+            bot:            a running bot move is discarded
+            listeners:      the completion listeners are called (e.g. the TCP protocol drops the subscribers)
+        The spectators already got the final frame from _touch: streams end after it and
+        long-polls return it at once, the streams are closed when the game is evicted.
+        The game itself stays readable until the eviction timer (finished_ttl) releases its memory.
+        """
+        self.bots.cancel(game_id)
+        for listener in self.completion_listeners:
+            listener(game_id, game, version)
+
+    def _game_state(self, game:CompactConnect4, version:int, board:bool) -> dict:
+        """
+        Returns the state of a game for the batch endpoints (status keys like /connect4/status).
+        """
+        status = game.get_status()
+        state = {"version": version, "active_player": status["active_player"], "active_id": status["active_id"],
+                 "winner": status["winner"], "turn_number": status["turn number"],
+                 "draw": status["draw"], "game_over": status["game_over"]}
+        if board:
+            state["board"] = board_rows(game.get_board())
+        return state
+
+    def _spectator_state(self, game_id:str, game:CompactConnect4, version:int, finished:bool) -> tuple:
+        """
+        Builds the state of a game which spectators get (see SpectatorHub).
+        """
+        state = {"game_id": game_id, "version": version, "board": game.get_board().tolist(),
+                 "moves": list(game.moves), "active_player": game.active_player["icon"],
+                 "winner": game.winner, "turn_number": game.turncounter, "draw": game.is_draw(),
+                 "finished": finished}
+        return state, finished
+
+    def _spectator_frame(self, game_id:str):
+        """
+        Returns the current frame of a game for a new spectator (None if the game is unknown).
+        """
+        with self.lock:
+            game, version = self.store.get_versioned(game_id)
+            if game is None:
+                return None
+            finished = game.is_over()
+            return self.spectators.frame(game_id, version,
+                                         partial(self._spectator_state, game_id, game, version, finished))
+
+    def _journal(self, kind:str, *fields) -> None:
+        """
+        Writes a record to the journal (if there is one) and makes a snapshot
+        of all games when it is due. The lock has to be held by the caller.
+        """
+        if self.journal is None:
+            return
+        self.journal.append(kind, *fields)
+        if self.journal.snapshot_due():
+            state = {"games": {game_id: game.to_snapshot() for game_id, game in self.store.items()},
+                     "bots": self.bots.bots}
+            self.journal.write_snapshot(state)
+
+
+    def add_listener(self, listener) -> None:
+        """
+        Adds a function which is called after every change of a game. It is called with the
+        lock held, so it has to be quick and must not change games (e.g. hand the change to a queue).
+
+        Parameters:
+        listener: function(game_id, game, version)
+
+        Returns:
+        None
+        """
+        with self.lock:
+            self.listeners = self.listeners + [listener]
+
+    def remove_listener(self, listener) -> None:
+        """
+        Removes a function added with add_listener.
+
+        Parameters:
+        listener: the function
+
+        Returns:
+        None
+        """
+        with self.lock:
+            self.listeners = [other for other in self.listeners if other != listener]
+
+    def add_completion_listener(self, listener) -> None:
+        """
+        Adds a function which is called once when a game is finished (won, forfeited or a draw),
+        after the listeners of the last change. It is called with the lock held, so it has to be
+        quick and must not change games. Use it to release what belongs to the game.
+
+        Parameters:
+        listener: function(game_id, game, version)
+
+        Returns:
+        None
+        """
+        with self.lock:
+            self.completion_listeners = self.completion_listeners + [listener]
+
+    def remove_completion_listener(self, listener) -> None:
+        """
+        Removes a function added with add_completion_listener.
+
+        Parameters:
+        listener: the function
+
+        Returns:
+        None
+        """
+        with self.lock:
+            self.completion_listeners = [other for other in self.completion_listeners if other != listener]
+
+    def run(self, debug=True, host='0.0.0.0', port=5000, tcp_port:int = None):
         # Get and display the local IP address
         hostname = socket.gethostname()
         local_ip = socket.gethostbyname(hostname)
         print(f"Server is running on {local_ip}:{port}")
 
+        # Binary TCP protocol next to the API (only in the serving process of the debug reloader)
+        if tcp_port is not None and (not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true"):
+            from tcp_protocol import TCPGameServer
+            TCPGameServer(self, host, tcp_port).start()
+            print(f"Binary TCP protocol on {local_ip}:{tcp_port}")
+
         # Start the Flask app
         self.app.run(debug=debug, host=host, port=port)
 
 
 
+def run_workers(store_path:str, workers:int = 2, host:str = '0.0.0.0', port:int = 5000, **server_kwargs) -> None:
+    """
+    Runs the Connect4Server in several worker processes (one per core), which share
+    their games in a SQLiteGameStore and accept the connections of one listening socket.
+    Requests of a game may reach any worker. The lobby pairs and the server-side bots
+    play within the worker which got the request, so bot games and lobby players
+    need a router which sends all requests of a game (player) to the same worker.
+
+    Parameters:
+    store_path (str): database file of the SQLiteGameStore
+    workers (int): number of worker processes (default 2)
+    host (str): address to listen on (default 0.0.0.0)
+    port (int): port to listen on (default 5000)
+    server_kwargs: further arguments of Connect4Server (e.g. allow_takeback, idle_ttl)
+
+    Returns:
+    None
+
+    Raises:
+    ValueError: if a journal or an archive is requested (both are written by one process only)
+    """
+    import multiprocessing
+    from werkzeug.serving import make_server
+    from store import SQLiteGameStore
+
+    if server_kwargs.get("journal_dir") or server_kwargs.get("archive_dir"):
+        raise ValueError("journal and archive can't be shared by several workers")
+    server_kwargs.setdefault("swagger", False)
+
+    #the database and the default game are created once, before the workers start
+    Connect4Server(store=SQLiteGameStore(store_path), **server_kwargs).store.close()
+    listener = socket.create_server((host, port), backlog=128)
+
+    def serve() -> None:
+        server = Connect4Server(store=SQLiteGameStore(store_path), **server_kwargs)
+        make_server(host, port, server.app, threaded=True, fd=listener.fileno()).serve_forever()
+
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=serve, name=f"connect4-worker-{number}") for number in range(workers)]
+    for process in processes:
+        process.start()
+    print(f"Server is running on {host}:{port} with {workers} workers")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
 # If you want to run the server directly:
 if __name__ == '__main__':
-    server = Connect4Server()  # Initialize the Connect4Server
+    server = Connect4Server()  # Initialize the Connect4Server (Connect4Server(journal_dir="journal") to survive restarts)
     server.run()               # Start the Flask app
\ No newline at end of file
@@ -1,4 +1,4 @@
-from setuptools import setup, find_packages
+from setuptools import setup
 
 """
 Installation of all required packages to Connect4
@@ -6,11 +6,27 @@ Installation of all required packages to Connect4
 setup(
     name='Connect4',
     version='1.0.0',
-    packages=find_packages(),
+    # this folder is the package Connect4: the game modules (game, server, ...) are installed
+    # inside it instead of as generic top-level modules, Connect4/__init__.py makes their flat imports work
+    packages=['Connect4'],
+    package_dir={'Connect4': '.'},
+    package_data={'Connect4': ['static/*']},
+    # console entry points, every mode only imports the modules it needs
+    entry_points={
+        'console_scripts': [
+            'connect4-server=Connect4.cli:server_main',
+            'connect4-play=Connect4.cli:play_main',
+        ],
+    },
+    # orjson makes the JSON responses of the server faster (optional, the json module is used without it)
+    extras_require={
+        'fast': ['orjson'],
+    },
     install_requires=[
         'Flask',                # General Flask dependency
         'flask-swagger-ui',     # General Swagger UI for Flask
         'requests',             # Requests library for HTTP requests
+        'aiohttp',              # Async HTTP for the asyncio remote player
         'numpy',                # Numpy for numerical operations
         'sense-hat'             # For the Raspi - Part
     ],
@@ -0,0 +1,269 @@
+import queue
+import threading
+
+from serializer import dumps
+
+
+class Frame:
+    """
+    One state of a watched game, encoded once and shared by all spectators.
+
+    Attributes:
+        version (int): version of the game in the store
+        data (bytes): state as JSON (long-poll answer)
+        event (bytes): state as server-sent event (stream)
+        final (bool): the game is finished, no frame follows
+    """
+    __slots__ = ("version", "data", "event", "final")
+
+    def __init__(self, version:int, data:bytes, final:bool) -> None:
+        self.version: int = version
+        self.data: bytes = data
+        self.event: bytes = b"id: %d\nevent: state\ndata: %s\n\n" % (version, data)
+        self.final: bool = final
+
+
+class Subscription:
+    """
+    Stream of one spectator: a bounded queue of frames.
+
+    Attributes:
+        game_id (str): watched game
+        frames (queue.Queue): frames not sent yet (None -> the game is gone)
+        closed (bool): True once the spectator was dropped or the game is gone
+    """
+    __slots__ = ("game_id", "frames", "closed")
+
+    def __init__(self, game_id:str, queue_size:int) -> None:
+        self.game_id: str = game_id
+        self.frames: queue.Queue = queue.Queue(queue_size)
+        self.closed: bool = False
+
+
+class SpectatorHub:
+    """
+    Spectator Fan-out of the Connect4Server
+
+    The server publishes every change of a game. If the game is watched, its state is
+    built and encoded once (one Frame) and the same bytes go to every spectator:
+        stream:     every subscription has a bounded queue, a spectator whose queue is
+                    full is dropped instead of slowing down the game (publish never blocks)
+        long-poll:  wait() blocks until the game has a newer version than the spectator has
+    Games nobody watches cost one dict lookup per change.
+
+    Attributes:
+        queue_size (int): frames a streaming spectator may fall behind before it is dropped
+        max_subscriptions (int): streaming spectators of all games together
+        dropped (int): number of spectators dropped because they were too slow
+
+    Methods:
+        subscribe(self, game_id, current) -> Subscription
+            Starts a stream with the current frame
+        unsubscribe(self, subscription) -> None
+            Ends a stream
+        frame(self, game_id, version, build) -> Frame
+            Returns the frame of a game version (encoded once)
+        publish(self, game_id, version, build) -> None
+            Sends the new state of a game to its spectators
+        wait(self, game_id, since, timeout, current) -> Frame
+            Waits for a newer frame than `since` (long-poll)
+        close(self, game_id) -> None
+            Ends all streams of a game which is gone
+    """
+
+    def __init__(self, queue_size:int = 16, max_subscriptions:int = 1000) -> None:
+        """
+        Initializes the hub without spectators.
+
+        Parameters:
+            queue_size (int): frames a streaming spectator may fall behind before it is dropped (default 16)
+            max_subscriptions (int): streaming spectators of all games together (default 1000)
+
+        Returns:
+            None
+        """
+        self.queue_size: int = queue_size
+        self.max_subscriptions: int = max_subscriptions
+        self.dropped: int = 0
+        self._subscriptions: dict = {}      # game_id -> set of subscriptions
+        self._pollers: dict = {}            # game_id -> number of waiting long-polls
+        self._frames: dict = {}             # game_id -> latest frame of a watched game
+        self._count: int = 0
+        self._condition = threading.Condition()
+
+    def frame(self, game_id:str, version:int, build) -> Frame:
+        """
+        Returns the frame of a game version, built and encoded only if it isn't the latest frame.
+
+        Parameters:
+            game_id (str): id of the game
+            version (int): version of the game in the store
+            build: function returning (state dict, finished) of the game
+
+        Returns:
+            Frame: the encoded state
+        """
+        with self._condition:
+            frame = self._frames.get(game_id)
+            if frame is not None and frame.version == version:
+                return frame
+        state, finished = build()
+        frame = Frame(version, dumps(state), finished)
+        with self._condition:
+            latest = self._frames.get(game_id)
+            if self._watched(game_id) and (latest is None or latest.version < version):
+                self._frames[game_id] = frame
+        return frame
+
+    def subscribe(self, game_id:str, current) -> Subscription:
+        """
+        Starts the stream of a spectator with the current frame of the game.
+        The frame is read after the subscription is registered, so no change is missed
+        (a change in between may be queued before it, the consumer skips older versions).
+
+        Parameters:
+            game_id (str): id of the game
+            current: function returning the current frame (see frame(), None if the game is gone)
+
+        Returns:
+            Subscription: the stream (None if there are max_subscriptions already or the game is gone)
+        """
+        subscription = Subscription(game_id, self.queue_size)
+        with self._condition:
+            if self._count >= self.max_subscriptions:
+                return None
+            self._subscriptions.setdefault(game_id, set()).add(subscription)
+            self._count += 1
+        frame = current()
+        if frame is None:
+            self.unsubscribe(subscription)
+            return None
+        try:
+            subscription.frames.put_nowait(frame)
+        except queue.Full:
+            pass
+        return subscription
+
+    def unsubscribe(self, subscription:Subscription) -> None:
+        """
+        Ends the stream of a spectator (called when its connection ends).
+
+        Parameters:
+            subscription (Subscription): the stream
+
+        Returns:
+            None
+        """
+        with self._condition:
+            subscription.closed = True
+            self._remove(subscription)
+
+    def publish(self, game_id:str, version:int, build) -> None:
+        """
+        Sends the new state of a game to its spectators. The state is built and encoded once,
+        every streaming spectator gets the same frame. Never blocks: a spectator whose queue
+        is full is dropped.
+
+        Parameters:
+            game_id (str): id of the game
+            version (int): version of the game in the store
+            build: function returning (state dict, finished) of the game
+
+        Returns:
+            None
+        """
+        if game_id not in self._subscriptions and game_id not in self._pollers:
+            return
+        frame = self.frame(game_id, version, build)
+        with self._condition:
+            for subscription in list(self._subscriptions.get(game_id, ())):
+                try:
+                    subscription.frames.put_nowait(frame)
+                except queue.Full:
+                    #a slow spectator is dropped, its stream ends when it reaches the full queue
+                    subscription.closed = True
+                    self._remove(subscription)
+                    self.dropped += 1
+            self._condition.notify_all()
+
+    def wait(self, game_id:str, since:int, timeout:float, current) -> Frame:
+        """
+        Waits until the game has a newer frame than the version the spectator has (long-poll).
+        The current frame is read after the long-poll is registered, so no change is missed.
+        A finished game gets no newer frame, its final frame is returned at once.
+
+        Parameters:
+            game_id (str): id of the game
+            since (int): version the spectator has
+            timeout (float): max. seconds to wait
+            current: function returning the current frame (see frame(), None if the game is gone)
+
+        Returns:
+            Frame: the newer frame (None after the timeout or if the game is gone)
+        """
+        with self._condition:
+            self._pollers[game_id] = self._pollers.get(game_id, 0) + 1
+        try:
+            frame = current()
+            if frame is None or frame.version > since or frame.final:
+                return frame
+            with self._condition:
+                self._condition.wait_for(lambda: game_id not in self._pollers or self._newer(game_id, since),
+                                         timeout)
+                return self._frames.get(game_id) if self._newer(game_id, since) else None
+        finally:
+            with self._condition:
+                if game_id in self._pollers:
+                    self._pollers[game_id] -= 1
+                    if not self._pollers[game_id]:
+                        del self._pollers[game_id]
+                self._forget(game_id)
+
+    def close(self, game_id:str) -> None:
+        """
+        Ends all streams and long-polls of a game which is gone (evicted or moved to another shard).
+
+        Parameters:
+            game_id (str): id of the game
+
+        Returns:
+            None
+        """
+        with self._condition:
+            for subscription in list(self._subscriptions.get(game_id, ())):
+                subscription.closed = True
+                self._remove(subscription)
+                try:
+                    subscription.frames.put_nowait(None)
+                except queue.Full:
+                    pass
+            self._pollers.pop(game_id, None)
+            self._frames.pop(game_id, None)
+            self._condition.notify_all()
+
+    def _newer(self, game_id:str, since:int) -> bool:
+        frame = self._frames.get(game_id)
+        return frame is not None and frame.version > since
+
+    def _watched(self, game_id:str) -> bool:
+        return game_id in self._subscriptions or game_id in self._pollers
+
+    def _remove(self, subscription:Subscription) -> None:
+        """
+        Removes a subscription (the lock has to be held by the caller).
+        """
+        subscriptions = self._subscriptions.get(subscription.game_id)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        self._count -= 1
+        if not subscriptions:
+            del self._subscriptions[subscription.game_id]
+        self._forget(subscription.game_id)
+
+    def _forget(self, game_id:str) -> None:
+        """
+        Drops the latest frame of a game nobody watches anymore (the lock has to be held by the caller).
+        """
+        if not self._watched(game_id):
+            self._frames.pop(game_id, None)
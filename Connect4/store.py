@@ -0,0 +1,210 @@
+import json
+import sqlite3
+import threading
+
+from compact_game import CompactConnect4
+
+
+class StoreConflict(RuntimeError):
+    """
+    Raised when a game couldn't be updated because other workers kept changing it.
+    """
+
+
+class GameStore:
+    """
+    Storage Interface for the games of the Connect4Server
+
+    Every game has a version which grows with every saved change. Changes are made with
+    update(game_id, change): the store loads the game, calls change(game) and saves
+    the game only if nobody else saved it in between (optimistic versioning),
+    otherwise the change is retried on the new state.
+    A change returns None or False if it didn't change the game (nothing is saved).
+
+    Methods:
+        get(self, game_id) -> CompactConnect4
+            Returns the game (None if the id is unknown)
+        get_versioned(self, game_id) -> tuple
+            Returns (game, version) (None, None if the id is unknown)
+        create(self, game_id, game) -> bool
+            Stores a new game (False if the id exists)
+        update(self, game_id, change) -> tuple
+            Applies a change to the game, returns (result of the change, game, version)
+        delete(self, game_id, version) -> bool
+            Removes a game (only if it still has the version)
+        items(self) -> iterator
+            Returns (game_id, game) of all games
+        close(self) -> None
+            Releases the store
+    """
+
+    def get(self, game_id:str) -> CompactConnect4:
+        raise NotImplementedError
+
+    def get_versioned(self, game_id:str) -> tuple:
+        raise NotImplementedError
+
+    def create(self, game_id:str, game:CompactConnect4) -> bool:
+        raise NotImplementedError
+
+    def update(self, game_id:str, change) -> tuple:
+        raise NotImplementedError
+
+    def delete(self, game_id:str, version:int = None) -> bool:
+        raise NotImplementedError
+
+    def items(self):
+        raise NotImplementedError
+
+    def __contains__(self, game_id:str) -> bool:
+        return self.get(game_id) is not None
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryGameStore(GameStore):
+    """
+    Game store of a single server process: the games live as objects in a dict,
+    get() returns the game itself and changes are made in place.
+
+    Attributes:
+        games (dict): game_id -> CompactConnect4
+    """
+
+    def __init__(self) -> None:
+        self.games: dict = {}
+        self._versions: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, game_id:str) -> CompactConnect4:
+        return self.games.get(game_id)
+
+    def get_versioned(self, game_id:str) -> tuple:
+        with self._lock:
+            return self.games.get(game_id), self._versions.get(game_id)
+
+    def create(self, game_id:str, game:CompactConnect4) -> bool:
+        with self._lock:
+            if game_id in self.games:
+                return False
+            self.games[game_id] = game
+            self._versions[game_id] = 1
+            return True
+
+    def update(self, game_id:str, change) -> tuple:
+        with self._lock:
+            game = self.games.get(game_id)
+            if game is None:
+                return None, None, None
+            result = change(game)
+            if result is not None and result is not False:
+                self._versions[game_id] += 1
+            return result, game, self._versions[game_id]
+
+    def delete(self, game_id:str, version:int = None) -> bool:
+        with self._lock:
+            if game_id not in self.games or version not in (None, self._versions[game_id]):
+                return False
+            del self.games[game_id]
+            del self._versions[game_id]
+            return True
+
+    def items(self):
+        return list(self.games.items())
+
+
+class SQLiteGameStore(GameStore):
+    """
+    Game store which several server processes on one host share: every game is one row
+    (game_id, version, snapshot as JSON) of a SQLite database in WAL mode, so readers
+    never block the writer. A change is saved with
+        UPDATE ... SET version = version + 1 WHERE game_id = ? AND version = ?
+    which fails if another worker saved the game in between -> the change is retried.
+
+    get() returns a copy of the game, changes of the copy are not saved.
+
+    Attributes:
+        path (str): file of the database
+        retries (int): attempts of a change before StoreConflict is raised
+    """
+
+    def __init__(self, path:str, retries:int = 20) -> None:
+        """
+        Opens (and creates) the database.
+
+        Parameters:
+            path (str): file of the database
+            retries (int): attempts of a change before StoreConflict is raised (default 20)
+
+        Returns:
+            None
+        """
+        self.path: str = path
+        self.retries: int = retries
+        self._local = threading.local()         # one connection per thread
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("CREATE TABLE IF NOT EXISTS games "
+                           "(game_id TEXT PRIMARY KEY, version INTEGER NOT NULL, state TEXT NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns the connection of the calling thread (autocommit, every statement is atomic).
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _load(self, game_id:str) -> tuple:
+        row = self._connection().execute("SELECT version, state FROM games WHERE game_id = ?", (game_id,)).fetchone()
+        if row is None:
+            return None, None
+        return CompactConnect4.from_snapshot(json.loads(row[1])), row[0]
+
+    def get(self, game_id:str) -> CompactConnect4:
+        return self._load(game_id)[0]
+
+    def get_versioned(self, game_id:str) -> tuple:
+        return self._load(game_id)
+
+    def create(self, game_id:str, game:CompactConnect4) -> bool:
+        cursor = self._connection().execute("INSERT OR IGNORE INTO games VALUES (?, 1, ?)",
+                                            (game_id, json.dumps(game.to_snapshot())))
+        return cursor.rowcount == 1
+
+    def update(self, game_id:str, change) -> tuple:
+        for _ in range(self.retries):
+            game, version = self._load(game_id)
+            if game is None:
+                return None, None, None
+            result = change(game)
+            if result is None or result is False:
+                return result, game, version
+            cursor = self._connection().execute(
+                "UPDATE games SET version = version + 1, state = ? WHERE game_id = ? AND version = ?",
+                (json.dumps(game.to_snapshot()), game_id, version))
+            if cursor.rowcount == 1:
+                return result, game, version + 1
+        raise StoreConflict(f"game {game_id} was changed by other workers {self.retries} times")
+
+    def delete(self, game_id:str, version:int = None) -> bool:
+        if version is None:
+            cursor = self._connection().execute("DELETE FROM games WHERE game_id = ?", (game_id,))
+        else:
+            cursor = self._connection().execute("DELETE FROM games WHERE game_id = ? AND version = ?",
+                                                (game_id, version))
+        return cursor.rowcount == 1
+
+    def items(self):
+        for game_id, state in self._connection().execute("SELECT game_id, state FROM games"):
+            yield game_id, CompactConnect4.from_snapshot(json.loads(state))
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
@@ -0,0 +1,474 @@
+import argparse
+import asyncio
+import struct
+import threading
+import time
+
+
+# frame: length of the payload (uint32), kind (uint8), payload
+HEADER = struct.Struct("!IB")
+# state: version, flags, active player, winner (0 none, 1 "X", 2 "O"), turn number, rows, cols; the cells follow
+STATE = struct.Struct("!IBBBIHH")
+# joined: icon of the player (0 not registered), rows, cols, connect
+JOINED = struct.Struct("!BHHH")
+COLUMN = struct.Struct("!H")
+ERROR = struct.Struct("!B")
+
+# requests of the clients
+JOIN = 0x01             # flags, game_id, player_id -> JOINED
+MOVE = 0x02             # column -> STATE after the move
+GET_STATE = 0x03        # -> STATE
+PING = 0x05             # any payload -> PONG with the same payload
+# answers and notifications of the server
+JOINED_ = 0x81
+STATE_ = 0x83
+PUSH = 0x84             # STATE of the joined game after every change (if subscribed)
+PONG = 0x85
+ERROR_ = 0x8F
+
+# flags of JOIN
+REGISTER = 0x01         # register the player in the game (otherwise only bind the connection to it)
+SUBSCRIBE = 0x02        # push every change of the game
+
+# flags of a state
+READY = 0x01            # both players are registered
+FINISHED = 0x02         # the game is won or the board is full
+
+# error codes
+UNKNOWN_GAME, ILLEGAL_MOVE, NOT_JOINED, BAD_FRAME = 1, 2, 3, 4
+ERRORS = {UNKNOWN_GAME: "unknown game_id", ILLEGAL_MOVE: "illegal move",
+          NOT_JOINED: "join a game first", BAD_FRAME: "bad frame"}
+
+ICONS = (None, "X", "O")
+MAX_FRAME = 1 << 20
+
+
+def frame(kind:int, payload:bytes = b"") -> bytes:
+    """
+    Builds a frame: length of the payload, kind and payload.
+
+    Parameters:
+        kind (int): kind of the message (e.g. MOVE)
+        payload (bytes): content of the message (default empty)
+
+    Returns:
+        bytes: the frame
+    """
+    return HEADER.pack(len(payload), kind) + payload
+
+
+def pack_strings(*strings:str) -> bytes:
+    """
+    Packs strings with a length byte each (at most 255 bytes UTF-8).
+    """
+    packed = b""
+    for string in strings:
+        data = string.encode()
+        if len(data) > 255:
+            raise ValueError("ids have at most 255 bytes")
+        packed += bytes((len(data),)) + data
+    return packed
+
+
+def unpack_strings(payload:bytes, count:int, offset:int = 0) -> list:
+    """
+    Unpacks `count` strings packed with pack_strings (raises ValueError if the payload is too short).
+    """
+    strings = []
+    for _ in range(count):
+        if offset >= len(payload):
+            raise ValueError("payload too short")
+        length = payload[offset]
+        data = payload[offset + 1:offset + 1 + length]
+        if len(data) != length:
+            raise ValueError("payload too short")
+        strings.append(data.decode())
+        offset += 1 + length
+    return strings
+
+
+def encode_state(game, version:int) -> bytes:
+    """
+    Encodes the state of a CompactConnect4: header and one byte per cell (0 empty, 1 "X", 2 "O"),
+    the board bytearray of the game is sent as it is.
+
+    Parameters:
+        game (CompactConnect4): the game
+        version (int): version of the game in the store
+
+    Returns:
+        bytes: payload of STATE and PUSH
+    """
+    flags = (READY if game.player1 and game.player2 else 0)
+    if game.is_over():
+        flags |= FINISHED
+    return STATE.pack(version, flags, game.active + 1, game.winner_index + 1, game.turncounter,
+                      game.rows, game.cols) + bytes(game.board)
+
+
+def decode_state(payload:bytes) -> dict:
+    """
+    Decodes the payload of STATE and PUSH.
+
+    Parameters:
+        payload (bytes): the payload
+
+    Returns:
+        dict: version, ready, finished, active_player, winner (icons or None), turn_number, rows, cols
+              and cells (bytes, row by row from the top)
+    """
+    version, flags, active, winner, turn, rows, cols = STATE.unpack_from(payload)
+    return {"version": version, "ready": bool(flags & READY), "finished": bool(flags & FINISHED),
+            "active_player": ICONS[active], "winner": ICONS[winner], "turn_number": turn,
+            "rows": rows, "cols": cols, "cells": payload[STATE.size:STATE.size + rows * cols]}
+
+
+class _Connection:
+    """
+    A client connection: the game and player it is joined to.
+    """
+    __slots__ = ("writer", "game_id", "player_id", "subscribed")
+
+    def __init__(self, writer:asyncio.StreamWriter) -> None:
+        self.writer = writer
+        self.game_id: str = None
+        self.player_id: str = None
+        self.subscribed: bool = False
+
+
+class TCPGameServer:
+    """
+    Binary TCP Protocol of the Connect4Server (for clients in the LAN, e.g. Raspberry Pis)
+
+    Served next to the Flask API on its own port, on the games of the same Connect4Server
+    (same rules, same games, HTTP and TCP clients can play against each other).
+    Every message is a frame of a 5 byte header (payload length, kind) and a binary payload,
+    a move is 7 bytes and its answer is the state of the game (19 bytes and one byte per cell).
+    The connection stays open, so a client can subscribe to its game: the server pushes
+    the state after every change (from HTTP, TCP, bots or timers) instead of being polled.
+
+    All connections are served by one asyncio event loop in a background thread. A change is
+    encoded once and written to every subscriber of the game; a subscriber which doesn't
+    read (more than max_buffer bytes unsent) is disconnected instead of slowing the game.
+    When a game is finished, its subscribers get the final state and are released
+    (the connections stay open for the next game).
+
+    Attributes:
+        server (Connect4Server): the server whose games are played
+        host (str): address to listen on
+        port (int): port to listen on
+        max_buffer (int): unsent bytes after which a subscriber is disconnected
+
+    Methods:
+        start(self) -> None
+            Starts the event loop thread and listens
+        close(self) -> None
+            Closes all connections and stops the thread
+    """
+
+    def __init__(self, server, host:str = '0.0.0.0', port:int = 5001, max_buffer:int = 64 * 1024) -> None:
+        """
+        Initializes the TCP server (not listening yet, see start()).
+
+        Parameters:
+            server (Connect4Server): the server whose games are played
+            host (str): address to listen on (default 0.0.0.0)
+            port (int): port to listen on (default 5001)
+            max_buffer (int): unsent bytes after which a subscriber is disconnected (default 64 KiB)
+
+        Returns:
+            None
+        """
+        self.server = server
+        self.host: str = host
+        self.port: int = port
+        self.max_buffer: int = max_buffer
+        self._subscribers: dict = {}        # game_id -> set of connections (only changed in the loop)
+        self._loop: asyncio.AbstractEventLoop = None
+        self._listener: asyncio.base_events.Server = None
+        self._thread: threading.Thread = None
+
+    def start(self, timeout:float = 10.0) -> None:
+        """
+        Starts the event loop thread and waits until the server listens.
+
+        Parameters:
+            timeout (float): max. seconds to wait (default 10)
+
+        Returns:
+            None
+
+        Raises:
+            OSError: if the port can't be opened
+        """
+        started = threading.Event()
+        failure = []
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._listener = self._loop.run_until_complete(
+                    asyncio.start_server(self._serve, self.host, self.port))
+            except OSError as error:
+                failure.append(error)
+                started.set()
+                return
+            #the actual port (port 0 -> any free port)
+            self.port = self._listener.sockets[0].getsockname()[1]
+            self.server.add_listener(self._on_change)
+            self.server.add_completion_listener(self._on_complete)
+            started.set()
+            self._loop.run_forever()
+            #after close(): the connection tasks end, then the loop is closed
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="tcp-protocol", daemon=True)
+        self._thread.start()
+        started.wait(timeout)
+        if failure:
+            raise failure[0]
+
+    def close(self) -> None:
+        """
+        Closes all connections and stops the event loop thread.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        if self._loop is None or not self._loop.is_running():
+            return
+        self.server.remove_listener(self._on_change)
+        self.server.remove_completion_listener(self._on_complete)
+
+        def stop() -> None:
+            self._listener.close()
+            self._subscribers.clear()
+            self._loop.stop()
+
+        self._loop.call_soon_threadsafe(stop)
+        self._thread.join(5)
+
+    def _on_change(self, game_id:str, game, version:int) -> None:
+        """
+        Listener of the Connect4Server (called under its lock after every change, from any thread):
+        encodes the state once and hands it to the event loop, if the game has subscribers.
+        """
+        if game_id in self._subscribers:
+            push = frame(PUSH, encode_state(game, version))
+            self._loop.call_soon_threadsafe(self._push, game_id, push)
+
+    def _on_complete(self, game_id:str, game, version:int) -> None:
+        """
+        Completion listener of the Connect4Server: the subscribers of a finished game are
+        released after its final state (the loop runs the callbacks in order).
+        """
+        if game_id in self._subscribers:
+            self._loop.call_soon_threadsafe(self._release, game_id)
+
+    def _release(self, game_id:str) -> None:
+        for connection in self._subscribers.pop(game_id, ()):
+            connection.subscribed = False
+
+    def _push(self, game_id:str, push:bytes) -> None:
+        for connection in list(self._subscribers.get(game_id, ())):
+            transport = connection.writer.transport
+            if transport.get_write_buffer_size() > self.max_buffer:
+                #a subscriber which doesn't read is disconnected instead of buffering without limit
+                self._unsubscribe(connection)
+                transport.abort()
+                continue
+            connection.writer.write(push)
+
+    def _unsubscribe(self, connection:_Connection) -> None:
+        subscribers = self._subscribers.get(connection.game_id)
+        if subscribers is not None:
+            subscribers.discard(connection)
+            if not subscribers:
+                del self._subscribers[connection.game_id]
+        connection.subscribed = False
+
+    async def _serve(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+        """
+        Serves one connection: reads the frames and answers them in order.
+        """
+        connection = _Connection(writer)
+        try:
+            while True:
+                header = await reader.readexactly(HEADER.size)
+                length, kind = HEADER.unpack(header)
+                if length > MAX_FRAME:
+                    break
+                payload = await reader.readexactly(length)
+                writer.write(await self._answer(connection, kind, payload))
+                if writer.transport.get_write_buffer_size() > self.max_buffer:
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._unsubscribe(connection)
+            writer.close()
+
+    async def _answer(self, connection:_Connection, kind:int, payload:bytes) -> bytes:
+        """
+        Handles a request and returns the answer frame. Everything which takes the lock of the
+        Connect4Server (moves, registrations, bots, states) runs in the default executor, so a
+        busy lock never stalls the event loop and the other connections.
+        """
+        try:
+            if kind == JOIN:
+                return await self._join(connection, payload[0], *unpack_strings(payload, 2, 1))
+            if kind == PING:
+                return frame(PONG, payload)
+            if connection.game_id is None:
+                return frame(ERROR_, ERROR.pack(NOT_JOINED))
+            if kind == MOVE:
+                (column,) = COLUMN.unpack(payload)
+                return await self._loop.run_in_executor(None, self._move, connection.game_id,
+                                                        connection.player_id, column)
+            if kind == GET_STATE:
+                return await self._loop.run_in_executor(None, self._state, connection.game_id)
+        except (IndexError, ValueError, struct.error):
+            pass
+        return frame(ERROR_, ERROR.pack(BAD_FRAME))
+
+    async def _join(self, connection:_Connection, flags:int, game_id:str, player_id:str) -> bytes:
+        """
+        Binds the connection to a game and player, registers the player and subscribes to the game (flags).
+        """
+        game_id = game_id or self.server.DEFAULT_GAME_ID
+        game, icon = await self._loop.run_in_executor(None, self._register, game_id, player_id,
+                                                      bool(flags & REGISTER))
+        if game is None:
+            return frame(ERROR_, ERROR.pack(UNKNOWN_GAME))
+
+        #the subscribers are only changed in the loop
+        self._unsubscribe(connection)
+        connection.game_id, connection.player_id = game_id, player_id
+        #a finished game doesn't change anymore, nothing to push
+        if flags & SUBSCRIBE and not game.is_over():
+            self._subscribers.setdefault(game_id, set()).add(connection)
+            connection.subscribed = True
+        return frame(JOINED_, JOINED.pack(ICONS.index(icon), game.rows, game.cols, game.connect))
+
+    def _register(self, game_id:str, player_id:str, register:bool) -> tuple:
+        """
+        Registers the player (runs in the executor), returns (game, icon of the player), (None, None) for an unknown game.
+        """
+        game = self.server.get_game(game_id)
+        if game is None:
+            return None, None
+        if register:
+            icon = self.server.register(game_id, player_id)
+            self.server.bots.on_change(game_id)
+            return game, icon
+        #only bound (e.g. registered by the lobby): the icon the player already has
+        for player in (game.player1, game.player2):
+            if player and player["id"] == player_id:
+                return game, player["icon"]
+        return game, None
+
+    def _move(self, game_id:str, player_id:str, column:int) -> bytes:
+        """
+        Makes a move (runs in the executor), returns the state or an error frame.
+        """
+        if not self.server.apply_move(game_id, column, player_id):
+            return frame(ERROR_, ERROR.pack(ILLEGAL_MOVE if game_id in self.server.store else UNKNOWN_GAME))
+        #a server-side bot starts thinking right after the committed move
+        self.server.bots.on_change(game_id)
+        return self._state(game_id)
+
+    def _state(self, game_id:str) -> bytes:
+        with self.server.lock:
+            game, version = self.server.store.get_versioned(game_id)
+            if game is None:
+                return frame(ERROR_, ERROR.pack(UNKNOWN_GAME))
+            return frame(STATE_, encode_state(game, version))
+
+
+def benchmark(requests:int = 2000, port:int = 5390, tcp_port:int = 5391) -> dict:
+    """
+    Measures the round trip of a status request and of a move of a remote player on localhost:
+    Player_Remote over HTTP (JSON, keep-alive session) against Player_Remote_TCP over the
+    binary protocol. Both players go through their _request, like in a game.
+
+    Parameters:
+        requests (int): measured requests per kind and protocol (default 2000)
+        port (int): port of the Flask API (default 5390)
+        tcp_port (int): port of the binary protocol (default 5391)
+
+    Returns:
+        dict: protocol -> {"status_us": median round trip, "move_us": median round trip}
+    """
+    import logging
+    import statistics
+    import requests as http
+    from werkzeug.serving import make_server
+    from server import Connect4Server
+    from player_remote import Player_Remote
+    from player_remote_tcp import Player_Remote_TCP
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = Connect4Server(swagger=False, analysis_workers=0, bot_workers=0, idle_ttl=None)
+    api = make_server("127.0.0.1", port, server.app, threaded=True)
+    threading.Thread(target=api.serve_forever, daemon=True).start()
+    tcp = TCPGameServer(server, "127.0.0.1", tcp_port)
+    tcp.start()
+
+    #Player_Remote sends every request with a new connection, the measured one keeps it alive
+    session = http.Session()
+
+    class Player_Remote_KeepAlive(Player_Remote):
+        def _request(self, method, path, data=None):
+            if method == "GET":
+                return session.get(f"{self.api_url}{path}", params={"game_id": self.game_id, "player_id": f"{self.id}"})
+            return session.post(f"{self.api_url}{path}", json=data)
+
+    api_url = f"http://127.0.0.1:{port}"
+    results = {}
+    for name, make_player in (("http", lambda game_id: Player_Remote_KeepAlive(api_url, game_id=game_id)),
+                              ("tcp", lambda game_id: Player_Remote_TCP(api_url, tcp_port=tcp_port, game_id=game_id,
+                                                                        push=False))):
+        status, moves = [], []
+        while len(moves) < requests:
+            #a new 7x8 game whenever the game is over
+            game_id = server.create_game(rows=7, cols=8)
+            players = [make_player(game_id), make_player(game_id)]
+            for player in players:
+                player.register_in_game()
+            for number in range(56):
+                player = players[(number + 1) % 2]
+                start = time.perf_counter()
+                player.get_game_status()
+                status.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                response = player._send_move(number // 7)
+                moves.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise RuntimeError(f"move rejected by {name}")
+                if response.json()["state"]["game_over"]:
+                    break
+            for player in players:
+                if hasattr(player, "close"):
+                    player.close()
+        results[name] = {"status_us": statistics.median(status) * 1e6, "move_us": statistics.median(moves) * 1e6}
+
+    tcp.close()
+    api.shutdown()
+    server.timers.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Round trip of the binary TCP protocol against HTTP on localhost")
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests per kind (default 2000)")
+    args = parser.parse_args()
+
+    for protocol, result in benchmark(args.requests).items():
+        print(f"{protocol:>5}: status {result['status_us']:7.0f} us   move {result['move_us']:7.0f} us")
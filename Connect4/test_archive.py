@@ -0,0 +1,22 @@
+import os
+
+from archive import GameArchive, ArchiveReader, RESULT_PLAYER1
+
+
+def test_torn_index_entry_is_cut_off(tmp_path):
+    archive = GameArchive(str(tmp_path))
+    archive.add_record("a", "b", RESULT_PLAYER1, 7, 8, [3, 4, 3, 4, 3, 4, 3], 1.0, 2.0)
+    archive.close()
+    #a crash in the middle of an index entry
+    with open(os.path.join(str(tmp_path), "segment-000000.idx"), "ab") as file:
+        file.write(b"\x07\x00\x00")
+
+    archive = GameArchive(str(tmp_path))
+    archive.add_record("c", "d", RESULT_PLAYER1, 6, 7, [0, 1, 0, 1, 0, 1, 0], 3.0, 4.0)
+    archive.close()
+
+    reader = ArchiveReader(str(tmp_path))
+    assert len(reader) == 2
+    assert [(game.player1, bytes(game.moves)) for game in reader] == [("a", bytes([3, 4, 3, 4, 3, 4, 3])),
+                                                                       ("c", bytes([0, 1, 0, 1, 0, 1, 0]))]
+    reader.close()
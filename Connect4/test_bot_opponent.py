@@ -0,0 +1,36 @@
+import time
+
+from search import timed_search
+from server import Connect4Server
+
+
+def test_takeback_discards_the_stale_bot_move():
+    server = Connect4Server(allow_takeback=True, swagger=False, default_game=False, bot_workers=1)
+    try:
+        #the bot needs its whole budget on a wide board, long enough for a takeback and another move
+        game_id = server.create_game(rows=7, cols=40, bot="search", bot_time=5.0)
+        server.register(game_id, "human")
+        assert server.apply_move(game_id, 0, "human")
+        server.bots.on_change(game_id)
+        stale = server.bots._thinking[game_id]
+
+        assert server.takeback(game_id, "human") == 0
+        server.bots.cancel(game_id)
+        assert server.apply_move(game_id, 39, "human")
+        server.bots.on_change(game_id)
+
+        #the result of the search before the takeback arrives late
+        server.bots._apply(game_id, stale, 1)
+        game = server.get_game(game_id)
+        assert list(game.moves) == [39]
+        assert game.active_player["id"] != "human"
+    finally:
+        server.bots.close()
+        server.analyzer.close()
+
+
+def test_timed_search_keeps_the_budget_on_a_wide_board():
+    start = time.perf_counter()
+    analysis = timed_search(["." * 60] * 7, "X", 4, budget=0.5)
+    assert time.perf_counter() - start < 1.5
+    assert analysis["best_column"] is not None
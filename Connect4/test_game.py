@@ -0,0 +1,23 @@
+from game import Connect4
+
+
+def test_play_needs_both_players():
+    game = Connect4()
+    assert not game.play(0)
+    game.register_player("a")
+    assert not game.play(0)
+    game.register_player("b")
+    assert game.play(0)
+    assert list(game.moves) == [0]
+
+
+def test_reset_lets_player1_start():
+    game = Connect4()
+    game.register_player("a")
+    game.register_player("b")
+    #a new game starts with player2 (the second registration), reset with player1
+    assert game.active_player["id"] == "b"
+    game.play(3)
+    game.reset()
+    assert game.active_player["id"] == "a"
+    assert game.moves == []
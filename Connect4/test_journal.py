@@ -0,0 +1,59 @@
+import os
+import time
+
+from journal import GameJournal
+from server import Connect4Server
+
+
+def _crash(journal:GameJournal, fragment:str) -> None:
+    """
+    Simulates a crash while a record is written: the records before are durable,
+    the journal file ends with a line without newline.
+    """
+    journal.close()
+    name = sorted(name for name in os.listdir(journal.directory) if name.startswith("journal-"))[-1]
+    with open(os.path.join(journal.directory, name), "a") as file:
+        file.write(fragment)
+
+
+def test_recover_after_two_torn_writes(tmp_path):
+    #the first record is torn: recovery continues the same journal file
+    journal = GameJournal(str(tmp_path))
+    journal.recover()
+    _crash(journal, "1 N ga")
+
+    journal = GameJournal(str(tmp_path))
+    state, records = journal.recover()
+    assert state is None and records == []
+    assert journal.append("N", "game", 7, 8, 4) == 1
+    assert journal.append("R", "game", "player-1") == 2
+    _crash(journal, "3 R game play")
+
+    journal = GameJournal(str(tmp_path))
+    _, records = journal.recover()
+    assert records == [["N", "game", "7", "8", "4"], ["R", "game", "player-1"]]
+    assert journal.append("R", "game", "player-2") == 3
+    journal.close()
+
+    journal = GameJournal(str(tmp_path))
+    _, records = journal.recover()
+    assert records == [["N", "game", "7", "8", "4"], ["R", "game", "player-1"], ["R", "game", "player-2"]]
+    journal.close()
+
+
+def test_recovered_games_are_evicted(tmp_path):
+    server = Connect4Server(journal_dir=str(tmp_path), swagger=False, idle_ttl=None)
+    game_id = server.create_game()
+    server.register(game_id, "player-1")
+    server.register(game_id, "player-2")
+    assert server.apply_move(game_id, 0, "player-2")
+    server.journal.close()
+    server.analyzer.close()
+
+    #the idle timer of the recovered game acts on the version the replay left it at
+    server = Connect4Server(journal_dir=str(tmp_path), swagger=False, idle_ttl=0.2)
+    assert game_id in server.store
+    time.sleep(1)
+    assert game_id not in server.store
+    server.journal.close()
+    server.analyzer.close()
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+from aiohttp import web
+
+from player_remote_async import Player_Remote_Async
+
+
+async def _serve(routes:list) -> tuple:
+    app = web.Application()
+    app.add_routes(routes)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_error_page_which_is_not_json():
+    async def main():
+        async def bad_gateway(request):
+            return web.Response(status=502, text="<html>Bad Gateway</html>", content_type="text/html")
+        runner, url = await _serve([web.get("/connect4/status", bad_gateway)])
+        player = Player_Remote_Async(url)
+        try:
+            assert await player.get_game_status() is False
+            assert await player._request("GET", "/connect4/status") == (502, {"message": "<html>Bad Gateway</html>"})
+        finally:
+            await player.close()
+            await runner.cleanup()
+    asyncio.run(main())
+
+
+def test_bot_runs_outside_the_event_loop():
+    async def main():
+        async def board(request):
+            return web.json_response({"board": [[0] * 8 for _ in range(7)]})
+        async def make_move(request):
+            return web.json_response({"column": (await request.json())["column"]})
+        runner, url = await _serve([web.get("/connect4/board", board), web.post("/connect4/make_move", make_move)])
+        player = Player_Remote_Async(url)
+        player.icon = "X"
+        threads = []
+        def bot(board, icon, connect = 4):
+            threads.append(threading.current_thread())
+            return 3
+        player._bot = bot
+        try:
+            assert await player.make_move_with_bot() == 3
+            assert threads and threads[0] is not threading.main_thread()
+        finally:
+            await player.close()
+            await runner.cleanup()
+    asyncio.run(main())
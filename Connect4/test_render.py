@@ -0,0 +1,12 @@
+import pytest
+
+from render import check_board_size
+
+
+def test_boards_larger_than_the_led_matrix_are_refused():
+    check_board_size(7, 8)
+    check_board_size(6, 7)
+    with pytest.raises(ValueError):
+        check_board_size(8, 8)
+    with pytest.raises(ValueError):
+        check_board_size(7, 9)
@@ -0,0 +1,49 @@
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+from router import ShardRouter
+from server import Connect4Server
+
+
+def _shard() -> tuple:
+    server = Connect4Server(swagger=False, default_game=False, shard_api=True)
+    http = make_server("127.0.0.1", 0, server.app, threaded=True)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+    return server, http, f"http://127.0.0.1:{http.server_port}"
+
+
+def test_adding_a_shard_doesnt_wait_for_long_polls():
+    shards = [_shard(), _shard()]
+    router = ShardRouter([shards[0][2]])
+    try:
+        content, status, _ = router.forward("new_game", "POST", data={"game_id": "watched"})
+        assert status == 200
+        poll = threading.Thread(target=router.forward, args=("spectate/poll",),
+                                kwargs={"params": {"game_id": "watched", "since": 100, "wait": 3}})
+        poll.start()
+        time.sleep(0.3)
+
+        start = time.perf_counter()
+        router.add_shard(shards[1][2])
+        assert time.perf_counter() - start < 2
+        assert poll.is_alive()
+        #the game is found on its owner after the rebalance
+        assert router.forward("config", params={"game_id": "watched"})[1] == 200
+        poll.join()
+    finally:
+        router.timers.close()
+        for server, http, _ in shards:
+            http.shutdown()
+            server.analyzer.close()
+
+
+def test_router_limits_the_batch_size():
+    router = ShardRouter(["http://127.0.0.1:1"])
+    try:
+        client = router.app.test_client()
+        answer = client.post("/connect4/batch/status", json={"game_ids": ["game"] * (ShardRouter.MAX_BATCH + 1)})
+        assert answer.status_code == 400
+    finally:
+        router.timers.close()
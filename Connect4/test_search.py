@@ -0,0 +1,27 @@
+import time
+
+import pytest
+
+from search import Analyzer, AnalyzerBusy, deepening_search
+
+
+def test_search_stops_at_the_time_limit():
+    #a depth 8 search of a 40x40 board would take far longer than the limit
+    rows = ["." * 40] * 40
+    start = time.perf_counter()
+    analysis = deepening_search(rows, "X", 4, depth=8, time_limit=0.5)
+    assert time.perf_counter() - start < 3
+    assert 1 <= analysis["depth"] < 8
+    assert analysis["best_column"] is not None
+
+
+def test_analyzer_rejects_searches_over_the_cap():
+    analyzer = Analyzer(workers=1, time_limit=1.0, max_pending=1)
+    try:
+        assert analyzer.analyze(["." * 40] * 40, "X", 4, depth=8) is None
+        with pytest.raises(AnalyzerBusy):
+            analyzer.analyze(["." * 30] * 30, "X", 4, depth=8)
+        #the running search is still answered
+        assert analyzer.analyze(["." * 40] * 40, "X", 4, depth=8, timeout=10) is not None
+    finally:
+        analyzer.close()
@@ -0,0 +1,32 @@
+from server import Connect4Server
+
+
+def _move(server:Connect4Server, game_id:str, column:int) -> None:
+    game = server.get_game(game_id)
+    assert server.apply_move(game_id, column, game.active_player["id"])
+
+
+def test_board_is_fresh_after_a_shard_round_trip():
+    first = Connect4Server(swagger=False, default_game=False, shard_api=True)
+    second = Connect4Server(swagger=False, default_game=False, shard_api=True)
+    try:
+        game_id = first.create_game()
+        first.register(game_id, "a")
+        first.register(game_id, "b")
+        client = first.app.test_client()
+        empty = client.get(f"/connect4/board?game_id={game_id}").get_json()["board"]
+
+        #the game moves to the second shard and back, its versions start again at 1
+        second.import_games(first.export_games([game_id]))
+        _move(second, game_id, 0)
+        first.import_games(second.export_games([game_id]))
+        _move(first, game_id, 1)
+        _move(first, game_id, 2)
+        assert first.store.get_versioned(game_id)[1] == 3
+
+        board = client.get(f"/connect4/board?game_id={game_id}").get_json()["board"]
+        assert board != empty
+        assert board == first.get_game(game_id).get_board().tolist()
+    finally:
+        first.analyzer.close()
+        second.analyzer.close()
@@ -0,0 +1,25 @@
+import json
+
+from server import Connect4Server
+
+
+def test_stream_ends_with_the_final_state():
+    server = Connect4Server(swagger=False, default_game=False)
+    try:
+        game_id = server.create_game()
+        server.register(game_id, "a")
+        server.register(game_id, "b")
+        client = server.app.test_client()
+        response = client.get(f"/connect4/spectate?game_id={game_id}", buffered=False)
+
+        #the game ends before the spectator reads its stream
+        for column in (0, 1, 0, 1, 0, 1, 0):
+            game = server.get_game(game_id)
+            assert server.apply_move(game_id, column, game.active_player["id"])
+
+        events = [json.loads(chunk.split(b"data: ", 1)[1])
+                  for chunk in response.response if chunk.startswith(b"id:")]
+        assert [event["version"] for event in events] == list(range(3, 11))
+        assert events[-1]["winner"] is not None
+    finally:
+        server.analyzer.close()
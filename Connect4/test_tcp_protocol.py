@@ -0,0 +1,49 @@
+import socket
+import threading
+
+import tcp_protocol as protocol
+from server import Connect4Server
+from tcp_protocol import TCPGameServer
+
+
+def _connect(port:int) -> socket.socket:
+    connection = socket.create_connection(("127.0.0.1", port), timeout=5)
+    connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return connection
+
+
+def _read(connection:socket.socket, size:int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        assert chunk, "connection closed"
+        data += chunk
+    return data
+
+
+def _receive(connection:socket.socket) -> tuple:
+    length, kind = protocol.HEADER.unpack(_read(connection, protocol.HEADER.size))
+    return kind, _read(connection, length)
+
+
+def test_locked_game_doesnt_stall_other_connections():
+    server = Connect4Server(swagger=False)
+    tcp = TCPGameServer(server, host="127.0.0.1", port=0)
+    tcp.start()
+    player, other = _connect(tcp.port), _connect(tcp.port)
+    try:
+        player.sendall(protocol.frame(protocol.JOIN, bytes((protocol.REGISTER,)) + protocol.pack_strings("", "a")))
+        assert _receive(player)[0] == protocol.JOINED_
+
+        #the move waits for the lock of the server, a ping of another client is answered meanwhile
+        with server.lock:
+            player.sendall(protocol.frame(protocol.MOVE, protocol.COLUMN.pack(0)))
+            threading.Event().wait(0.2)
+            other.sendall(protocol.frame(protocol.PING, b"ping"))
+            assert _receive(other) == (protocol.PONG, b"ping")
+        assert _receive(player)[0] == protocol.STATE_
+    finally:
+        player.close()
+        other.close()
+        tcp.close()
+        server.analyzer.close()
@@ -0,0 +1,16 @@
+import pytest
+
+from tournament import estimate_elo, run_tournament
+
+
+def test_single_strategy_is_rejected():
+    assert estimate_elo({}) == {}
+    with pytest.raises(ValueError):
+        run_tournament(["heuristic"], games=2, workers=1)
+    with pytest.raises(ValueError):
+        run_tournament(["heuristic"], games=2, mode="gauntlet", workers=1)
+
+
+def test_two_strategies_are_rated():
+    results = run_tournament(["heuristic", "random"], games=2, workers=1)
+    assert set(results["elo"]) == {"heuristic", "random"}
@@ -0,0 +1,156 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class TimerService:
+    """
+    Timer Service for many keyed deadlines (idle games, move clocks, evictions)
+
+    All deadlines are kept in one min-heap and a single thread sleeps until the
+    earliest one is due, so nothing scans all games on a tick:
+        schedule / cancel:  O(log n)
+        firing a timer:     O(log n)
+
+    Every key has at most one live timer. Scheduling a key again replaces its timer,
+    the old heap entry is only marked as stale and skipped when it comes up
+    (the heap is rebuilt when more than half of it is stale).
+
+    Attributes:
+        clock:  function returning the current time in seconds (default time.monotonic)
+
+    Methods:
+        schedule(self, key, delay, callback) -> None
+            Calls callback() after delay seconds (replaces the timer of key)
+        cancel(self, key) -> bool
+            Cancels the timer of key
+        deadline(self, key) -> float
+            Returns when the timer of key is due (None if there is none)
+        close(self) -> None
+            Stops the timer thread
+    """
+
+    def __init__(self, clock = time.monotonic) -> None:
+        """
+        Initializes the timer service, the thread is started with the first timer.
+
+        Parameters:
+            clock: function returning the current time in seconds (default time.monotonic)
+
+        Returns:
+            None
+        """
+        self.clock = clock
+        self._heap: list = []               # [deadline, seq, key, callback, alive]
+        self._entries: dict = {}            # key -> live heap entry
+        self._seq = itertools.count()       # tie breaker for equal deadlines
+        self._condition = threading.Condition()
+        self._thread: threading.Thread = None
+        self._closed: bool = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def schedule(self, key, delay:float, callback) -> None:
+        """
+        Calls callback() on the timer thread after delay seconds.
+        An existing timer of the same key is replaced.
+
+        Parameters:
+            key: hashable name of the timer (e.g. ("idle", game_id))
+            delay (float): seconds until the timer is due
+            callback: function without arguments
+
+        Returns:
+            None
+        """
+        with self._condition:
+            self._discard(key)
+            entry = [self.clock() + delay, next(self._seq), key, callback, True]
+            self._entries[key] = entry
+            heapq.heappush(self._heap, entry)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            #wake the thread if the new timer is the earliest one
+            if self._heap[0] is entry:
+                self._condition.notify()
+
+    def cancel(self, key) -> bool:
+        """
+        Cancels the timer of a key.
+
+        Parameters:
+            key: name of the timer
+
+        Returns:
+            bool: True if there was a timer
+        """
+        with self._condition:
+            return self._discard(key)
+
+    def deadline(self, key) -> float:
+        """
+        Returns when the timer of a key is due (in the time of the clock).
+
+        Parameters:
+            key: name of the timer
+
+        Returns:
+            float: deadline (None if there is no timer)
+        """
+        with self._condition:
+            entry = self._entries.get(key)
+            return entry[0] if entry else None
+
+    def close(self) -> None:
+        """
+        Stops the timer thread, timers which are not due yet never fire.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+    def _discard(self, key) -> bool:
+        """
+        Marks the timer of a key as stale (the lock has to be held by the caller).
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry[4] = False
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [entry for entry in self._heap if entry[4]]
+            heapq.heapify(self._heap)
+        return True
+
+    def _run(self) -> None:
+        """
+        Timer thread: sleeps until the earliest deadline and calls the due callbacks
+        (outside the lock, so a callback may schedule new timers).
+        """
+        while True:
+            with self._condition:
+                while not self._closed:
+                    while self._heap and not self._heap[0][4]:
+                        heapq.heappop(self._heap)
+                    if self._heap and self._heap[0][0] <= self.clock():
+                        break
+                    self._condition.wait(self._heap[0][0] - self.clock() if self._heap else None)
+                if self._closed:
+                    return
+                entry = heapq.heappop(self._heap)
+                del self._entries[entry[2]]
+                entry[4] = False
+
+            try:
+                entry[3]()
+            except Exception as error:
+                print(f"Timer {entry[2]} failed: {error!r}")
@@ -0,0 +1,252 @@
+import os
+import math
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# local includes
+from game import Connect4
+from bots import get_strategy
+
+
+RESULT_DRAW = 0         # no winner (board full)
+RESULT_X = 1            # player "X" has won
+RESULT_O = 2            # player "O" has won
+
+
+def play_game(strategy_x:str, strategy_o:str, seed:int, rows:int = 7, cols:int = 8, connect:int = 4) -> tuple[int, int]:
+    """
+    Plays one game between two bot strategies on an in-process Connect4 game.
+    "X" starts. A strategy which returns an illegal column loses the game.
+
+    Parameters:
+        strategy_x (str): strategy name of player "X"
+        strategy_o (str): strategy name of player "O"
+        seed (int): seed for the random generator of the bots
+        rows (int): height of the board (default 7)
+        cols (int): width of the board (default 8)
+        connect (int): chips in a row needed to win (default 4)
+
+    Returns:
+        tuple[int, int]: result (RESULT_DRAW, RESULT_X, RESULT_O) and number of moves
+    """
+    rng = random.Random(seed)
+    bots = {"X": get_strategy(strategy_x), "O": get_strategy(strategy_o)}
+
+    game = Connect4(rows, cols, connect)
+    game.register_player("X")
+    game.register_player("O")
+    #Set Starting Player to player1 (same as Coordinator_Local)
+    game.active_player["id"] = game.player1["id"]
+    game.active_player["icon"] = game.player1["icon"]
+
+    while True:
+        icon = game.active_player["icon"]
+        column = bots[icon](game.Board, icon, rng, connect)
+
+        #illegal move -> the other player wins
+        if column is None or not game.check_move(column, icon):
+            return (RESULT_O if icon == "X" else RESULT_X), len(game.moves)
+
+        game.drop_chip(column, icon)
+        game.update_status()
+
+        if game.winner:
+            return (RESULT_X if game.winner["icon"] == "X" else RESULT_O), len(game.moves)
+        if len(game.moves) == rows * cols:
+            return RESULT_DRAW, len(game.moves)
+
+
+def _play_batch(tasks:list) -> list:
+    """
+    Plays a batch of games in a worker process.
+
+    Parameters:
+        tasks (list): (strategy_a, strategy_b, a_plays_x, seed, board) for every game,
+                      board is (rows, cols, connect)
+
+    Returns:
+        list: (result, number of moves) for every game
+    """
+    results = []
+    for strategy_a, strategy_b, a_plays_x, seed, board in tasks:
+        if a_plays_x:
+            results.append(play_game(strategy_a, strategy_b, seed, *board))
+        else:
+            results.append(play_game(strategy_b, strategy_a, seed, *board))
+    return results
+
+
+def make_pairings(strategies:list, mode:str = "round-robin") -> list[tuple[str, str]]:
+    """
+    Creates the pairings of a tournament.
+
+    Parameters:
+        strategies (list): strategy names
+        mode (str): "round-robin" (everyone against everyone) or
+                    "gauntlet" (the first strategy against all others)
+
+    Returns:
+        list[tuple[str, str]]: pairings
+
+    Raises:
+        ValueError: if the mode is unknown
+    """
+    if mode == "round-robin":
+        return [(a, b) for i, a in enumerate(strategies) for b in strategies[i + 1:]]
+    if mode == "gauntlet":
+        return [(strategies[0], b) for b in strategies[1:]]
+    raise ValueError(f"Unknown tournament mode '{mode}'")
+
+
+def estimate_elo(table:dict, iterations:int = 100) -> dict:
+    """
+    Estimates Elo ratings from the results of all pairings (maximum likelihood with Newton steps).
+    Every pairing gets one virtual draw, so 100% scores still give finite ratings.
+    The ratings are shifted to an average of 1500.
+
+    Parameters:
+        table (dict): (a, b) -> [wins of a, draws, losses of a]
+        iterations (int): number of Newton steps (default 100)
+
+    Returns:
+        dict: strategy -> Elo rating (empty without pairings)
+    """
+    players = sorted({player for pairing in table for player in pairing})
+    ratings = {player: 0.0 for player in players}
+    if not ratings:
+        return ratings
+
+    for _ in range(iterations):
+        for player in players:
+            score = expected = slope = 0.0
+            for (a, b), (wins, draws, losses) in table.items():
+                if player not in (a, b):
+                    continue
+                games = wins + draws + losses + 1
+                points = wins + (draws + 1) / 2 if player == a else losses + (draws + 1) / 2
+                opponent = b if player == a else a
+                e = 1 / (1 + 10 ** ((ratings[opponent] - ratings[player]) / 400))
+                score += points
+                expected += games * e
+                slope += games * e * (1 - e) * math.log(10) / 400
+            if slope:
+                ratings[player] += (score - expected) / slope
+
+    shift = 1500 - sum(ratings.values()) / len(ratings)
+    return {player: rating + shift for player, rating in ratings.items()}
+
+
+def run_tournament(strategies:list, games:int = 100, mode:str = "round-robin", seed:int = 0, workers:int = None,
+                   rows:int = 7, cols:int = 8, connect:int = 4) -> dict:
+    """
+    Plays a tournament between bot strategies on all cores.
+    Every pairing plays `games` games, the colors alternate from game to game.
+    Game n of the tournament uses the seed `seed + n`, so a tournament is reproducible.
+
+    Parameters:
+        strategies (list): strategy names (see bots.get_strategy)
+        games (int): games per pairing (default 100)
+        mode (str): "round-robin" or "gauntlet" (default "round-robin")
+        seed (int): base seed (default 0)
+        workers (int): number of processes (default None -> number of cores)
+        rows (int): height of the board (default 7)
+        cols (int): width of the board (default 8)
+        connect (int): chips in a row needed to win (default 4)
+
+    Returns:
+        dict: table (pairing -> [wins, draws, losses] of the first strategy),
+              elo (strategy -> rating), games, seconds, games_per_second, moves_per_second
+
+    Raises:
+        ValueError: if there are less than two strategies, a strategy is unknown or the board is invalid
+    """
+    #check the names and the board before starting the processes
+    if len(strategies) < 2:
+        raise ValueError("a tournament needs at least two strategies")
+    for strategy in strategies:
+        get_strategy(strategy)
+    Connect4(rows, cols, connect)
+
+    pairings = make_pairings(strategies, mode)
+    tasks = []
+    for a, b in pairings:
+        for i in range(games):
+            tasks.append((a, b, i % 2 == 0, seed + len(tasks), (rows, cols, connect)))
+
+    workers = workers or os.cpu_count() or 1
+    batch_size = max(1, math.ceil(len(tasks) / (workers * 4)))
+    batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_play_batch(batch) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_play_batch, batches))
+    seconds = time.perf_counter() - start
+
+    table = {pairing: [0, 0, 0] for pairing in pairings}
+    total_moves = 0
+    for batch, batch_results in zip(batches, results):
+        for (a, b, a_plays_x, _, _), (result, moves) in zip(batch, batch_results):
+            total_moves += moves
+            if result == RESULT_DRAW:
+                table[(a, b)][1] += 1
+            elif (result == RESULT_X) == a_plays_x:
+                table[(a, b)][0] += 1
+            else:
+                table[(a, b)][2] += 1
+
+    return {
+        "table": table,
+        "elo": estimate_elo(table),
+        "games": len(tasks),
+        "seconds": seconds,
+        "games_per_second": len(tasks) / seconds if seconds else float("inf"),
+        "moves_per_second": total_moves / seconds if seconds else float("inf"),
+    }
+
+
+def print_results(results:dict) -> None:
+    """
+    Prints the win/draw/loss table, the Elo ratings and the speed of a tournament.
+
+    Parameters:
+        results (dict): result of run_tournament()
+
+    Returns:
+        None
+    """
+    print(f"{'Pairing':<40} {'W':>6} {'D':>6} {'L':>6} {'Score':>7}")
+    for (a, b), (wins, draws, losses) in results["table"].items():
+        games = wins + draws + losses
+        score = (wins + draws / 2) / games if games else 0
+        print(f"{a + ' vs ' + b:<40} {wins:>6} {draws:>6} {losses:>6} {score:>7.1%}")
+
+    print(f"\n{'Strategy':<30} {'Elo':>7}")
+    for strategy, rating in sorted(results["elo"].items(), key=lambda item: -item[1]):
+        print(f"{strategy:<30} {rating:>7.0f}")
+
+    print(f"\n{results['games']} games in {results['seconds']:.2f}s -> "
+          f"{results['games_per_second']:.0f} games/s, {results['moves_per_second']:.0f} moves/s")
+
+
+# To start a tournament, e.g.: python tournament.py heuristic random --games 1000
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless Connect 4 bot tournament")
+    parser.add_argument("strategies", nargs="+", help="strategy names or module:function")
+    parser.add_argument("--games", type=int, default=100, help="games per pairing")
+    parser.add_argument("--mode", choices=["round-robin", "gauntlet"], default="round-robin")
+    parser.add_argument("--seed", type=int, default=0, help="base seed for reproducible tournaments")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: all cores)")
+    parser.add_argument("--rows", type=int, default=7, help="height of the board")
+    parser.add_argument("--cols", type=int, default=8, help="width of the board")
+    parser.add_argument("--connect", type=int, default=4, help="chips in a row needed to win")
+    args = parser.parse_args()
+    if len(args.strategies) < 2:
+        parser.error("a tournament needs at least two strategies")
+
+    print_results(run_tournament(args.strategies, games=args.games, mode=args.mode, seed=args.seed, workers=args.workers,
+                                 rows=args.rows, cols=args.cols, connect=args.connect))